@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+App 安装包体积分析：统计壁纸、名言等资源占用的字节数，检查体积预算
+
+- 在线程池中统计 MotivationApp/Assets.xcassets、MotivationApp/Resources、tools/Wallpapers 下的所有文件，
+  图片同时读取尺寸（只读文件头，需要 Pillow，未安装时不检查分辨率）
+- 按 wallpaper_themes.json 把壁纸图片的字节数归到主题和 免费/付费：
+  多个主题共用的图片平均分到各主题；只要有一个免费壁纸使用，图片就算免费内容
+- 标记过大（超过 maxMB）和分辨率超过最大屏幕（maxWidth × maxHeight，横竖均可）的图片，
+  以及壁纸引用了但找不到的图片
+- 按 tools/bundle_budget.json 检查预算，超出时退出码为 1（--strict 时标记的图片也算失败）
+- 报告写入 tools/bundle_size_report.json，并与上一次的报告比较
+
+统计项（报告、预算和比较使用相同的名称）：
+  total                     安装包中的资源合计（Assets.xcassets + Resources）
+  source/<目录>             各目录合计；source/Wallpapers 是还未加入 Assets 的源图片，不计入 total
+  theme/<主题名>            主题的壁纸图片（预算中 theme/* 表示每个主题）
+  tier/free、tier/premium   免费 / 付费壁纸图片
+  resource/<文件名>         Resources 中的单个文件（如 quotes.json）
+  unreferenced              没有被任何壁纸使用的图片
+
+这里统计的是源文件大小；Xcode 编译 Assets.car 时会重新压缩，实际下载大小以 App Store Connect 为准，
+但变化趋势一致。
+
+使用方法：
+python3 bundle_size.py                         # 统计并与上次报告比较
+python3 bundle_size.py --baseline old.json     # 与指定的报告比较（如主分支上生成的报告）
+python3 bundle_size.py --budget my_budget.json # 使用其他预算文件
+python3 bundle_size.py --strict                # 有过大或分辨率过高的图片时也返回失败
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from catalog import load_catalog
+from instrument import count, stage
+from scan_wallpapers import IMAGE_EXTENSIONS
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+# 统计的目录：(名称, 相对项目根目录的路径, 是否打进安装包)
+SOURCES = (
+    ('Assets.xcassets', os.path.join('MotivationApp', 'Assets.xcassets'), True),
+    ('Resources', os.path.join('MotivationApp', 'Resources'), True),
+    ('Wallpapers', os.path.join('tools', 'Wallpapers'), False),
+)
+
+DEFAULT_BUDGET_PATH = os.path.join(SCRIPT_DIR, 'bundle_budget.json')
+DEFAULT_REPORT_PATH = os.path.join(SCRIPT_DIR, 'bundle_size_report.json')
+
+# 读取文件大小和图片尺寸的线程数（主要是文件系统等待）
+DEFAULT_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+
+# 没有预算文件时的图片限制：最大屏幕（iPhone Pro Max）的像素尺寸
+DEFAULT_IMAGE_LIMITS = {'maxMB': 3, 'maxWidth': 1290, 'maxHeight': 2796}
+
+# 比较结果中列出的文件数
+DIFF_TOP = 10
+
+MB = 1024 * 1024
+
+
+class Asset:
+    """一个资源文件"""
+
+    __slots__ = ('path', 'source', 'bytes', 'size', 'image_name', 'error')
+
+    def __init__(self, path, source):
+        self.path = path            # 相对项目根目录
+        self.source = source
+        self.bytes = 0
+        self.size = None            # 图片的 (宽, 高)
+        self.image_name = None      # 图片的资源名（imageName）
+        self.error = None
+
+    def to_dict(self):
+        data = {'source': self.source, 'bytes': self.bytes}
+        if self.image_name:
+            data['imageName'] = self.image_name
+        if self.size:
+            data['width'], data['height'] = self.size
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+def image_name_for(relative_path):
+    """图片文件 -> imageName：Assets 中为 .imageset 目录名，Wallpapers 中为去掉 $ 的文件名"""
+    parent = os.path.basename(os.path.dirname(relative_path))
+    if parent.endswith('.imageset'):
+        return parent[:-len('.imageset')]
+    return os.path.splitext(os.path.basename(relative_path))[0].lstrip('$')
+
+
+def find_assets(project_path=PROJECT_DIR):
+    assets = []
+    for source, root, _ in SOURCES:
+        for dir_path, dir_names, file_names in os.walk(os.path.join(project_path, root)):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                path = os.path.relpath(os.path.join(dir_path, file_name), project_path)
+                asset = Asset(path, source)
+                if os.path.splitext(file_name)[1].lower() in IMAGE_EXTENSIONS:
+                    asset.image_name = image_name_for(path)
+                assets.append(asset)
+    return assets
+
+
+def probe_asset(asset, project_path=PROJECT_DIR):
+    """读取文件大小，图片再读取尺寸（Image.open 只解析文件头）"""
+    path = os.path.join(project_path, asset.path)
+    asset.bytes = os.path.getsize(path)
+    if asset.image_name and Image is not None:
+        try:
+            with Image.open(path) as image:
+                asset.size = image.size
+        except Exception as e:
+            asset.error = f'无法读取图片: {e}'
+    return asset
+
+
+def probe_assets(assets, project_path=PROJECT_DIR, workers=DEFAULT_WORKERS):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda asset: probe_asset(asset, project_path), assets))
+    count('assets', len(assets))
+    return assets
+
+
+def wallpaper_images(assets):
+    """imageName -> 图片；Assets 中的优先（已打进安装包），其次是 Wallpapers 中的源图片"""
+    images = {}
+    for asset in assets:
+        if asset.image_name and asset.source != 'Resources':
+            if asset.image_name not in images or images[asset.image_name].source == 'Wallpapers':
+                images[asset.image_name] = asset
+    return images
+
+
+def attribute(assets, catalog):
+    """统计各项的字节数，返回 (统计项 -> 字节数, 标记列表)"""
+    buckets = {'total': 0}
+    flags = []
+
+    def add(bucket, amount):
+        buckets[bucket] = buckets.get(bucket, 0) + amount
+
+    shipped = {source for source, _, in_bundle in SOURCES if in_bundle}
+    for asset in assets:
+        add(f'source/{asset.source}', asset.bytes)
+        if asset.source in shipped:
+            add('total', asset.bytes)
+        if asset.source == 'Resources':
+            add(f'resource/{os.path.basename(asset.path)}', asset.bytes)
+
+    # 每张图片被哪些主题、哪些付费状态的壁纸使用
+    images = wallpaper_images(assets)
+    themes_by_id = {theme.id: theme for theme in catalog.themes}
+    users = {}      # imageName -> ({主题名}, 是否有免费壁纸使用)
+    for wallpaper in catalog.wallpapers:
+        theme = themes_by_id.get(wallpaper.themeId)
+        theme_name = theme.name if theme else wallpaper.themeId
+        is_premium = bool(wallpaper.isPremium or (theme and theme.isPremium))
+        if wallpaper.imageName not in images:
+            flags.append({'file': wallpaper.imageName, 'reason': f'壁纸 {wallpaper.name}（{theme_name}）的图片不存在'})
+            continue
+        theme_names, used_free = users.get(wallpaper.imageName, (set(), False))
+        theme_names.add(theme_name)
+        users[wallpaper.imageName] = (theme_names, used_free or not is_premium)
+
+    for image_name, asset in images.items():
+        if image_name not in users:
+            if asset.source != 'Wallpapers':
+                add('unreferenced', asset.bytes)
+            continue
+        theme_names, used_free = users[image_name]
+        for theme_name in theme_names:
+            add(f'theme/{theme_name}', asset.bytes / len(theme_names))
+        add('tier/free' if used_free else 'tier/premium', asset.bytes)
+    for theme in catalog.themes:
+        buckets.setdefault(f'theme/{theme.name}', 0)
+    buckets.setdefault('tier/free', 0)
+    buckets.setdefault('tier/premium', 0)
+    return {bucket: round(amount) for bucket, amount in buckets.items()}, flags
+
+
+def check_images(assets, limits):
+    """过大、分辨率过高和无法读取的图片"""
+    flags = []
+    max_bytes = limits.get('maxMB', DEFAULT_IMAGE_LIMITS['maxMB']) * MB
+    box = sorted((limits.get('maxWidth', DEFAULT_IMAGE_LIMITS['maxWidth']),
+                  limits.get('maxHeight', DEFAULT_IMAGE_LIMITS['maxHeight'])))
+    for asset in assets:
+        if not asset.image_name:
+            continue
+        if asset.error:
+            flags.append({'file': asset.path, 'reason': asset.error})
+        if asset.bytes > max_bytes:
+            flags.append({'file': asset.path, 'reason': f'文件过大 {format_bytes(asset.bytes)}'
+                                                      f'（上限 {format_bytes(max_bytes)}）'})
+        if asset.size and any(side > limit for side, limit in zip(sorted(asset.size), box)):
+            width, height = asset.size
+            flags.append({'file': asset.path, 'reason': f'分辨率 {width}×{height} 超过最大屏幕 '
+                                                      f'{box[0]}×{box[1]}'})
+    return flags
+
+
+def budget_limit(budgets, bucket):
+    """统计项的预算（字节），没有预算时返回 None；theme/* 等通配预算适用于同类的每一项"""
+    if bucket in budgets:
+        return budgets[bucket] * MB
+    prefix = bucket.split('/', 1)[0]
+    if '/' in bucket and f'{prefix}/*' in budgets:
+        return budgets[f'{prefix}/*'] * MB
+    return None
+
+
+def check_budgets(buckets, budgets):
+    results = []
+    for bucket in sorted(buckets):
+        limit = budget_limit(budgets, bucket)
+        if limit is not None:
+            results.append({'bucket': bucket, 'bytes': buckets[bucket], 'limit': round(limit),
+                            'ok': buckets[bucket] <= limit})
+    return results
+
+
+def load_budget(path):
+    """预算文件：{"budgetsMB": {"total": 30, "theme/*": 8, ...}, "images": {"maxMB": 3, ...}}"""
+    if not path or not os.path.exists(path):
+        return {'budgetsMB': {}, 'images': dict(DEFAULT_IMAGE_LIMITS)}
+    with open(path, 'r', encoding='utf-8') as f:
+        budget = json.load(f)
+    budget.setdefault('budgetsMB', {})
+    budget['images'] = dict(DEFAULT_IMAGE_LIMITS, **budget.get('images', {}))
+    return budget
+
+
+def analyze(project_path=PROJECT_DIR, budget=None, workers=DEFAULT_WORKERS):
+    """统计资源并检查预算，返回报告 dict"""
+    budget = budget or load_budget(None)
+    with stage('find_assets'):
+        assets = find_assets(project_path)
+    with stage('probe_assets'):
+        probe_assets(assets, project_path, workers)
+    themes_path = os.path.join(project_path, 'MotivationApp', 'Resources', 'wallpaper_themes.json')
+    catalog = load_catalog(themes_path)
+    with stage('attribute'):
+        buckets, flags = attribute(assets, catalog)
+        flags += check_images(assets, budget['images'])
+    return {
+        'generatedAt': datetime.now().isoformat(timespec='seconds'),
+        'buckets': buckets,
+        'budgets': check_budgets(buckets, budget['budgetsMB']),
+        'flags': flags,
+        'files': {asset.path: asset.to_dict() for asset in assets},
+    }
+
+
+def diff_reports(old, new):
+    """两次报告的差异：统计项的变化和变化最大的文件"""
+    old_buckets, new_buckets = old.get('buckets', {}), new['buckets']
+    buckets = []
+    for bucket in sorted(set(old_buckets) | set(new_buckets)):
+        before, after = old_buckets.get(bucket, 0), new_buckets.get(bucket, 0)
+        if before != after:
+            buckets.append({'bucket': bucket, 'before': before, 'after': after, 'delta': after - before})
+
+    old_files, new_files = old.get('files', {}), new['files']
+    files = []
+    for path in set(old_files) | set(new_files):
+        before = old_files[path]['bytes'] if path in old_files else None
+        after = new_files[path]['bytes'] if path in new_files else None
+        if before != after:
+            files.append({'file': path, 'before': before, 'after': after,
+                          'delta': (after or 0) - (before or 0)})
+    files.sort(key=lambda item: (-abs(item['delta']), item['file']))
+    return {'since': old.get('generatedAt'), 'buckets': buckets, 'files': files}
+
+
+def format_bytes(amount):
+    sign = '-' if amount < 0 else ''
+    amount = abs(amount)
+    if amount >= MB:
+        return f'{sign}{amount / MB:.2f} MB'
+    if amount >= 1024:
+        return f'{sign}{amount / 1024:.1f} KB'
+    return f'{sign}{amount} B'
+
+
+def format_delta(amount):
+    return ('+' if amount > 0 else '') + format_bytes(amount)
+
+
+def print_report(report, strict=False):
+    buckets = report['buckets']
+    print(f'📦 安装包资源合计: {format_bytes(buckets["total"])}')
+    for prefix, title in (('source/', '目录'), ('resource/', '资源文件'), ('tier/', '免费/付费'),
+                          ('theme/', '主题')):
+        items = sorted(((bucket, amount) for bucket, amount in buckets.items() if bucket.startswith(prefix)),
+                       key=lambda item: -item[1])
+        print(f'   {title}:')
+        for bucket, amount in items:
+            print(f'     {bucket[len(prefix):]:<24}{format_bytes(amount):>12}')
+    if buckets.get('unreferenced'):
+        print(f'   未被壁纸使用的图片: {format_bytes(buckets["unreferenced"])}')
+
+    for flag in report['flags']:
+        print(f'{"❌" if strict else "⚠️"} {flag["file"]}: {flag["reason"]}')
+    for result in report['budgets']:
+        if not result['ok']:
+            print(f'❌ 超出预算 {result["bucket"]}: {format_bytes(result["bytes"])}'
+                  f'（预算 {format_bytes(result["limit"])}）')
+
+
+def print_diff(diff):
+    if not diff['buckets'] and not diff['files']:
+        print(f'🟰 与上次报告（{diff["since"]}）相比没有变化')
+        return
+    print(f'📈 与上次报告（{diff["since"]}）相比:')
+    for item in diff['buckets']:
+        print(f'     {item["bucket"]:<28}{format_bytes(item["before"]):>12} → '
+              f'{format_bytes(item["after"]):>12}  {format_delta(item["delta"])}')
+    for item in diff['files'][:DIFF_TOP]:
+        if item['before'] is None:
+            change = f'新增 {format_bytes(item["after"])}'
+        elif item['after'] is None:
+            change = f'删除 {format_bytes(item["before"])}'
+        else:
+            change = format_delta(item['delta'])
+        print(f'     {item["file"]}: {change}')
+    if len(diff['files']) > DIFF_TOP:
+        print(f'     …… 共 {len(diff["files"])} 个文件有变化')
+
+
+def read_report(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f'⚠️ 无法读取上次的报告 {path}: {e}')
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='统计 App 资源体积并检查预算')
+    parser.add_argument('--budget', default=DEFAULT_BUDGET_PATH, help='预算文件')
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH, help='报告写入位置')
+    parser.add_argument('--baseline', help='与这个报告比较（默认为上一次写入 --report 的报告）')
+    parser.add_argument('--strict', action='store_true', help='有标记的图片时也返回失败')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    baseline = read_report(args.baseline or args.report)
+    report = analyze(PROJECT_DIR, load_budget(args.budget), args.workers)
+    print_report(report, args.strict)
+    if baseline is not None:
+        report['diff'] = diff_reports(baseline, report)
+        print_diff(report['diff'])
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'💾 报告已保存: {args.report}')
+
+    failed = any(not result['ok'] for result in report['budgets']) or (args.strict and report['flags'])
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
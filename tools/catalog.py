@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主题、壁纸、名言数据的共用模型（tools/ 下各脚本统一通过这里读写数据文件）
+
+- Theme、Wallpaper、Quote、Category：使用 __slots__ 的记录类型，比 dict 占用内存少得多；
+  重复出现的字符串（themeId、categoryId、作者等）会被驻留，只保存一份
+- 记录支持 get(字段, 默认值) 和 to_dict()，原数据中没有的字段为 None，写回时省略；
+  不认识的字段保存在 extra 中，读写一遍不会丢失
+- load_catalog(path)：一个加载函数读取 wallpaper_themes.json、quotes.json、theme_data.json，
+  按内容判断文件类型
+- Catalog：按 id、themeId、categoryId 查找记录，索引在第一次查找时才建立
+- 安装了 orjson（pip install orjson）时用它解析和生成 JSON，否则使用标准库 json；
+  两者生成的文件内容相同
+
+使用方法：
+python3 catalog.py                          # 显示项目中各数据文件的记录数和加载耗时
+python3 catalog.py --benchmark              # 与 dict 方式比较加载时间和内存
+python3 catalog.py --benchmark --count 200000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from instrument import stage
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+RESOURCES_DIR = os.path.join(PROJECT_DIR, 'MotivationApp', 'Resources')
+
+WALLPAPER_THEMES_PATH = os.path.join(RESOURCES_DIR, 'wallpaper_themes.json')
+QUOTES_PATH = os.path.join(RESOURCES_DIR, 'quotes.json')
+THEME_DATA_PATH = os.path.join(SCRIPT_DIR, 'theme_data.json')
+
+JSON_BACKEND = 'orjson' if orjson else 'json'
+
+
+# MARK: - JSON
+
+def json_default(value):
+    """标准库 json / orjson 不认识的类型：记录转为 dict，numpy 等标量取 Python 值"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f'无法转换为 JSON: {type(value).__name__}')
+
+
+def loads(data):
+    """解析 JSON（str 或 bytes）"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data, indent=True):
+    """生成 JSON 文本：indent 为 True 时缩进 2 格（与原来 json.dump(indent=2) 的格式相同），否则紧凑格式"""
+    with stage('encode_json'):
+        return encode_json(data, indent)
+
+
+def encode_json(data, indent):
+    if orjson:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(data, default=json_default, option=option).decode('utf-8')
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2, default=json_default)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=json_default)
+
+
+def read_json(path):
+    with stage('read_json'):
+        with open(path, 'rb') as f:
+            content = f.read()
+        with stage('parse_json'):
+            return loads(content)
+
+
+def write_json(path, data):
+    """写入缩进格式的 JSON 文件（记录对象会自动转为 dict）"""
+    with stage('write_json'):
+        text = dumps(data)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+# MARK: - 记录类型
+
+class Record:
+    """__slots__ 记录的基类
+
+    FIELDS 为已知字段；值为 None 表示原数据中没有该字段，to_dict 时省略。
+    INTERNED 中的字段值会被 sys.intern 驻留（大量记录共用同一个字符串）。
+    """
+
+    __slots__ = ('extra',)
+    FIELDS = ()
+    INTERNED = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELD_SET = frozenset(cls.FIELDS)
+        cls.PLAIN_FIELDS = tuple(name for name in cls.FIELDS if name not in cls.INTERNED)
+
+    def __init__(self, **fields):
+        self.assign(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """dict -> 记录（不复制 data，加载大量记录时比 cls(**data) 快）"""
+        record = cls.__new__(cls)
+        record.assign(data)
+        return record
+
+    def assign(self, data):
+        get = data.get
+        for name in self.PLAIN_FIELDS:
+            setattr(self, name, get(name))
+        for name in self.INTERNED:
+            value = get(name)
+            setattr(self, name, sys.intern(value) if type(value) is str else value)
+        if data.keys() <= self.FIELD_SET:
+            self.extra = None
+        else:
+            self.extra = {key: value for key, value in data.items() if key not in self.FIELD_SET}
+
+    def get(self, field, default=None):
+        """与 dict.get 相同的用法，方便同时接受记录和 dict 的代码"""
+        if field in self.FIELDS:
+            value = getattr(self, field)
+        else:
+            value = self.extra.get(field) if self.extra else None
+        return default if value is None else value
+
+    def to_dict(self):
+        data = {}
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+
+class Theme(Record):
+    """wallpaper_themes.json 中的主题"""
+    __slots__ = FIELDS = ('id', 'name', 'icon', 'colorHex', 'description', 'isPremium')
+
+
+class Wallpaper(Record):
+    """壁纸：wallpaper_themes.json 中 themeId 是主题 id、使用 isPremium；
+    theme_data.json 中 themeId 是主题名称、使用 isLocked，批量导入的还有 contentHash、width、height"""
+    __slots__ = FIELDS = ('id', 'themeId', 'name', 'imageName', 'isPremium',
+                          'isLocked', 'contentHash', 'width', 'height')
+    INTERNED = ('themeId',)
+
+
+class Quote(Record):
+    """quotes.json 中的名言"""
+    __slots__ = FIELDS = ('id', 'content', 'author', 'categoryId', 'isFavorite', 'createdDate')
+    INTERNED = ('author', 'categoryId', 'createdDate')
+
+
+class Category(Record):
+    """theme_data.json 中的主题分类（对应 App 中的 Category）"""
+    __slots__ = FIELDS = ('name', 'icon', 'colorHex', 'description', 'imageName',
+                          'type', 'isNew', 'isFeatured', 'tags')
+    INTERNED = ('type',)
+
+
+# MARK: - Catalog
+
+class Catalog:
+    """一组记录及其按需建立的索引
+
+    记录列表加载后视为只读；修改了列表时调用 invalidate() 丢弃已建立的索引。
+    """
+
+    def __init__(self, themes=(), wallpapers=(), quotes=(), categories=()):
+        self.themes = list(themes)
+        self.wallpapers = list(wallpapers)
+        self.quotes = list(quotes)
+        self.categories = list(categories)
+        self.indexes = {}
+
+    def invalidate(self):
+        self.indexes = {}
+
+    def unique_index(self, kind, field):
+        """{字段值: 记录}（值重复时保留第一条）"""
+        key = (kind, field, True)
+        index = self.indexes.get(key)
+        if index is None:
+            index = {}
+            for record in getattr(self, kind):
+                value = getattr(record, field)
+                if value is not None and value not in index:
+                    index[value] = record
+            self.indexes[key] = index
+        return index
+
+    def group_index(self, kind, field):
+        """{字段值: [记录, ...]}（保持原顺序）"""
+        key = (kind, field, False)
+        index = self.indexes.get(key)
+        if index is None:
+            index = {}
+            for record in getattr(self, kind):
+                index.setdefault(getattr(record, field), []).append(record)
+            self.indexes[key] = index
+        return index
+
+    def theme(self, theme_id):
+        return self.unique_index('themes', 'id').get(theme_id)
+
+    def wallpaper(self, wallpaper_id):
+        return self.unique_index('wallpapers', 'id').get(wallpaper_id)
+
+    def quote(self, quote_id):
+        return self.unique_index('quotes', 'id').get(quote_id)
+
+    def category(self, name):
+        return self.unique_index('categories', 'name').get(name)
+
+    def wallpapers_of(self, theme_id):
+        """themeId 为 theme_id 的壁纸（theme_data.json 中为主题名称）"""
+        return self.group_index('wallpapers', 'themeId').get(theme_id, [])
+
+    def quotes_in(self, category_id):
+        return self.group_index('quotes', 'categoryId').get(category_id, [])
+
+    def to_wallpaper_themes(self):
+        """wallpaper_themes.json 的数据结构"""
+        return {'themes': self.themes, 'wallpapers': self.wallpapers}
+
+
+def records(record_type, items):
+    from_dict = record_type.from_dict
+    return [from_dict(item) for item in items]
+
+
+def catalog_from_data(data):
+    """已解析的 JSON 数据 -> Catalog（按结构判断文件类型）"""
+    with stage('build_records'):
+        return build_catalog(data)
+
+
+def build_catalog(data):
+    if isinstance(data, list):
+        return Catalog(quotes=records(Quote, data))
+    if 'themes' in data:
+        return Catalog(themes=records(Theme, data['themes']),
+                       wallpapers=records(Wallpaper, data.get('wallpapers', [])))
+    if 'categories' in data:
+        return Catalog(categories=records(Category, data['categories']),
+                       wallpapers=records(Wallpaper, data.get('wallpapers', [])))
+    raise ValueError('无法识别的数据文件：应为 wallpaper_themes.json、quotes.json 或 theme_data.json')
+
+
+def load_catalog(path):
+    """读取 wallpaper_themes.json、quotes.json 或 theme_data.json"""
+    with stage('load_catalog'):
+        return catalog_from_data(read_json(path))
+
+
+# MARK: - 性能比较
+
+def sample_data(count):
+    """生成与项目数据结构相同的测试数据：count 个壁纸（100 个主题）和 count 条名言"""
+    theme_count = 100
+    themes = [{'id': f'{i:08d}-0000-0000-0000-000000000001', 'name': f'主题{i}', 'icon': 'leaf.fill',
+               'colorHex': '#FF9500', 'description': '四季更迭，感受自然之美', 'isPremium': i % 3 == 0}
+              for i in range(1, theme_count + 1)]
+    wallpapers = [{'id': f'{i // theme_count:08d}-0000-0000-0000-{i:012d}',
+                   'themeId': themes[i % theme_count]['id'], 'name': f'壁纸{i}',
+                   'imageName': f'wallpaper_{i}', 'isPremium': i % 5 == 0}
+                  for i in range(count)]
+    authors = ['鲁迅', '尼采', '雨果', '孔子', '老子', '佚名']
+    categories = ['励志', '自信', '生活', '学习', '工作', '健康']
+    quotes = [{'id': f'00000000-0000-4000-8000-{i:012d}', 'content': f'第 {i} 条名言：星光不问赶路人。',
+               'author': authors[i % len(authors)], 'categoryId': categories[i % len(categories)],
+               'isFavorite': i % 10 == 0, 'createdDate': '2025-12-09T00:00:00Z'}
+              for i in range(count)]
+    return {'themes': themes, 'wallpapers': wallpapers}, quotes
+
+
+def measure(load, path):
+    """返回 (最快加载耗时秒, 加载结果占用的内存字节)"""
+    best = None
+    for _ in range(3):
+        gc.collect()
+        start = time.perf_counter()
+        result = load(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    result = load(path)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return best, size, result
+
+
+def time_lookups(lookup, keys):
+    start = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    return time.perf_counter() - start
+
+
+def linear_lookup(items, field):
+    """原来的查找方式：逐条比较"""
+    return lambda key: next(item for item in items if item[field] == key)
+
+
+def load_dicts(path):
+    """原来的方式：json.load 得到 dict 列表"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def benchmark(count):
+    themes_data, quotes_data = sample_data(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        themes_path = os.path.join(tmp, 'wallpaper_themes.json')
+        quotes_path = os.path.join(tmp, 'quotes.json')
+        write_json(themes_path, themes_data)
+        write_json(quotes_path, quotes_data)
+        print(f'📊 {count} 个壁纸 + {count} 条名言，JSON 后端: {JSON_BACKEND}')
+        print(f'   {"文件":<22}{"方式":<8}{"加载":>10}{"内存":>12}{"查找 1000 次":>14}')
+        for label, path, kind, field in (('wallpaper_themes.json', themes_path, 'wallpapers', 'id'),
+                                         ('quotes.json', quotes_path, 'quotes', 'id')):
+            dict_time, dict_size, data = measure(load_dicts, path)
+            items = data[kind] if isinstance(data, dict) else data
+            keys = [items[i][field] for i in range(0, len(items), max(1, len(items) // 1000))][:1000]
+            # 线性查找太慢，只测均匀分布的 50 个再按比例换算
+            scan_time = time_lookups(linear_lookup(items, field), keys[::20]) * len(keys) / len(keys[::20])
+            data = items = None
+            catalog_time, catalog_size, catalog = measure(load_catalog, path)
+            lookup = catalog.wallpaper if kind == 'wallpapers' else catalog.quote
+            # 第一次查找包含建立索引的时间
+            index_time = time_lookups(lookup, keys)
+            print(f'   {label:<24}{"dict":<10}{dict_time * 1000:>8.0f} ms{dict_size / 1048576:>9.1f} MB'
+                  f'{scan_time * 1000:>13.0f} ms')
+            print(f'   {"":<24}{"Catalog":<10}{catalog_time * 1000:>8.0f} ms{catalog_size / 1048576:>9.1f} MB'
+                  f'{index_time * 1000:>13.1f} ms')
+            catalog = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='主题、壁纸、名言数据模型')
+    parser.add_argument('--benchmark', action='store_true', help='与 dict 方式比较加载时间和内存')
+    parser.add_argument('--count', type=int, default=100000, help='性能比较使用的记录数')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.count)
+        return
+    print(f'JSON 后端: {JSON_BACKEND}')
+    for path in (WALLPAPER_THEMES_PATH, QUOTES_PATH, THEME_DATA_PATH):
+        if not os.path.exists(path):
+            continue
+        start = time.perf_counter()
+        catalog = load_catalog(path)
+        elapsed = (time.perf_counter() - start) * 1000
+        counts = '、'.join(f'{kind} {len(getattr(catalog, kind))}'
+                          for kind in ('themes', 'categories', 'wallpapers', 'quotes')
+                          if getattr(catalog, kind))
+        print(f'✅ {os.path.relpath(path, PROJECT_DIR)}: {counts}（{elapsed:.1f} ms）')
+
+
+if __name__ == '__main__':
+    main()
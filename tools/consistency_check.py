@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主题、壁纸数据的跨数据源一致性检查
+
+同一份内容分别记录在四个地方：
+- MotivationApp/Models/Category.swift 中的 Category.sampleCategories
+- tools/theme_data.json（主题管理工具的数据，壁纸的 themeId 是主题名称；会重放 theme_data.journal 中尚未保存的编辑）
+- tools/Wallpapers/*/theme.json（scan_wallpapers.py 的输入）
+- MotivationApp/Resources/wallpaper_themes.json（scan_wallpapers.py 的输出，themeId 是主题 UUID）
+另外检查图片是否存在于 Assets.xcassets 或 tools/Wallpapers 中。
+
+每个数据源只读取一次，按共有的键（主题名称、主题 id、(主题, 壁纸名)、imageName）建立字典索引，
+所有检查都是字典查找，10 万条壁纸也只需要几秒（可运行 --benchmark 查看）。
+
+检查项：
+  duplicate      同一数据源中重复的主题名称、id 或同一主题下重复的壁纸名
+  dangling       壁纸的 themeId 找不到对应主题
+  theme_id       theme_data.json 中 themeId 写成了 UUID，或 wallpaper_themes.json 中写成了名称
+  missing_image  引用的图片在资源目录中找不到
+  drift          同一个主题/壁纸在两个数据源中的字段不同，或只出现在其中一个数据源中
+错误（theme_data.json、wallpaper_themes.json 中的 duplicate，dangling、theme_id，以及 wallpaper_themes.json 的 missing_image）使退出码为 1；
+其余为警告，加 --strict 时也算失败。
+
+使用方法：
+python3 consistency_check.py               # 检查项目数据
+python3 consistency_check.py --limit 0     # 列出全部问题（默认每个检查项最多列出 20 条）
+python3 consistency_check.py --strict      # 有警告时也返回失败（适合 CI）
+python3 consistency_check.py --benchmark   # 在生成的大数据量项目上测试速度
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+import swift_literals
+from bundle_size import find_assets
+from catalog import load_catalog, read_json, write_json
+from instrument import stage
+from scan_wallpapers import generate_uuid, parse_theme_dir_name
+from theme_model import ThemeModel, parse_category_object
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+CATEGORY_SWIFT = os.path.join('MotivationApp', 'Models', 'Category.swift')
+THEME_DATA = os.path.join('tools', 'theme_data.json')
+THEME_JOURNAL = os.path.join('tools', 'theme_data.journal')
+WALLPAPERS_DIR = os.path.join('tools', 'Wallpapers')
+WALLPAPER_THEMES = os.path.join('MotivationApp', 'Resources', 'wallpaper_themes.json')
+
+# 默认每个检查项最多列出的问题数
+DEFAULT_LIMIT = 20
+
+# 各数据源中主题共有的字段（Swift 与 theme_data.json 的主题分类字段完全相同）
+CATEGORY_FIELDS = ('icon', 'colorHex', 'description', 'imageName', 'type', 'isNew', 'isFeatured', 'tags')
+THEME_FIELDS = ('icon', 'colorHex', 'description', 'isPremium')
+
+UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+ERROR, WARNING = 'error', 'warning'
+
+
+class Sources:
+    """四个数据源和图片列表（不存在的数据源为 None）"""
+
+    def __init__(self):
+        self.swift_categories = None    # [主题分类 dict]
+        self.data_categories = None     # theme_data.json 的 Category 记录
+        self.data_wallpapers = None
+        self.theme_dirs = None          # [(目录名, 序号, 主题名, theme.json 内容)]
+        self.themes = None              # wallpaper_themes.json 的 Theme 记录
+        self.wallpapers = None
+        self.images = set()             # 资源目录中的 imageName
+        self.errors = []                # 读取失败的数据源 (路径, 错误)
+
+    def summary(self):
+        parts = []
+        if self.swift_categories is not None:
+            parts.append(f'Category.swift {len(self.swift_categories)} 个主题')
+        if self.data_categories is not None:
+            parts.append(f'theme_data.json {len(self.data_categories)} 个主题、{len(self.data_wallpapers)} 个壁纸')
+        if self.theme_dirs is not None:
+            parts.append(f'theme.json {len(self.theme_dirs)} 个')
+        if self.themes is not None:
+            parts.append(f'wallpaper_themes.json {len(self.themes)} 个主题、{len(self.wallpapers)} 个壁纸')
+        parts.append(f'图片 {len(self.images)} 张')
+        return '、'.join(parts)
+
+
+def load_sources(project_path=PROJECT_DIR):
+    sources = Sources()
+
+    def load(relative_path, loader, companions=()):
+        """数据源及其附属文件（如编辑日志）都不存在时跳过"""
+        path = os.path.join(project_path, relative_path)
+        if not any(os.path.exists(os.path.join(project_path, p)) for p in (relative_path, *companions)):
+            return
+        try:
+            with stage(f'load/{os.path.basename(relative_path)}'):
+                loader(path)
+        except Exception as e:
+            sources.errors.append((relative_path, str(e)))
+
+    def load_swift(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            records = swift_literals.extract_records(f.read(), 'sampleCategories')
+        if records is None:
+            raise ValueError('未找到 sampleCategories 数组')
+        sources.swift_categories = [category for category in map(parse_category_object, records) if category]
+
+    def load_theme_data(path):
+        # 与管理工具看到的数据一致：快照加上编辑日志中尚未保存的编辑（只读，不改动文件）
+        stores = ThemeModel(project_path, path).read_saved()
+        sources.data_categories, sources.data_wallpapers = stores['categories'].records(), stores['wallpapers'].records()
+
+    def load_theme_dirs(path):
+        theme_dirs = []
+        for dir_name in sorted(os.listdir(path)):
+            theme_json = os.path.join(path, dir_name, 'theme.json')
+            index, name, _ = parse_theme_dir_name(dir_name)
+            if index and os.path.exists(theme_json):
+                theme_dirs.append((dir_name, index, name, read_json(theme_json)))
+        sources.theme_dirs = theme_dirs
+
+    def load_wallpaper_themes(path):
+        data = load_catalog(path)
+        sources.themes, sources.wallpapers = data.themes, data.wallpapers
+
+    load(CATEGORY_SWIFT, load_swift)
+    load(THEME_DATA, load_theme_data, companions=(THEME_JOURNAL,))
+    load(WALLPAPERS_DIR, load_theme_dirs)
+    load(WALLPAPER_THEMES, load_wallpaper_themes)
+    with stage('load/images'):
+        # 只有 Contents.json、没有图片文件的 imageset 不算
+        sources.images = {asset.image_name for asset in find_assets(project_path) if asset.image_name}
+    return sources
+
+
+class Report:
+    """检查结果：按检查项分组的问题"""
+
+    def __init__(self):
+        self.issues = {}    # 检查项 -> [(级别, 说明)]
+
+    def add(self, check, severity, message):
+        self.issues.setdefault(check, []).append((severity, message))
+
+    def count(self, severity):
+        return sum(1 for issues in self.issues.values() for level, _ in issues if level == severity)
+
+
+def index_by(records, key):
+    """键 -> [记录]（保留重复，用于检查重复项）"""
+    index = {}
+    for record in records:
+        index.setdefault(key(record), []).append(record)
+    return index
+
+
+def report_duplicates(report, label, index, what, severity=ERROR):
+    for key, records in index.items():
+        if len(records) > 1:
+            report.add('duplicate', severity, f'{label}: {what} {key} 出现 {len(records)} 次')
+
+
+def compare_fields(report, label, key, left, right, fields):
+    """同一条记录在两个数据源中的字段差异"""
+    for field in fields:
+        a, b = left.get(field), right.get(field)
+        if a != b and not (a in (None, '') and b in (None, '')):
+            report.add('drift', WARNING, f'{label} {key}.{field}: {a!r} ≠ {b!r}')
+
+
+def compare_keys(report, label, left_name, left, right_name, right, what):
+    """只出现在其中一个数据源中的键"""
+    for key in left.keys() - right.keys():
+        report.add('drift', WARNING, f'{label}: {what} {key} 只在 {left_name} 中')
+    for key in right.keys() - left.keys():
+        report.add('drift', WARNING, f'{label}: {what} {key} 只在 {right_name} 中')
+
+
+def check(sources):
+    """在已加载的数据源上运行所有检查，返回 Report"""
+    report = Report()
+    for path, error in sources.errors:
+        report.add('load', ERROR, f'{path} 读取失败: {error}')
+
+    swift_by_name = data_by_name = dirs_by_name = themes_by_id = themes_by_name = None
+    if sources.swift_categories is not None:
+        swift_by_name = index_by(sources.swift_categories, lambda c: c.get('name', ''))
+        # App 中主题按 UUID 区分，示例数据允许同名；只有 theme_data.json 中壁纸按名称引用主题
+        report_duplicates(report, 'Category.swift', swift_by_name, '主题', WARNING)
+    if sources.data_categories is not None:
+        data_by_name = index_by(sources.data_categories, lambda c: c.get('name', ''))
+        report_duplicates(report, 'theme_data.json', data_by_name, '主题')
+    if sources.theme_dirs is not None:
+        dirs_by_name = index_by(sources.theme_dirs, lambda d: d[3].get('name', d[2]))
+        report_duplicates(report, 'Wallpapers', dirs_by_name, '主题')
+    if sources.themes is not None:
+        themes_by_id = index_by(sources.themes, lambda t: t.id)
+        themes_by_name = index_by(sources.themes, lambda t: t.name)
+        report_duplicates(report, 'wallpaper_themes.json', themes_by_id, '主题 id')
+        report_duplicates(report, 'wallpaper_themes.json', themes_by_name, '主题')
+        report_duplicates(report, 'wallpaper_themes.json', index_by(sources.wallpapers, lambda w: w.id), '壁纸 id')
+
+    with stage('check_theme_data'):
+        if data_by_name is not None:
+            check_theme_data(report, sources, data_by_name, themes_by_id)
+    with stage('check_wallpaper_themes'):
+        if themes_by_id is not None:
+            check_wallpaper_themes(report, sources, themes_by_id)
+    with stage('check_categories'):
+        if swift_by_name is not None and data_by_name is not None:
+            compare_keys(report, '主题分类', 'Category.swift', swift_by_name, 'theme_data.json', data_by_name, '主题')
+            for name in swift_by_name.keys() & data_by_name.keys():
+                compare_fields(report, 'Category.swift ↔ theme_data.json', name,
+                               swift_by_name[name][0], data_by_name[name][0], CATEGORY_FIELDS)
+        if swift_by_name is not None:
+            for category in sources.swift_categories:
+                if category.get('imageName') and category['imageName'] not in sources.images:
+                    report.add('missing_image', WARNING,
+                               f'Category.swift: 主题 {category["name"]} 的图片 {category["imageName"]} 不存在')
+    with stage('check_theme_dirs'):
+        if dirs_by_name is not None:
+            check_theme_dirs(report, sources, dirs_by_name, themes_by_name)
+    with stage('check_wallpapers'):
+        if data_by_name is not None and themes_by_id is not None:
+            check_wallpaper_drift(report, sources, themes_by_id)
+    return report
+
+
+def check_theme_data(report, sources, data_by_name, themes_by_id):
+    """theme_data.json：themeId 应为主题名称，图片应存在"""
+    seen = set()
+    for wallpaper in sources.data_wallpapers:
+        theme_id = wallpaper.get('themeId', '')
+        if theme_id not in data_by_name:
+            if UUID_PATTERN.match(theme_id or ''):
+                theme = themes_by_id.get(theme_id) if themes_by_id else None
+                hint = f'（wallpaper_themes.json 中为 {theme[0].name}）' if theme else ''
+                report.add('theme_id', ERROR, f'theme_data.json: 壁纸 {wallpaper.get("name")} 的 themeId 是 UUID '
+                                              f'{theme_id}，应为主题名称{hint}')
+            else:
+                report.add('dangling', ERROR, f'theme_data.json: 壁纸 {wallpaper.get("name")} 的主题 {theme_id!r} 不存在')
+        key = (theme_id, wallpaper.get('name'))
+        if key in seen:
+            report.add('duplicate', ERROR, f'theme_data.json: 主题 {theme_id} 下的壁纸 {key[1]} 重复')
+        seen.add(key)
+        image_name = wallpaper.get('imageName')
+        if image_name and image_name not in sources.images:
+            report.add('missing_image', WARNING, f'theme_data.json: 壁纸 {wallpaper.get("name")} 的图片 {image_name} 不存在')
+
+
+def check_wallpaper_themes(report, sources, themes_by_id):
+    """wallpaper_themes.json：themeId 应为存在的主题 UUID，图片应存在（这个文件会打进 App）"""
+    names = {theme.name for theme in sources.themes}
+    for wallpaper in sources.wallpapers:
+        theme_id = wallpaper.themeId or ''
+        if theme_id not in themes_by_id:
+            if theme_id in names:
+                report.add('theme_id', ERROR, f'wallpaper_themes.json: 壁纸 {wallpaper.name} 的 themeId 是主题名称 '
+                                              f'{theme_id}，应为主题 UUID')
+            else:
+                report.add('dangling', ERROR, f'wallpaper_themes.json: 壁纸 {wallpaper.name} 的主题 {theme_id} 不存在')
+        if wallpaper.imageName not in sources.images:
+            report.add('missing_image', ERROR,
+                       f'wallpaper_themes.json: 壁纸 {wallpaper.name} 的图片 {wallpaper.imageName} 不存在')
+
+
+def check_theme_dirs(report, sources, dirs_by_name, themes_by_name):
+    """theme.json 与 wallpaper_themes.json：scan_wallpapers.py 之后有没有再修改过"""
+    if themes_by_name is None:
+        return
+    compare_keys(report, '壁纸主题', 'Wallpapers', dirs_by_name, 'wallpaper_themes.json', themes_by_name, '主题')
+    wallpapers_by_theme = index_by(sources.wallpapers, lambda w: w.themeId)
+    for name in dirs_by_name.keys() & themes_by_name.keys():
+        dir_name, index, _, config = dirs_by_name[name][0]
+        theme = themes_by_name[name][0]
+        label = 'theme.json ↔ wallpaper_themes.json'
+        compare_fields(report, label, name, config, theme, THEME_FIELDS)
+        if theme.id != generate_uuid(index, 1):
+            report.add('drift', WARNING, f'{label} {name}: id {theme.id} 与目录 {dir_name} 的序号不符')
+        listed = {w.get('name'): w for w in config.get('wallpapers', [])}
+        generated = {w.name: w for w in wallpapers_by_theme.get(theme.id, [])}
+        compare_keys(report, f'{label} {name}', 'theme.json', listed, 'wallpaper_themes.json', generated, '壁纸')
+        for wallpaper_name in listed.keys() & generated.keys():
+            entry, wallpaper = listed[wallpaper_name], generated[wallpaper_name]
+            compare_fields(report, label, f'{name}/{wallpaper_name}', {'imageName': entry.get('file'),
+                           'isPremium': entry.get('isPremium', False)}, wallpaper, ('imageName', 'isPremium'))
+
+
+def check_wallpaper_drift(report, sources, themes_by_id):
+    """theme_data.json 与 wallpaper_themes.json 的壁纸：按 (主题名称, 壁纸名) 对应"""
+    data = {(w.get('themeId'), w.get('name')): w for w in sources.data_wallpapers}
+    shipped = {}
+    for wallpaper in sources.wallpapers:
+        theme = themes_by_id.get(wallpaper.themeId)
+        shipped[(theme[0].name if theme else wallpaper.themeId, wallpaper.name)] = wallpaper
+    label = 'theme_data.json ↔ wallpaper_themes.json'
+    compare_keys(report, label, 'theme_data.json', data, 'wallpaper_themes.json', shipped, '壁纸')
+    for key in data.keys() & shipped.keys():
+        left, right = data[key], shipped[key]
+        compare_fields(report, label, '/'.join(key), {'imageName': left.get('imageName'),
+                       'isPremium': bool(left.get('isLocked'))}, right, ('imageName', 'isPremium'))
+
+
+def print_report(report, limit=DEFAULT_LIMIT):
+    for check_name in sorted(report.issues):
+        issues = report.issues[check_name]
+        shown = issues if not limit else issues[:limit]
+        for severity, message in shown:
+            print(f'{"❌" if severity == ERROR else "⚠️"} [{check_name}] {message}')
+        if len(shown) < len(issues):
+            print(f'   …… [{check_name}] 共 {len(issues)} 条')
+
+
+# MARK: - 性能测试
+
+def generate_benchmark_project(project_path, count):
+    """生成 count 个壁纸（每个主题 100 个）的四个数据源，并故意加入少量不一致"""
+    theme_count = max(1, count // 100)
+    names = [f'主题{i}' for i in range(1, theme_count + 1)]
+    categories = [{'name': name, 'icon': 'star.fill', 'colorHex': f'#{i:06X}', 'description': f'描述 {i}',
+                   'imageName': f'cover_{i}', 'type': 'normal', 'isNew': False, 'isFeatured': i % 7 == 0,
+                   'tags': ['推荐'] if i % 5 == 0 else []} for i, name in enumerate(names, start=1)]
+    images = [f'image_{i}' for i in range(max(1, count // 10))]
+
+    swift = ['extension Category {\n    static let sampleCategories: [Category] = [\n']
+    for i, category in enumerate(categories, start=1):
+        color = '#000000' if i % 101 == 0 else category['colorHex']
+        tags = ', '.join(f'"{tag}"' for tag in category['tags'])
+        swift.append(f'        Category(name: "{category["name"]}", icon: "{category["icon"]}", colorHex: "{color}", '
+                     f'description: "{category["description"]}", imageName: "{category["imageName"]}", '
+                     f'type: .normal, isNew: false, isFeatured: {str(category["isFeatured"]).lower()}, '
+                     f'tags: [{tags}]),\n')
+    swift.append('    ]\n}\n')
+    models_dir = os.path.join(project_path, 'MotivationApp', 'Models')
+    os.makedirs(models_dir)
+    with open(os.path.join(project_path, CATEGORY_SWIFT), 'w', encoding='utf-8') as f:
+        f.write(''.join(swift))
+
+    themes, wallpapers, data_wallpapers = [], [], []
+    for i, name in enumerate(names, start=1):
+        theme_id = generate_uuid(i, 1)
+        themes.append({'id': theme_id, 'name': name, 'icon': 'star.fill', 'colorHex': f'#{i:06X}',
+                       'description': f'描述 {i}', 'isPremium': i % 3 == 0})
+        listed = []
+        for j in range(1, 101):
+            number = (i - 1) * 100 + j
+            image_name = 'image_missing' if number % 89 == 0 else images[number % len(images)]
+            wallpapers.append({'id': generate_uuid(i * 10, j), 'themeId': theme_id, 'name': f'壁纸{j}',
+                               'imageName': image_name, 'isPremium': j % 4 == 0})
+            data_wallpapers.append({'name': f'壁纸{j}', 'themeId': theme_id if number % 97 == 0 else name,
+                                    'imageName': image_name, 'isLocked': j % 4 == 0})
+            listed.append({'name': f'壁纸{j}', 'file': image_name, 'isPremium': j % 4 == 0})
+        theme_dir = os.path.join(project_path, WALLPAPERS_DIR, f'{i:02d}_{name}')
+        os.makedirs(theme_dir)
+        write_json(os.path.join(theme_dir, 'theme.json'),
+                   {'name': name, 'icon': 'star.fill', 'colorHex': f'#{i:06X}', 'description': f'描述 {i}',
+                    'isPremium': i % 3 == 0, 'wallpapers': listed})
+    write_json(os.path.join(project_path, THEME_DATA), {'categories': categories, 'wallpapers': data_wallpapers})
+    write_json(os.path.join(project_path, WALLPAPER_THEMES), {'themes': themes, 'wallpapers': wallpapers})
+    image_dir = os.path.join(project_path, WALLPAPERS_DIR, 'images')
+    os.makedirs(image_dir)
+    for image_name in images + [category['imageName'] for category in categories]:
+        open(os.path.join(image_dir, f'{image_name}.jpg'), 'wb').close()
+
+
+def benchmark(count):
+    with tempfile.TemporaryDirectory() as tmp:
+        for relative_path in (THEME_DATA, WALLPAPER_THEMES):
+            os.makedirs(os.path.dirname(os.path.join(tmp, relative_path)), exist_ok=True)
+        start = time.perf_counter()
+        generate_benchmark_project(tmp, count)
+        print(f'📊 生成 {count} 个壁纸、{max(1, count // 100)} 个主题的测试项目（{time.perf_counter() - start:.1f} s）')
+
+        start = time.perf_counter()
+        sources = load_sources(tmp)
+        loaded = time.perf_counter()
+        report = check(sources)
+        finished = time.perf_counter()
+        print(f'   加载: {(loaded - start) * 1000:.0f} ms（{sources.summary()}）')
+        print(f'   检查: {(finished - loaded) * 1000:.0f} ms')
+        for check_name in sorted(report.issues):
+            print(f'   [{check_name}] {len(report.issues[check_name])} 条')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查主题和壁纸数据在各数据源之间是否一致')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help='每个检查项最多列出的问题数（0 表示全部）')
+    parser.add_argument('--strict', action='store_true', help='有警告时也返回失败')
+    parser.add_argument('--benchmark', action='store_true', help='在生成的大数据量项目上测试速度')
+    parser.add_argument('--count', type=int, default=100000, help='性能测试的壁纸数')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.count)
+        return 0
+
+    start = time.perf_counter()
+    sources = load_sources(PROJECT_DIR)
+    print(f'🔍 已加载: {sources.summary()}')
+    report = check(sources)
+    print_report(report, args.limit)
+    errors, warnings = report.count(ERROR), report.count(WARNING)
+    print(f'📋 错误 {errors} 条，警告 {warnings} 条（用时 {time.perf_counter() - start:.2f} s）')
+    return 1 if errors or (args.strict and warnings) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
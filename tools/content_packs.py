@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可下载壁纸内容包的发布：按内容哈希命名的分块包、带版本号的清单和版本间的增量清单
+
+- 从 wallpaper_themes.json（scan_wallpapers.py 的输出）取出付费壁纸的图片
+  （只要有一个免费壁纸使用的图片仍然打进 App；--all 时全部发布）
+- 按主题、imageName 排序后依次写入内容包，每个包不超过 chunk 大小（单张更大的图片单独一个包）；
+  包文件名是内容的 SHA-256，内容相同的包只保存一份，内容相同的图片只写入一次
+- 清单 manifests/v<版本>.json 记录每张图片的哈希、大小、所在包和偏移，
+  客户端可以用 HTTP Range 只取需要的图片
+- 与最近几个版本比较生成增量清单 manifests/delta_<旧>_<新>.json，只包含新增和修改的图片及删除列表
+- latest.json 指向最新版本的清单和可用的增量清单
+- 与上一版本相比没有变化时不发布新版本
+
+输出目录（默认 tools/content_packs/）：
+  latest.json
+  manifests/v1.json、manifests/v2.json、manifests/delta_1_2.json ……
+  packs/<哈希>.pack
+
+清单格式：
+{
+  "version": 2, "createdAt": "...", "chunkBytes": 4194304, "totalBytes": 123456,
+  "packs": {"<包 id>": {"file": "packs/<包 id>.pack", "bytes": 123456}},
+  "files": {"<imageName>": {"hash": "...", "bytes": 1234, "ext": ".jpg", "theme": "美食",
+                            "isPremium": true, "pack": "<包 id>", "offset": 0}}
+}
+
+使用方法：
+python3 content_packs.py publish                 # 发布付费壁纸的新版本（没有变化时跳过）
+python3 content_packs.py publish --all           # 包括免费壁纸
+python3 content_packs.py list                    # 列出已发布的版本
+python3 content_packs.py diff 1 3                # 比较两个版本
+本地测试服务器和客户端模拟见 pack_server.py。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from bundle_size import find_assets, wallpaper_images
+from catalog import load_catalog
+from export_registry import file_hash
+from instrument import count, stage
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+DEFAULT_OUTPUT_DIR = os.path.join(SCRIPT_DIR, 'content_packs')
+
+# 每个内容包的最大字节数：足够大减少请求数，又不会因为一张图片变化重新下载太多
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+
+# 为最近几个版本生成到新版本的增量清单（更早的客户端做完整更新）
+DELTA_HISTORY = 5
+
+# 计算图片哈希的线程数
+DEFAULT_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+
+# 包 id 取内容哈希的前几位
+PACK_ID_LENGTH = 20
+
+MB = 1024 * 1024
+
+
+class PackEntry:
+    """一张要发布的图片"""
+
+    __slots__ = ('image_name', 'path', 'theme', 'is_premium', 'hash', 'bytes')
+
+    def __init__(self, image_name, path, theme, is_premium):
+        self.image_name = image_name
+        self.path = path
+        self.theme = theme
+        self.is_premium = is_premium
+        self.hash = None
+        self.bytes = 0
+
+
+def catalog_entries(project_path=PROJECT_DIR, include_free=False):
+    """wallpaper_themes.json -> [PackEntry]，以及找不到图片的 imageName 列表"""
+    catalog = load_catalog(os.path.join(project_path, 'MotivationApp', 'Resources', 'wallpaper_themes.json'))
+    images = wallpaper_images(find_assets(project_path))
+    themes_by_id = {theme.id: theme for theme in catalog.themes}
+
+    # imageName -> (第一个使用它的主题, 是否只被付费壁纸使用)
+    users = {}
+    for wallpaper in catalog.wallpapers:
+        theme = themes_by_id.get(wallpaper.themeId)
+        theme_name = theme.name if theme else wallpaper.themeId
+        is_premium = bool(wallpaper.isPremium or (theme and theme.isPremium))
+        first_theme, premium_only = users.get(wallpaper.imageName, (theme_name, True))
+        users[wallpaper.imageName] = (first_theme, premium_only and is_premium)
+
+    entries, missing = [], []
+    for image_name, (theme_name, premium_only) in users.items():
+        if not premium_only and not include_free:
+            continue
+        asset = images.get(image_name)
+        if asset is None:
+            missing.append(image_name)
+            continue
+        entries.append(PackEntry(image_name, os.path.join(project_path, asset.path), theme_name, premium_only))
+    return entries, missing
+
+
+def hash_entries(entries, workers=DEFAULT_WORKERS):
+    def probe(entry):
+        entry.hash = file_hash(entry.path)
+        entry.bytes = os.path.getsize(entry.path)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(probe, entries))
+    count('pack_files', len(entries))
+
+
+# MARK: - 清单
+
+def manifest_path(version):
+    return os.path.join('manifests', f'v{version}.json')
+
+
+def delta_path(from_version, to_version):
+    return os.path.join('manifests', f'delta_{from_version}_{to_version}.json')
+
+
+def read_json_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json_file(path, data):
+    """先写临时文件再替换：客户端不会读到写了一半的清单"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_latest(output_dir):
+    path = os.path.join(output_dir, 'latest.json')
+    return read_json_file(path) if os.path.exists(path) else None
+
+
+def load_manifest(output_dir, version):
+    return read_json_file(os.path.join(output_dir, manifest_path(version)))
+
+
+def published_versions(output_dir):
+    manifests_dir = os.path.join(output_dir, 'manifests')
+    if not os.path.isdir(manifests_dir):
+        return []
+    versions = []
+    for file_name in os.listdir(manifests_dir):
+        if file_name.startswith('v') and file_name.endswith('.json') and file_name[1:-5].isdigit():
+            versions.append(int(file_name[1:-5]))
+    return sorted(versions)
+
+
+def content_key(files):
+    """清单中决定客户端内容的部分（不含包的位置：重新分包但图片不变时不算变化）"""
+    return {name: (entry['hash'], entry['theme'], entry['isPremium']) for name, entry in files.items()}
+
+
+def compute_delta(old, new):
+    """旧版本清单 -> 新版本清单 的增量：新增和修改的图片（新清单中的位置）和删除的 imageName"""
+    files = {name: entry for name, entry in new['files'].items()
+             if name not in old['files'] or old['files'][name]['hash'] != entry['hash']}
+    removed = sorted(name for name in old['files'] if name not in new['files'])
+    # 只有主题或付费状态变化的图片不需要重新下载，但客户端需要新的属性
+    updated = {name: {key: entry[key] for key in ('theme', 'isPremium')}
+               for name, entry in new['files'].items()
+               if name in old['files'] and name not in files
+               and (old['files'][name]['theme'], old['files'][name]['isPremium'])
+               != (entry['theme'], entry['isPremium'])}
+    return {
+        'from': old['version'],
+        'to': new['version'],
+        'files': files,
+        'updated': updated,
+        'removed': removed,
+        'packs': {pack_id: new['packs'][pack_id] for pack_id in {entry['pack'] for entry in files.values()}},
+        'fetchBytes': sum(entry['bytes'] for entry in files.values()),
+        'totalBytes': new['totalBytes'],
+    }
+
+
+# MARK: - 发布
+
+def plan_packs(entries, chunk_bytes):
+    """按主题、imageName 排序分包，返回 [[PackEntry]]；内容相同的图片只放一次"""
+    packs, current, current_bytes = [], [], 0
+    seen = set()
+    for entry in sorted(entries, key=lambda e: (e.theme, e.image_name)):
+        if entry.hash in seen:
+            continue
+        seen.add(entry.hash)
+        if current and (current_bytes + entry.bytes > chunk_bytes or current[0].theme != entry.theme):
+            packs.append(current)
+            current, current_bytes = [], 0
+        current.append(entry)
+        current_bytes += entry.bytes
+    if current:
+        packs.append(current)
+    return packs
+
+
+def write_pack(output_dir, pack):
+    """写入一个内容包，返回 (包 id, 字节数, {哈希: 偏移})；同样内容的包已存在时不重写"""
+    digest = hashlib.sha256()
+    offsets = {}
+    packs_dir = os.path.join(output_dir, 'packs')
+    os.makedirs(packs_dir, exist_ok=True)
+    tmp_path = os.path.join(packs_dir, f'.writing_{os.getpid()}.tmp')
+    offset = 0
+    with open(tmp_path, 'wb') as out:
+        for entry in pack:
+            with open(entry.path, 'rb') as f:
+                data = f.read()
+            if hashlib.sha256(data).hexdigest() != entry.hash:
+                os.remove(tmp_path)
+                raise ValueError(f'发布过程中图片被修改: {entry.path}')
+            out.write(data)
+            digest.update(data)
+            offsets[entry.hash] = offset
+            offset += len(data)
+    pack_id = digest.hexdigest()[:PACK_ID_LENGTH]
+    pack_path = os.path.join(packs_dir, f'{pack_id}.pack')
+    if os.path.exists(pack_path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, pack_path)
+    return pack_id, offset, offsets
+
+
+def build_manifest(output_dir, entries, version, chunk_bytes):
+    manifest = {
+        'version': version,
+        'createdAt': datetime.now().isoformat(timespec='seconds'),
+        'chunkBytes': chunk_bytes,
+        'totalBytes': 0,
+        'packs': {},
+        'files': {},
+    }
+    locations = {}      # 图片哈希 -> (包 id, 偏移)
+    with stage('write_packs'):
+        for pack in plan_packs(entries, chunk_bytes):
+            pack_id, size, offsets = write_pack(output_dir, pack)
+            manifest['packs'][pack_id] = {'file': f'packs/{pack_id}.pack', 'bytes': size}
+            manifest['totalBytes'] += size
+            for content_hash, offset in offsets.items():
+                locations[content_hash] = (pack_id, offset)
+    for entry in sorted(entries, key=lambda e: e.image_name):
+        pack_id, offset = locations[entry.hash]
+        manifest['files'][entry.image_name] = {
+            'hash': entry.hash,
+            'bytes': entry.bytes,
+            'ext': os.path.splitext(entry.path)[1].lower(),
+            'theme': entry.theme,
+            'isPremium': entry.is_premium,
+            'pack': pack_id,
+            'offset': offset,
+        }
+    return manifest
+
+
+def publish(entries, output_dir=DEFAULT_OUTPUT_DIR, chunk_bytes=DEFAULT_CHUNK_BYTES, force=False,
+            workers=DEFAULT_WORKERS):
+    """发布新版本，返回新清单；与上一版本内容相同（且未指定 force）时返回 None"""
+    with stage('hash_files'):
+        hash_entries(entries, workers)
+    latest = load_latest(output_dir)
+    previous = load_manifest(output_dir, latest['version']) if latest else None
+    version = latest['version'] + 1 if latest else 1
+    if previous and not force:
+        candidate = {entry.image_name: (entry.hash, entry.theme, entry.is_premium) for entry in entries}
+        if content_key(previous['files']) == candidate:
+            return None
+
+    manifest = build_manifest(output_dir, entries, version, chunk_bytes)
+    write_json_file(os.path.join(output_dir, manifest_path(version)), manifest)
+
+    deltas = {}
+    with stage('write_deltas'):
+        for old_version in [v for v in published_versions(output_dir) if v < version][-DELTA_HISTORY:]:
+            delta = compute_delta(load_manifest(output_dir, old_version), manifest)
+            write_json_file(os.path.join(output_dir, delta_path(old_version, version)), delta)
+            deltas[str(old_version)] = {'file': delta_path(old_version, version).replace(os.sep, '/'),
+                                        'fetchBytes': delta['fetchBytes']}
+    # latest.json 最后写入：写入之前客户端看到的仍是完整的旧版本
+    write_json_file(os.path.join(output_dir, 'latest.json'), {
+        'version': version,
+        'manifest': manifest_path(version).replace(os.sep, '/'),
+        'totalBytes': manifest['totalBytes'],
+        'deltas': deltas,
+    })
+    return manifest
+
+
+def format_bytes(amount):
+    if amount >= MB:
+        return f'{amount / MB:.2f} MB'
+    return f'{amount / 1024:.1f} KB'
+
+
+def print_delta(delta):
+    print(f'🔀 v{delta["from"]} → v{delta["to"]}: 下载 {len(delta["files"])} 张 {format_bytes(delta["fetchBytes"])}'
+          f'（完整 {format_bytes(delta["totalBytes"])}），删除 {len(delta["removed"])} 张，'
+          f'属性变化 {len(delta["updated"])} 张')
+    for name, entry in sorted(delta['files'].items()):
+        print(f'   ➕ {name}（{entry["theme"]}，{format_bytes(entry["bytes"])}）')
+    for name in delta['removed']:
+        print(f'   ➖ {name}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='发布可下载的壁纸内容包')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help='输出目录')
+    commands = parser.add_subparsers(dest='command', required=True)
+    publish_parser = commands.add_parser('publish', help='发布新版本')
+    publish_parser.add_argument('--all', action='store_true', help='包括免费壁纸')
+    publish_parser.add_argument('--chunk-mb', type=float, default=DEFAULT_CHUNK_BYTES / MB, help='每个包的最大 MB')
+    publish_parser.add_argument('--force', action='store_true', help='没有变化也发布新版本')
+    commands.add_parser('list', help='列出已发布的版本')
+    diff_parser = commands.add_parser('diff', help='比较两个版本')
+    diff_parser.add_argument('old', type=int)
+    diff_parser.add_argument('new', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'publish':
+        entries, missing = catalog_entries(PROJECT_DIR, args.all)
+        for image_name in missing:
+            print(f'⚠️ 找不到图片 {image_name}，未发布')
+        manifest = publish(entries, args.output, int(args.chunk_mb * MB), args.force)
+        if manifest is None:
+            print(f'⏭️ {len(entries)} 张图片与上一版本相同，没有发布新版本')
+            return 0
+        print(f'✅ 已发布 v{manifest["version"]}: {len(manifest["files"])} 张图片，'
+              f'{len(manifest["packs"])} 个内容包，{format_bytes(manifest["totalBytes"])}')
+        for old_version, delta in load_latest(args.output)['deltas'].items():
+            print(f'   增量 v{old_version} → v{manifest["version"]}: {format_bytes(delta["fetchBytes"])}')
+    elif args.command == 'list':
+        latest = load_latest(args.output)
+        for version in published_versions(args.output):
+            manifest = load_manifest(args.output, version)
+            mark = '（最新）' if latest and version == latest['version'] else ''
+            print(f'📦 v{version}{mark} {manifest["createdAt"]}: {len(manifest["files"])} 张图片，'
+                  f'{len(manifest["packs"])} 个内容包，{format_bytes(manifest["totalBytes"])}')
+    elif args.command == 'diff':
+        print_delta(compute_delta(load_manifest(args.output, args.old), load_manifest(args.output, args.new)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,23 @@
 #!/usr/bin/env python3
 """
 将 wallpaper_themes.json 转换为 Excel 文件
+
+源数据未变化时跳过导出（见 export_registry.py），使用 --force 强制重新导出
 """
 
-import json
-import pandas as pd
-from datetime import datetime
+import instrument
 import os
+import sys
+
+with instrument.stage('import_pandas'):
+    import pandas as pd
+
+import export_registry
+from catalog import load_catalog
+
+EXPORT_KIND = 'wallpaper_themes'
 
-def json_to_excel():
+def json_to_excel(force=False, keep=export_registry.DEFAULT_KEEP):
     # 获取脚本所在目录
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
@@ -16,30 +25,42 @@ def json_to_excel():
     # JSON 文件路径
     json_path = os.path.join(project_root, 'MotivationApp', 'Resources', 'wallpaper_themes.json')
     
-    # 读取 JSON 文件
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # 源数据未变化时直接复用已有导出
+    digest = export_registry.file_hash(json_path)
+    existing = export_registry.find_export(EXPORT_KIND, digest)
+    if existing and not force:
+        export_registry.mark_latest(EXPORT_KIND, existing)
+        print(f'⏭️ 数据未变化，跳过导出: {existing}')
+        return existing
     
-    # 转换主题数据
-    themes_df = pd.DataFrame(data['themes'])
-    themes_df = themes_df[['id', 'name', 'icon', 'colorHex', 'description', 'isPremium']]
+    # 读取 JSON 文件
+    catalog = load_catalog(json_path)
     
-    # 转换壁纸数据
-    wallpapers_df = pd.DataFrame(data['wallpapers'])
-    wallpapers_df = wallpapers_df[['id', 'themeId', 'name', 'imageName', 'isPremium']]
+    with instrument.stage('build_dataframes'):
+        # 转换主题数据
+        themes_df = pd.DataFrame([theme.to_dict() for theme in catalog.themes])
+        themes_df = themes_df[['id', 'name', 'icon', 'colorHex', 'description', 'isPremium']]
+        
+        # 转换壁纸数据
+        wallpapers_df = pd.DataFrame([wallpaper.to_dict() for wallpaper in catalog.wallpapers])
+        wallpapers_df = wallpapers_df[['id', 'themeId', 'name', 'imageName', 'isPremium']]
     
     # 生成输出文件名
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_path = os.path.join(script_dir, f'wallpaper_themes_{timestamp}.xlsx')
+    output_path = export_registry.new_export_path(EXPORT_KIND)
     
     # 写入 Excel 文件（两个 sheet）
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+    with instrument.stage('write_excel'), pd.ExcelWriter(output_path, engine='openpyxl') as writer:
         themes_df.to_excel(writer, sheet_name='themes', index=False)
         wallpapers_df.to_excel(writer, sheet_name='wallpapers', index=False)
     
     print(f'✅ Excel 文件已生成: {output_path}')
     print(f'   - themes: {len(themes_df)} 条')
     print(f'   - wallpapers: {len(wallpapers_df)} 条')
+    
+    # 记录导出并清理旧文件
+    for name in export_registry.record_export(EXPORT_KIND, output_path, digest, keep):
+        print(f'🗑️ 已清理旧导出: {name}')
+    return output_path
 
 if __name__ == '__main__':
-    json_to_excel()
+    json_to_excel(force='--force' in sys.argv)
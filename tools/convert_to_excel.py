@@ -1,11 +1,29 @@
-import json
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
-from datetime import datetime
+import instrument
+import os
+import sys
+
+with instrument.stage('import_openpyxl'):
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, PatternFill
+
+import export_registry
+from catalog import load_catalog
+
+EXPORT_KIND = 'quotes'
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+json_path = os.path.join(script_dir, '..', 'MotivationApp', 'Resources', 'quotes.json')
+
+# 源数据未变化时跳过导出（--force 强制重新导出）
+digest = export_registry.file_hash(json_path)
+existing = export_registry.find_export(EXPORT_KIND, digest)
+if existing and '--force' not in sys.argv:
+    export_registry.mark_latest(EXPORT_KIND, existing)
+    print(f'数据未变化，跳过导出: {existing}')
+    sys.exit(0)
 
 # 读取JSON文件
-with open('../MotivationApp/Resources/quotes.json', 'r', encoding='utf-8') as f:
-    quotes = json.load(f)
+quotes = load_catalog(json_path).quotes
 
 # 创建Excel工作簿
 wb = openpyxl.Workbook()
@@ -26,15 +44,16 @@ for cell in ws[1]:
     cell.alignment = Alignment(horizontal='center', vertical='center')
 
 # 添加数据
-for quote in quotes:
-    ws.append([
-        quote['id'],
-        quote['content'],
-        quote['author'],
-        quote['categoryId'],
-        '是' if quote['isFavorite'] else '否',
-        quote['createdDate']
-    ])
+with instrument.stage('build_sheet'):
+    for quote in quotes:
+        ws.append([
+            quote.id,
+            quote.content,
+            quote.author,
+            quote.categoryId,
+            '是' if quote.isFavorite else '否',
+            quote.createdDate
+        ])
 
 # 调整列宽
 ws.column_dimensions['A'].width = 40
@@ -49,6 +68,11 @@ for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
     row[1].alignment = Alignment(wrap_text=True, vertical='top')  # 内容列自动换行
 
 # 保存Excel文件
-output_file = f'quotes_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-wb.save(output_file)
-print(f'转换完成！文件已保存为: {output_file}')
\ No newline at end of file
+output_file = export_registry.new_export_path(EXPORT_KIND)
+with instrument.stage('save_workbook'):
+    wb.save(output_file)
+print(f'转换完成！文件已保存为: {output_file}')
+
+# 记录导出并清理旧文件
+for name in export_registry.record_export(EXPORT_KIND, output_file, digest):
+    print(f'已清理旧导出: {name}')
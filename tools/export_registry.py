@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Excel 导出记录管理
+
+每次导出 Excel 时记录源数据文件的内容哈希：
+- 源数据未变化时跳过导出，直接复用已有文件
+- 通过记录直接取得最新导出文件，无需扫描整个目录
+- 按保留策略清理旧的导出文件
+
+记录文件：tools/export_registry.json
+{
+  "wallpaper_themes": {
+    "latest": "wallpaper_themes_20260118_234450.xlsx",
+    "exports": [
+      {"file": "wallpaper_themes_20260118_234450.xlsx", "hash": "...", "createdAt": "..."}
+    ]
+  }
+}
+
+使用方法：
+python3 export_registry.py              # 查看导出记录
+python3 export_registry.py --prune 3    # 每类只保留最近 3 个导出文件
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+from instrument import stage
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REGISTRY_PATH = os.path.join(SCRIPT_DIR, 'export_registry.json')
+
+# 默认每类保留的导出文件数量
+DEFAULT_KEEP = 5
+
+
+def file_hash(path: str) -> str:
+    """计算文件内容的 SHA-256 哈希"""
+    digest = hashlib.sha256()
+    with stage('hash_file'), open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_registry() -> dict:
+    """读取导出记录，文件不存在或损坏时返回空记录"""
+    if not os.path.exists(REGISTRY_PATH):
+        return {}
+    try:
+        with open(REGISTRY_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f'⚠️ 导出记录读取失败，将重新创建: {e}')
+        return {}
+
+
+def save_registry(registry: dict):
+    """写入导出记录（先写临时文件再替换，避免中途失败损坏记录）"""
+    tmp_path = REGISTRY_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, REGISTRY_PATH)
+
+
+def find_export(kind: str, digest: str, registry: dict = None):
+    """查找与源数据哈希相同且文件仍存在的导出，返回完整路径或 None"""
+    registry = registry if registry is not None else load_registry()
+    for entry in registry.get(kind, {}).get('exports', []):
+        if entry['hash'] == digest:
+            path = os.path.join(SCRIPT_DIR, entry['file'])
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def latest_export(kind: str, registry: dict = None):
+    """返回最新导出文件的完整路径
+
+    优先使用记录中的 latest；没有记录时（旧版本导出的文件）退回到按文件名扫描目录。
+    """
+    registry = registry if registry is not None else load_registry()
+    latest = registry.get(kind, {}).get('latest')
+    if latest:
+        path = os.path.join(SCRIPT_DIR, latest)
+        if os.path.exists(path):
+            return path
+
+    files = [f for f in os.listdir(SCRIPT_DIR) if f.startswith(f'{kind}_') and f.endswith('.xlsx')]
+    if not files:
+        return None
+    return os.path.join(SCRIPT_DIR, max(files))
+
+
+def mark_latest(kind: str, path: str):
+    """把已有的导出标记为最新（源数据回退到旧版本时复用旧导出）
+
+    记录按使用先后排列，被复用的导出移到末尾，清理时不会被当作旧文件删除。
+    """
+    registry = load_registry()
+    section = registry.get(kind)
+    file_name = os.path.basename(path)
+    if not section or section.get('latest') == file_name:
+        return
+    entries = [e for e in section['exports'] if e['file'] == file_name]
+    section['exports'] = [e for e in section['exports'] if e['file'] != file_name] + entries
+    section['latest'] = file_name
+    save_registry(registry)
+
+
+def new_export_path(kind: str) -> str:
+    """返回新导出文件的完整路径（kind_时间戳.xlsx）
+
+    时间戳精确到秒，同一秒内已有同名文件时加序号（kind_时间戳_2.xlsx），不覆盖之前的导出。
+    """
+    stem = f'{kind}_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+    path = os.path.join(SCRIPT_DIR, f'{stem}.xlsx')
+    counter = 2
+    while os.path.exists(path):
+        path = os.path.join(SCRIPT_DIR, f'{stem}_{counter}.xlsx')
+        counter += 1
+    return path
+
+
+def record_export(kind: str, output_path: str, digest: str, keep: int = DEFAULT_KEEP):
+    """记录一次新的导出，并按保留策略清理旧文件"""
+    registry = load_registry()
+    section = registry.setdefault(kind, {'latest': None, 'exports': []})
+    file_name = os.path.basename(output_path)
+    # 同名文件已被新导出覆盖，旧记录不再对应任何文件
+    section['exports'] = [e for e in section['exports'] if e['file'] != file_name]
+    section['exports'].append({
+        'file': file_name,
+        'hash': digest,
+        'createdAt': datetime.now().isoformat(timespec='seconds')
+    })
+    section['latest'] = file_name
+    removed = _prune_section(section, keep)
+    save_registry(registry)
+    return removed
+
+
+def prune_exports(kind: str, keep: int = DEFAULT_KEEP):
+    """按保留策略清理某类导出文件，返回被删除的文件名列表"""
+    registry = load_registry()
+    section = registry.get(kind)
+    if not section:
+        return []
+    removed = _prune_section(section, keep)
+    save_registry(registry)
+    return removed
+
+
+def _prune_section(section: dict, keep: int) -> list:
+    """只保留最近 keep 个导出（最新的一个始终保留），删除其余文件"""
+    exports = [e for e in section['exports'] if os.path.exists(os.path.join(SCRIPT_DIR, e['file']))]
+    keep = max(keep, 1)
+    stale, section['exports'] = exports[:-keep], exports[-keep:]
+    for entry in stale:
+        os.remove(os.path.join(SCRIPT_DIR, entry['file']))
+    section['latest'] = section['exports'][-1]['file'] if section['exports'] else None
+    return [entry['file'] for entry in stale]
+
+
+def print_registry():
+    registry = load_registry()
+    if not registry:
+        print('📭 暂无导出记录')
+        return
+    for kind, section in registry.items():
+        print(f'📦 {kind}（最新: {section.get("latest")}）')
+        for entry in section.get('exports', []):
+            print(f'   - {entry["file"]}  {entry["hash"][:12]}  {entry["createdAt"]}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == '--prune':
+        keep = int(sys.argv[2])
+        for kind in list(load_registry().keys()):
+            for name in prune_exports(kind, keep):
+                print(f'🗑️ 已删除: {name}')
+    print_registry()
@@ -1,7 +1,9 @@
-import json
 import uuid
 from datetime import datetime
 
+from catalog import Quote, write_json
+from instrument import stage
+
 # 名言内容模板
 励志名言 = [
     "成功不是终点，失败也不是终结，唯有勇气才是永恒。",
@@ -103,35 +105,35 @@ categories = {
 
 import random
 
-for i in range(1, 1001):
-    # 随机选择分类
-    category = random.choice(list(categories.keys()))
-    content_list = categories[category]
+with stage('generate_quotes'):
+    for i in range(1, 1001):
+        # 随机选择分类
+        category = random.choice(list(categories.keys()))
+        content_list = categories[category]
     
-    # 随机选择内容（可能重复，这样更真实）
-    content = random.choice(content_list)
+        # 随机选择内容（可能重复，这样更真实）
+        content = random.choice(content_list)
     
-    # 随机选择作者
-    author = random.choice(作者列表)
+        # 随机选择作者
+        author = random.choice(作者列表)
     
-    # 生成UUID
-    quote_id = str(uuid.UUID(int=i, version=4))
+        # 生成UUID
+        quote_id = str(uuid.UUID(int=i, version=4))
     
-    quote = {
-        "id": quote_id,
-        "content": content,
-        "author": author,
-        "categoryId": category,
-        "isFavorite": random.choice([True, False]) if i % 10 == 0 else False,  # 10%的概率是收藏
-        "createdDate": "2025-12-09T00:00:00Z"
-    }
+        quote = Quote(
+            id=quote_id,
+            content=content,
+            author=author,
+            categoryId=category,
+            isFavorite=random.choice([True, False]) if i % 10 == 0 else False,  # 10%的概率是收藏
+            createdDate="2025-12-09T00:00:00Z"
+        )
     
-    quotes.append(quote)
+        quotes.append(quote)
 
 # 保存到JSON文件
 output_path = '../MotivationApp/Resources/quotes.json'
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(quotes, f, ensure_ascii=False, indent=2)
+write_json(output_path, quotes)
 
 print(f'成功生成{len(quotes)}条名言数据！')
 print(f'文件已保存到: {output_path}')
\ No newline at end of file
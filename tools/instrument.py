@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tools/ 各脚本共用的性能记录：分阶段耗时、调用次数、内存峰值，可选对某个阶段做 cProfile
+
+启用方式（二选一）：
+- 命令行参数：--profile（报告写到 tools/profiles/）、--profile=报告路径.json
+  --profile-stage=阶段名 同时对该阶段做 cProfile（阶段名见报告中的 stages）
+- 环境变量：MOTIVATION_PROFILE=1 或 =报告路径.json，MOTIVATION_PROFILE_STAGE=阶段名
+
+这些参数在导入本模块时从 sys.argv 中去掉，不影响各脚本自己的参数解析，
+所以脚本需要在其他导入（尤其是 pandas 等较慢的导入）之前 import instrument。
+
+在代码中标记阶段：
+    from instrument import stage
+    with stage('write_excel'):
+        ...
+阶段可以嵌套，报告中以 外层/内层 命名；后台线程中的阶段各自单独计算嵌套关系。
+cProfile 只记录进入该阶段的线程（线程池中的工作线程不在其中）；
+多个线程同时执行阶段时内存峰值是近似值（tracemalloc 只有一个全局峰值）。
+未启用时 stage() 返回同一个空的上下文对象，开销只有一次函数调用。
+
+启用后用 tracemalloc 跟踪内存（脚本会因此变慢，耗时只适合相对比较），
+程序退出时写入 JSON 报告：
+{
+  "script": "scan_wallpapers.py", "argv": [...], "startedAt": "...",
+  "totalSeconds": 1.23, "peakMemoryBytes": 12345678,
+  "stages": {"scan/read_theme_json": {"calls": 8, "seconds": 0.01, "maxSeconds": 0.002,
+                                      "peakMemoryBytes": 1234, "memoryDeltaBytes": 56}},
+  "counters": {"images": 120},
+  "profile": {"stage": "...", "file": "....prof", "top": [...]}
+}
+多次调用的阶段：seconds 为总耗时，peakMemoryBytes 为各次的最大值，memoryDeltaBytes 为各次之和。
+"""
+
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REPORT_DIR = os.path.join(SCRIPT_DIR, 'profiles')
+
+ENV_PROFILE = 'MOTIVATION_PROFILE'
+ENV_PROFILE_STAGE = 'MOTIVATION_PROFILE_STAGE'
+
+# 报告中列出的 cProfile 函数数量（按累计耗时排序）
+PROFILE_TOP = 30
+
+
+class NullStage:
+    """未启用时使用的空上下文"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+class StageStats:
+    __slots__ = ('calls', 'seconds', 'max_seconds', 'peak_memory', 'memory_delta')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.peak_memory = 0
+        self.memory_delta = 0
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'seconds': round(self.seconds, 6),
+            'maxSeconds': round(self.max_seconds, 6),
+            'peakMemoryBytes': self.peak_memory,
+            'memoryDeltaBytes': self.memory_delta,
+        }
+
+
+class Stage:
+    """一次阶段执行：记录开始时间和内存，结束时汇总到 Profiler"""
+
+    __slots__ = ('profiler', 'name', 'path', 'start', 'memory_before', 'peak_seen', 'cprofile')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler.stack()
+        parent = stack[-1] if stack else None
+        self.path = f'{parent.path}/{self.name}' if parent else self.name
+        # tracemalloc 只有一个全局峰值：重置前把外层阶段到目前为止的峰值记下来
+        current, peak = tracemalloc.get_traced_memory()
+        if parent:
+            parent.peak_seen = max(parent.peak_seen, peak)
+        tracemalloc.reset_peak()
+        self.memory_before = current
+        self.peak_seen = current
+        stack.append(self)
+        self.cprofile = None
+        if self.profiler.profile_stage in (self.name, self.path):
+            self.cprofile = self.profiler.start_cprofile()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if self.cprofile:
+            self.cprofile.disable()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self.peak_seen)
+        stack = self.profiler.stack()
+        stack.pop()
+        if stack:
+            stack[-1].peak_seen = max(stack[-1].peak_seen, peak)
+        self.profiler.record(self.path, elapsed, peak, current - self.memory_before)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.report_path = None
+        self.profile_stage = None
+        self.cprofile = None
+        self.stats = {}
+        self.counters = {}
+        self.peak_memory = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started_at = None
+        self.start = None
+
+    def configure(self, argv, environ):
+        """从命令行参数（会被移除）和环境变量读取设置"""
+        report = environ.get(ENV_PROFILE, '')
+        stage_name = environ.get(ENV_PROFILE_STAGE) or None
+        enabled = bool(report) and report != '0'
+        remaining = []
+        for arg in argv:
+            if arg == '--profile':
+                enabled = True
+            elif arg.startswith('--profile='):
+                enabled = True
+                report = arg.split('=', 1)[1]
+            elif arg.startswith('--profile-stage='):
+                enabled = True
+                stage_name = arg.split('=', 1)[1]
+            else:
+                remaining.append(arg)
+        argv[:] = remaining
+        if enabled:
+            self.enable(None if report in ('', '1') else report, stage_name)
+
+    def enable(self, report_path=None, profile_stage=None):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.report_path = report_path
+        self.profile_stage = profile_stage
+        self.started_at = datetime.now().isoformat()
+        self.start = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        atexit.register(self.write_report)
+
+    def stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def stage(self, name):
+        """with stage(name): ... 记录一个阶段；未启用时几乎没有开销"""
+        if not self.enabled:
+            return NULL_STAGE
+        return Stage(self, name)
+
+    def count(self, name, amount=1):
+        """累加一个计数（处理的文件数、记录数等）"""
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, path, seconds, peak_memory, memory_delta):
+        with self.lock:
+            stats = self.stats.get(path)
+            if stats is None:
+                stats = self.stats[path] = StageStats()
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.peak_memory = max(stats.peak_memory, peak_memory)
+            stats.memory_delta += memory_delta
+            self.peak_memory = max(self.peak_memory, peak_memory)
+
+    def start_cprofile(self):
+        """同一时间只对一个阶段做 cProfile；多次执行的阶段累计到同一份结果"""
+        with self.lock:
+            if self.cprofile is None:
+                self.cprofile = cProfile.Profile()
+            profile = self.cprofile
+        try:
+            profile.enable()
+        except ValueError:
+            # 已有其他分析器在运行（Python 3.12 起会报错）：跳过这一次
+            return None
+        return profile
+
+    def report(self):
+        script = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else 'python'
+        with self.lock:
+            stages = {path: stats.to_dict() for path, stats in self.stats.items()}
+            counters = dict(self.counters)
+        report = {
+            'script': script,
+            'argv': sys.argv[1:],
+            'startedAt': self.started_at,
+            'totalSeconds': round(time.perf_counter() - self.start, 6),
+            'peakMemoryBytes': max(self.peak_memory, tracemalloc.get_traced_memory()[1]),
+            'stages': stages,
+            'counters': counters,
+        }
+        if self.profile_stage:
+            report['profile'] = {'stage': self.profile_stage, 'file': None, 'top': []}
+        return report
+
+    def default_report_path(self, script):
+        stem = os.path.splitext(script)[0] or 'python'
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join(DEFAULT_REPORT_DIR, f'{stem}_{timestamp}.json')
+
+    def write_report(self):
+        report = self.report()
+        path = self.report_path or self.default_report_path(report['script'])
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if self.cprofile is not None:
+            prof_path = os.path.splitext(path)[0] + '.prof'
+            self.cprofile.dump_stats(prof_path)
+            report['profile']['file'] = prof_path
+            report['profile']['top'] = profile_top(pstats.Stats(prof_path))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'⏱️ 性能报告: {path}', file=sys.stderr)
+        return path
+
+
+def profile_top(stats, limit=PROFILE_TOP):
+    """cProfile 结果中累计耗时最多的函数"""
+    rows = []
+    for (file_name, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f'{os.path.basename(file_name)}:{line}({function})',
+            'calls': calls,
+            'totalSeconds': round(total, 6),
+            'cumulativeSeconds': round(cumulative, 6),
+        })
+    rows.sort(key=lambda row: row['cumulativeSeconds'], reverse=True)
+    return rows[:limit]
+
+
+profiler = Profiler()
+profiler.configure(sys.argv, os.environ)
+
+stage = profiler.stage
+count = profiler.count
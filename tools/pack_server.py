@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+壁纸内容包的本地测试服务器和客户端模拟（content_packs.py 发布的目录）
+
+- 服务器：代替正式的 CDN，提供 content_packs/ 下的静态文件，支持单个 Range 请求（206 / 416），
+  可以用 --rate、--latency 模拟手机网络的带宽和延迟
+- 客户端（PackClient）：本地记录已下载的版本和图片哈希；
+  - 完整更新：下载最新清单和所有内容包，从包中切出图片
+  - 增量更新：latest.json 中有当前版本的增量清单时，只用 Range 请求取新增和修改的图片
+    （同一个包中相邻的图片合并为一个请求），删除不再发布的图片
+  每张图片都校验 SHA-256
+- 模拟：同一个服务器上分别做一次完整更新和一次增量更新，比较传输字节数、请求数和用时
+
+使用方法：
+python3 pack_server.py serve --port 8765                 # 启动服务器（Ctrl+C 停止）
+python3 pack_server.py simulate --from 1                 # 客户端先完整同步到 v1，再比较更新到最新版本的两种方式
+python3 pack_server.py simulate --synthetic              # 生成测试图片并发布两个版本后比较（不使用项目数据）
+python3 pack_server.py simulate --synthetic --rate 2048 --latency 80   # 模拟 2 MB/s、80 ms 延迟的网络
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import content_packs
+from content_packs import PackEntry, format_bytes
+
+DEFAULT_PORT = 8765
+
+# 模拟的默认网络：约 80 Mbps、每个请求 30 ms 延迟
+DEFAULT_RATE_KB = 10 * 1024
+DEFAULT_LATENCY_MS = 30
+
+# 同一个包中两张图片之间的空隙小于这个值时合并为一个 Range 请求
+RANGE_MERGE_GAP = 64 * 1024
+
+# 按带宽限速时每次发送的字节数
+SEND_BLOCK = 64 * 1024
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+# MARK: - 服务器
+
+class PackRequestHandler(BaseHTTPRequestHandler):
+    """静态文件 + 单个 Range；root、rate、latency 由 make_server 设置在 server 上"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def serve(self, send_body):
+        path = self.resolve(self.path)
+        if path is None or not os.path.isfile(path):
+            self.send_error(404)
+            return
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        status = 200
+        header = self.headers.get('Range')
+        if header:
+            try:
+                byte_range = parse_range(header, size)
+            except ValueError:
+                # 多个范围等不支持的格式：按规范可以忽略 Range，返回完整文件
+                byte_range = (start, end)
+            else:
+                status = 206
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            start, end = byte_range
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json' if path.endswith('.json') else 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.end_headers()
+        if send_body:
+            with open(path, 'rb') as f:
+                f.seek(start)
+                self.send_body(f, end - start + 1)
+
+    def send_body(self, f, remaining):
+        rate = self.server.rate
+        while remaining > 0:
+            block = f.read(min(SEND_BLOCK, remaining))
+            if not block:
+                break
+            self.wfile.write(block)
+            remaining -= len(block)
+            if rate:
+                time.sleep(len(block) / rate)
+
+    def resolve(self, url_path):
+        """URL -> 服务目录下的文件（拒绝 .. 等越界路径）"""
+        relative = urllib.request.url2pathname(url_path.split('?', 1)[0]).lstrip('/\\')
+        root = os.path.realpath(self.server.root)
+        path = os.path.realpath(os.path.join(root, relative))
+        if path != root and not path.startswith(root + os.sep):
+            return None
+        return path
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def parse_range(header, size):
+    """解析 Range 请求头：返回 (起, 止)，范围无法满足时返回 None，不支持的格式（如多个范围）抛出 ValueError"""
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        raise ValueError(f'不支持的 Range: {header}')
+    first, last = match.groups()
+    if not first:
+        # bytes=-N：最后 N 个字节
+        length = int(last)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+def make_server(root, port=0, rate_kb=0, latency_ms=0, verbose=False):
+    """创建服务器（port 为 0 时自动选择端口）；调用 serve_forever() 开始服务"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), PackRequestHandler)
+    server.daemon_threads = True
+    server.root = root
+    server.rate = rate_kb * 1024
+    server.latency = latency_ms / 1000
+    server.verbose = verbose
+    return server
+
+
+# MARK: - 客户端
+
+class SyncStats:
+    def __init__(self, mode):
+        self.mode = mode            # full / delta / up_to_date
+        self.bytes = 0              # 响应体字节数
+        self.requests = 0
+        self.files = 0              # 写入的图片数
+        self.removed = 0
+        self.seconds = 0.0
+
+    def summary(self):
+        return (f'{format_bytes(self.bytes)}，{self.requests} 个请求，{self.files} 张图片，'
+                f'用时 {self.seconds:.2f} s')
+
+
+class PackClient:
+    """模拟 App 中的下载器：state_dir 中保存 state.json 和已下载的图片"""
+
+    def __init__(self, base_url, state_dir):
+        self.base_url = base_url.rstrip('/')
+        self.state_dir = state_dir
+        self.files_dir = os.path.join(state_dir, 'files')
+        self.state_path = os.path.join(state_dir, 'state.json')
+        self.state = {'version': 0, 'files': {}}
+        if os.path.exists(self.state_path):
+            self.state = content_packs.read_json_file(self.state_path)
+
+    def fetch(self, path, stats, byte_range=None):
+        request = urllib.request.Request(f'{self.base_url}/{path}')
+        if byte_range:
+            request.add_header('Range', f'bytes={byte_range[0]}-{byte_range[1]}')
+        with urllib.request.urlopen(request) as response:
+            data = response.read()
+            status = response.status
+        stats.bytes += len(data)
+        stats.requests += 1
+        if byte_range and status != 206:
+            # 服务器不支持 Range：从完整内容中截取
+            data = data[byte_range[0]:byte_range[1] + 1]
+        return data
+
+    def fetch_json(self, path, stats):
+        return json.loads(self.fetch(path, stats))
+
+    def sync(self, version=None):
+        """更新到 version（默认为最新版本），返回 SyncStats"""
+        start = time.perf_counter()
+        stats = SyncStats('up_to_date')
+        latest = self.fetch_json('latest.json', stats)
+        target = version or latest['version']
+        current = self.state['version']
+        if current != target:
+            delta = latest['deltas'].get(str(current)) if target == latest['version'] and current else None
+            if delta:
+                stats.mode = 'delta'
+                self.apply_delta(self.fetch_json(delta['file'], stats), stats)
+            else:
+                stats.mode = 'full'
+                self.full_sync(self.fetch_json(content_packs.manifest_path(target).replace(os.sep, '/'), stats),
+                               stats)
+            self.save_state()
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def full_sync(self, manifest, stats):
+        """下载所有内容包，替换本地全部图片"""
+        by_pack = {}
+        for name, entry in manifest['files'].items():
+            by_pack.setdefault(entry['pack'], []).append((name, entry))
+        files = {}
+        for pack_id, pack in manifest['packs'].items():
+            data = self.fetch(pack['file'], stats)
+            for name, entry in by_pack.get(pack_id, []):
+                self.store(name, entry, data[entry['offset']:entry['offset'] + entry['bytes']])
+                files[name] = entry
+                stats.files += 1
+        for name in set(self.state['files']) - set(files):
+            self.remove(name)
+            stats.removed += 1
+        self.state = {'version': manifest['version'], 'files': files}
+
+    def apply_delta(self, delta, stats):
+        """只下载增量清单中的图片（Range 请求），更新属性，删除已下架的图片"""
+        files = dict(self.state['files'])
+        for (pack_file, first, last), items in plan_ranges(delta).items():
+            data = self.fetch(pack_file, stats, (first, last))
+            for name, entry in items:
+                offset = entry['offset'] - first
+                self.store(name, entry, data[offset:offset + entry['bytes']])
+                files[name] = entry
+                stats.files += 1
+        for name, attributes in delta['updated'].items():
+            files[name] = dict(files[name], **attributes)
+        for name in delta['removed']:
+            if files.pop(name, None) is not None:
+                self.remove(name)
+                stats.removed += 1
+        self.state = {'version': delta['to'], 'files': files}
+
+    def store(self, name, entry, data):
+        if hashlib.sha256(data).hexdigest() != entry['hash']:
+            raise ValueError(f'图片 {name} 校验失败')
+        os.makedirs(self.files_dir, exist_ok=True)
+        with open(os.path.join(self.files_dir, name + entry['ext']), 'wb') as f:
+            f.write(data)
+
+    def remove(self, name):
+        entry = self.state['files'][name]
+        path = os.path.join(self.files_dir, name + entry['ext'])
+        if os.path.exists(path):
+            os.remove(path)
+
+    def save_state(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        content_packs.write_json_file(self.state_path, self.state)
+
+
+def plan_ranges(delta, merge_gap=RANGE_MERGE_GAP):
+    """增量中的图片 -> {(包文件, 起, 止): [(imageName, 条目)]}；同一个包中相近的图片合并"""
+    by_pack = {}
+    for name, entry in delta['files'].items():
+        by_pack.setdefault(entry['pack'], []).append((name, entry))
+    ranges = {}
+    for pack_id, items in by_pack.items():
+        pack_file = delta['packs'][pack_id]['file']
+        items.sort(key=lambda item: item[1]['offset'])
+        group, first, last = [], None, None
+        for name, entry in items:
+            start, end = entry['offset'], entry['offset'] + entry['bytes'] - 1
+            if group and start - last - 1 > merge_gap:
+                ranges[(pack_file, first, last)] = group
+                group = []
+            if not group:
+                first = start
+            group.append((name, entry))
+            last = max(last, end) if len(group) > 1 else end
+        if group:
+            ranges[(pack_file, first, last)] = group
+    return ranges
+
+
+# MARK: - 模拟
+
+def synthetic_versions(root, output_dir, count=60, seed=7):
+    """生成 count 张测试图片并发布 v1；修改约 5%、新增约 5%、删除约 2% 后发布 v2"""
+    rng = random.Random(seed)
+    images_dir = os.path.join(root, 'images')
+    os.makedirs(images_dir)
+
+    def write_image(name):
+        path = os.path.join(images_dir, f'{name}.jpg')
+        with open(path, 'wb') as f:
+            f.write(rng.randbytes(rng.randint(200, 1200) * 1024))
+        return path
+
+    themes = ['季节', '风景', '美食', '城市', '动物']
+    entries = {}
+    for i in range(count):
+        name = f'wallpaper_{i:03d}'
+        entries[name] = (name, write_image(name), themes[i % len(themes)])
+    content_packs.publish([PackEntry(name, path, theme, True) for name, path, theme in entries.values()],
+                          output_dir)
+
+    names = sorted(entries)
+    for name in rng.sample(names, max(1, count // 20)):
+        write_image(name)
+    for name in rng.sample(names, max(1, count // 50)):
+        del entries[name]
+    for i in range(count, count + max(1, count // 20)):
+        name = f'wallpaper_{i:03d}'
+        entries[name] = (name, write_image(name), themes[i % len(themes)])
+    content_packs.publish([PackEntry(name, path, theme, True) for name, path, theme in entries.values()],
+                          output_dir)
+    return 1
+
+
+def simulate(output_dir, from_version, rate_kb, latency_ms):
+    latest = content_packs.load_latest(output_dir)
+    if latest is None:
+        print(f'❌ {output_dir} 中没有已发布的版本，请先运行 content_packs.py publish')
+        return 1
+    server = make_server(output_dir, 0, rate_kb, latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    network = f'带宽 {rate_kb} KB/s' if rate_kb else '不限速'
+    print(f'🌐 测试服务器 {base_url}（{network}，延迟 {latency_ms} ms）')
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            fresh = PackClient(base_url, os.path.join(tmp, 'fresh'))
+            full = fresh.sync()
+            print(f'📥 新安装，完整下载 v{latest["version"]}: {full.summary()}')
+            if not from_version or from_version >= latest['version']:
+                return 0
+            client = PackClient(base_url, os.path.join(tmp, 'updating'))
+            client.sync(from_version)
+            update = client.sync()
+            label = '增量更新' if update.mode == 'delta' else '完整更新（没有这个版本的增量清单）'
+            print(f'🔄 v{from_version} → v{latest["version"]} {label}: {update.summary()}，删除 {update.removed} 张')
+            if update.mode == 'delta' and full.bytes:
+                print(f'   比完整下载少传输 {(1 - update.bytes / full.bytes) * 100:.0f}%，'
+                      f'用时 {update.seconds:.2f} s / {full.seconds:.2f} s')
+            if content_packs.content_key(client.state['files']) != content_packs.content_key(fresh.state['files']):
+                print('❌ 增量更新后的图片与完整下载不一致')
+                return 1
+        except urllib.error.URLError as e:
+            print(f'❌ 请求失败: {e}')
+            return 1
+        finally:
+            server.shutdown()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='壁纸内容包的测试服务器和客户端模拟')
+    parser.add_argument('--dir', default=content_packs.DEFAULT_OUTPUT_DIR, help='content_packs.py 的输出目录')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='启动测试服务器')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--rate', type=int, default=0, help='带宽 KB/s（0 表示不限速）')
+    serve_parser.add_argument('--latency', type=int, default=0, help='每个请求的延迟 ms')
+    simulate_parser = commands.add_parser('simulate', help='比较完整更新和增量更新')
+    simulate_parser.add_argument('--from', dest='from_version', type=int, help='客户端当前的版本')
+    simulate_parser.add_argument('--synthetic', action='store_true', help='使用生成的测试图片发布两个版本')
+    simulate_parser.add_argument('--count', type=int, default=60, help='--synthetic 时的图片数')
+    simulate_parser.add_argument('--rate', type=int, default=DEFAULT_RATE_KB, help='带宽 KB/s（0 表示不限速）')
+    simulate_parser.add_argument('--latency', type=int, default=DEFAULT_LATENCY_MS, help='每个请求的延迟 ms')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = make_server(args.dir, args.port, args.rate, args.latency, verbose=True)
+        print(f'🌐 http://127.0.0.1:{server.server_address[1]}/ → {args.dir}（Ctrl+C 停止）')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.synthetic:
+        root = tempfile.mkdtemp()
+        try:
+            output_dir = os.path.join(root, 'content_packs')
+            from_version = synthetic_versions(root, output_dir, args.count)
+            return simulate(output_dir, from_version, args.rate, args.latency)
+        finally:
+            shutil.rmtree(root)
+    return simulate(args.dir, args.from_version, args.rate, args.latency)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
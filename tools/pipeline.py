@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容构建流水线：按依赖关系执行 扫描 → 数据文件 → Excel 导出 → Swift 数据文件
+
+每个阶段就是原来手动运行的脚本（在子进程中运行，输出与单独运行时相同）：
+
+    scan_wallpapers ─→ themes_excel          Wallpapers/ → wallpaper_themes.json → Excel
+    generate_quotes ─→ quotes_excel          quotes.json → Excel
+    swift                                    theme_data.json + 日志 → MotivationApp/Generated/
+
+- 增量：每个阶段根据输入文件内容、脚本本身和配置计算一个哈希，与上次成功执行时相同、
+  且输出文件没有变化时跳过。上游阶段重新执行但输出内容不变时，下游阶段也会跳过
+- 并行：没有依赖关系的阶段（壁纸、名言、Swift 三条线）同时执行；
+  两个 Excel 导出会写同一个 export_registry.json，不会同时执行
+- 文件哈希按 (大小, 修改时间) 缓存，未修改的文件不会重新读取；
+  目录输入（如 Wallpapers/）只比较文件列表、大小和修改时间，不读取图片内容
+- quotes.json 是名言的源数据，generate_quotes 只在文件不存在或显式 --force 时运行，不会覆盖已有名言
+- 没有 theme_data.json 时跳过 swift 阶段
+
+缓存记录：tools/pipeline_cache.json（删除后下次全部重新执行）
+
+使用方法：
+python3 pipeline.py                            # 增量构建全部阶段
+python3 pipeline.py swift quotes_excel         # 只构建指定阶段（会先构建它们依赖的阶段）
+python3 pipeline.py --force themes_excel       # 强制重新执行指定阶段（不指定阶段时全部重新执行）
+python3 pipeline.py --dry-run                  # 只显示哪些阶段需要执行
+python3 pipeline.py --swift-mode resource      # swift 阶段的生成方式，同 swift_codegen.py --mode
+python3 pipeline.py --list                     # 列出所有阶段
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import export_registry
+import swift_codegen
+from instrument import stage
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+CACHE_PATH = os.path.join(SCRIPT_DIR, 'pipeline_cache.json')
+
+# 缓存格式变化时修改，旧缓存自动失效
+CACHE_VERSION = 1
+
+# 同时执行的阶段数（最多三条独立的线）
+DEFAULT_JOBS = 3
+
+# 各阶段共用的模块：修改后所有使用它们的阶段都重新执行
+COMMON_SOURCES = ('tools/catalog.py', 'tools/instrument.py')
+
+WALLPAPER_THEMES = 'MotivationApp/Resources/wallpaper_themes.json'
+QUOTES = 'MotivationApp/Resources/quotes.json'
+THEME_DATA = 'tools/theme_data.json'
+THEME_JOURNAL = 'tools/theme_data.journal'
+
+
+class Step:
+    """流水线中的一个阶段
+
+    inputs、outputs 为相对项目根目录的路径，以 / 结尾的是目录；
+    outputs 也可以是返回路径列表的函数（输出文件名不固定时，如带时间戳的 Excel）。
+    """
+
+    def __init__(self, name, script, inputs, outputs, deps=(), args=(), config=None,
+                 description='', lock=None, requires=None, keep_outputs=False):
+        self.name = name
+        self.script = script
+        self.inputs = [f'tools/{script}', *COMMON_SOURCES, *inputs]
+        self.outputs = outputs
+        self.deps = tuple(deps)
+        self.args = list(args)
+        self.config = config or {}
+        self.description = description
+        self.lock = lock                    # 同名 lock 的阶段不会同时执行
+        self.requires = requires            # 这个输入不存在时跳过阶段
+        self.keep_outputs = keep_outputs    # 输出已存在时不再执行（输出是源数据，不能覆盖）
+
+    def output_paths(self):
+        outputs = self.outputs() if callable(self.outputs) else self.outputs
+        return list(outputs)
+
+    def command(self):
+        return [sys.executable, os.path.join(SCRIPT_DIR, self.script), *self.args]
+
+
+def latest_export_output(kind):
+    """Excel 导出阶段的输出：导出记录中最新的文件（还没有导出时为缺失）"""
+    def outputs():
+        path = export_registry.latest_export(kind)
+        if path is None:
+            return [f'tools/{kind}_*.xlsx']
+        return [os.path.relpath(path, PROJECT_DIR)]
+    return outputs
+
+
+def build_steps(swift_mode=swift_codegen.MODES[0], chunk_size=swift_codegen.CHUNK_SIZE):
+    swift_outputs = [swift_codegen.GENERATED_DIR + '/']
+    if swift_mode == 'resource':
+        swift_outputs.append(swift_codegen.RESOURCE_PATH)
+    steps = [
+        Step('scan_wallpapers', 'scan_wallpapers.py',
+             inputs=['tools/Wallpapers/'],
+             outputs=[WALLPAPER_THEMES],
+             description='扫描 Wallpapers 目录生成 wallpaper_themes.json'),
+        Step('themes_excel', 'convert_themes_to_excel.py',
+             inputs=[WALLPAPER_THEMES, 'tools/export_registry.py'],
+             outputs=latest_export_output('wallpaper_themes'),
+             deps=['scan_wallpapers'], lock='export_registry',
+             description='导出主题和壁纸 Excel'),
+        Step('generate_quotes', 'generate_quotes.py',
+             inputs=[],
+             outputs=[QUOTES], keep_outputs=True,
+             description='生成名言数据 quotes.json（文件已存在时跳过）'),
+        Step('quotes_excel', 'convert_to_excel.py',
+             inputs=[QUOTES, 'tools/export_registry.py'],
+             outputs=latest_export_output('quotes'),
+             deps=['generate_quotes'], lock='export_registry',
+             description='导出名言 Excel'),
+        Step('swift', 'swift_codegen.py',
+             # swift_codegen.py 通过 ThemeModel 读取快照并重放编辑日志，日志变化也要重新生成
+             inputs=[THEME_DATA, THEME_JOURNAL, 'tools/theme_model.py', 'tools/theme_journal.py'],
+             outputs=swift_outputs,
+             args=['--mode', swift_mode, '--chunk-size', str(chunk_size)],
+             config={'mode': swift_mode, 'chunkSize': chunk_size},
+             requires=THEME_DATA,
+             description='从 theme_data.json 和编辑日志生成 Swift 数据文件'),
+    ]
+    return {step.name: step for step in steps}
+
+
+# MARK: - 缓存
+
+class BuildCache:
+    """文件哈希缓存和各阶段上次成功执行的记录（多个线程共用）"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.files = {}     # 相对路径 -> [大小, 修改时间(ns), 哈希]
+        self.steps = {}     # 阶段名 -> {"key", "outputs", "finishedAt", "seconds"}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f'⚠️ 构建缓存读取失败，将全部重新执行: {e}')
+            return
+        if data.get('version') == CACHE_VERSION:
+            self.files = data.get('files', {})
+            self.steps = data.get('steps', {})
+
+    def save(self):
+        with self.lock:
+            data = {'version': CACHE_VERSION, 'files': self.files, 'steps': self.steps}
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+    def file_hash(self, relative_path):
+        """文件内容的 SHA-256；大小和修改时间都没变时直接使用缓存的哈希。文件不存在时返回 None"""
+        try:
+            info = os.stat(os.path.join(PROJECT_DIR, relative_path))
+        except FileNotFoundError:
+            return None
+        with self.lock:
+            cached = self.files.get(relative_path)
+        if cached and cached[0] == info.st_size and cached[1] == info.st_mtime_ns:
+            return cached[2]
+        digest = export_registry.file_hash(os.path.join(PROJECT_DIR, relative_path))
+        with self.lock:
+            self.files[relative_path] = [info.st_size, info.st_mtime_ns, digest]
+        return digest
+
+    def fingerprint(self, relative_path):
+        """一个输入或输出的指纹：文件按内容，目录按文件列表、大小和修改时间"""
+        if not relative_path.endswith('/'):
+            return self.file_hash(relative_path)
+        root = os.path.join(PROJECT_DIR, relative_path)
+        if not os.path.isdir(root):
+            return None
+        digest = hashlib.sha256()
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                path = os.path.join(dir_path, file_name)
+                info = os.stat(path)
+                digest.update(f'{os.path.relpath(path, root)}\0{info.st_size}\0{info.st_mtime_ns}\n'
+                              .encode('utf-8'))
+        return digest.hexdigest()
+
+    def step_key(self, step):
+        """输入内容 + 命令 + 配置 -> 阶段的缓存键"""
+        with stage('fingerprint'):
+            inputs = {path: self.fingerprint(path) for path in step.inputs}
+        data = {'inputs': inputs, 'args': step.args, 'config': step.config}
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def output_fingerprints(self, step):
+        return {path: self.fingerprint(path) for path in step.output_paths()}
+
+    def is_fresh(self, step):
+        """上次成功执行后输入和输出都没有变化"""
+        with self.lock:
+            record = self.steps.get(step.name)
+        if not record or record['key'] != self.step_key(step):
+            return False
+        outputs = self.output_fingerprints(step)
+        return None not in outputs.values() and outputs == record['outputs']
+
+    def record(self, step, seconds):
+        # 执行后重新计算：阶段可能修改自己的输入（如 scan_wallpapers 生成 theme.json）
+        record = {
+            'key': self.step_key(step),
+            'outputs': self.output_fingerprints(step),
+            'finishedAt': datetime.now().isoformat(timespec='seconds'),
+            'seconds': round(seconds, 3),
+        }
+        with self.lock:
+            self.steps[step.name] = record
+
+
+# MARK: - 执行
+
+class Result:
+    def __init__(self, status, seconds=0.0, detail='', output=''):
+        self.status = status    # ran / cached / skipped / failed / blocked / stale
+        self.seconds = seconds
+        self.detail = detail
+        self.output = output
+
+
+STATUS_LABELS = {
+    'ran': ('✅', '已执行'),
+    'cached': ('⏭️', '无变化'),
+    'skipped': ('➖', '跳过'),
+    'failed': ('❌', '失败'),
+    'blocked': ('⛔', '未执行（依赖的阶段失败）'),
+    'stale': ('🔄', '需要执行'),
+}
+
+
+class Pipeline:
+    def __init__(self, steps, cache, jobs=DEFAULT_JOBS, force=(), dry_run=False, quiet=False):
+        self.steps = steps
+        self.cache = cache
+        self.jobs = max(1, jobs)
+        self.force = set(force)
+        self.dry_run = dry_run
+        self.quiet = quiet
+        self.locks = {step.lock: threading.Lock() for step in steps.values() if step.lock}
+        self.print_lock = threading.Lock()
+
+    def closure(self, targets):
+        """目标阶段及其依赖的所有阶段"""
+        selected = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.steps[name].deps)
+        return selected
+
+    def run(self, targets):
+        """按依赖顺序执行，返回 {阶段名: Result}"""
+        selected = self.closure(targets)
+        results = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while len(results) < len(selected):
+                for name in sorted(selected - set(results) - set(running.values())):
+                    step = self.steps[name]
+                    if not all(dep in results for dep in step.deps):
+                        continue
+                    if any(results[dep].status in ('failed', 'blocked') for dep in step.deps):
+                        results[name] = Result('blocked')
+                        continue
+                    upstream_stale = any(results[dep].status == 'stale' for dep in step.deps)
+                    running[pool.submit(self.run_step, step, upstream_stale)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    self.report(self.steps[name], results[name])
+        return results
+
+    def run_step(self, step, upstream_stale=False):
+        if step.requires and not os.path.exists(os.path.join(PROJECT_DIR, step.requires)):
+            return Result('skipped', detail=f'缺少 {step.requires}')
+        forced = step.name in self.force
+        if not forced:
+            if step.keep_outputs and all(os.path.exists(os.path.join(PROJECT_DIR, path))
+                                         for path in step.output_paths()):
+                return Result('cached', detail='输出已存在')
+            if not upstream_stale and self.cache.is_fresh(step):
+                return Result('cached')
+        if self.dry_run:
+            return Result('stale', detail='强制执行' if forced else '')
+
+        lock = self.locks.get(step.lock)
+        start = time.perf_counter()
+        with stage(step.name):
+            if lock:
+                with lock:
+                    process = self.execute(step)
+            else:
+                process = self.execute(step)
+        seconds = time.perf_counter() - start
+        output = (process.stdout + process.stderr).rstrip()
+        if process.returncode != 0:
+            return Result('failed', seconds, f'退出码 {process.returncode}', output)
+        missing = [path for path in step.output_paths()
+                   if not os.path.exists(os.path.join(PROJECT_DIR, path))]
+        if missing:
+            return Result('failed', seconds, f'没有生成 {", ".join(missing)}', output)
+        self.cache.record(step, seconds)
+        self.cache.save()
+        return Result('ran', seconds, output=output)
+
+    def execute(self, step):
+        # 各脚本以 tools/ 为工作目录运行（generate_quotes.py 使用相对路径）
+        env = dict(os.environ, PYTHONIOENCODING='utf-8')
+        return subprocess.run(step.command(), cwd=SCRIPT_DIR, env=env, capture_output=True,
+                              text=True, encoding='utf-8', errors='replace')
+
+    def report(self, step, result):
+        icon, label = STATUS_LABELS[result.status]
+        line = f'{icon} {step.name}: {label}'
+        if result.status in ('ran', 'failed'):
+            line += f'（{result.seconds:.2f} s）'
+        if result.detail:
+            line += f' - {result.detail}'
+        with self.print_lock:
+            print(line)
+            if result.output and (result.status == 'failed' or not self.quiet):
+                for output_line in result.output.splitlines():
+                    print(f'   │ {output_line}')
+
+
+def print_steps(steps):
+    for step in steps.values():
+        deps = f'（依赖 {", ".join(step.deps)}）' if step.deps else ''
+        print(f'📦 {step.name}: {step.description}{deps}')
+        print(f'   python3 tools/{step.script} {" ".join(step.args)}'.rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量、并行地构建 App 内容数据')
+    parser.add_argument('targets', nargs='*', help='要构建的阶段（默认全部）')
+    parser.add_argument('--force', action='store_true', help='强制重新执行指定的阶段（未指定时为全部）')
+    parser.add_argument('--dry-run', action='store_true', help='只显示哪些阶段需要执行')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS, help='同时执行的阶段数')
+    parser.add_argument('--quiet', '-q', action='store_true', help='不显示各脚本的输出（失败时仍显示）')
+    parser.add_argument('--swift-mode', choices=swift_codegen.MODES, default=swift_codegen.MODES[0])
+    parser.add_argument('--chunk-size', type=int, default=swift_codegen.CHUNK_SIZE)
+    parser.add_argument('--list', action='store_true', help='列出所有阶段')
+    args = parser.parse_args()
+
+    steps = build_steps(args.swift_mode, args.chunk_size)
+    if args.list:
+        print_steps(steps)
+        return 0
+    unknown = [name for name in args.targets if name not in steps]
+    if unknown:
+        parser.error(f'未知的阶段: {", ".join(unknown)}（可选: {", ".join(steps)}）')
+    targets = args.targets or list(steps)
+    force = (args.targets or list(steps)) if args.force else ()
+
+    start = time.perf_counter()
+    pipeline = Pipeline(steps, BuildCache(), args.jobs, force, args.dry_run, args.quiet)
+    results = pipeline.run(targets)
+
+    counts = {}
+    for result in results.values():
+        counts[result.status] = counts.get(result.status, 0) + 1
+    summary = '，'.join(f'{STATUS_LABELS[status][1]} {number}' for status, number in counts.items())
+    print(f'\n🏁 {summary}，用时 {time.perf_counter() - start:.2f} s')
+    return 1 if counts.get('failed') or counts.get('blocked') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
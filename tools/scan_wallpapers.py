@@ -21,11 +21,13 @@ Wallpapers/
 python3 scan_wallpapers.py
 """
 
-import json
 import os
 import re
 from pathlib import Path
 
+from catalog import Catalog, Theme, Wallpaper, read_json, write_json
+from instrument import count, stage
+
 # 支持的图片格式
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
 
@@ -66,14 +68,16 @@ def parse_wallpaper_file_name(file_name: str) -> tuple:
 def scan_images_in_dir(theme_dir: Path) -> list:
     """扫描目录中的图片文件"""
     images = []
-    for f in sorted(theme_dir.iterdir()):
-        if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS:
-            name, is_premium = parse_wallpaper_file_name(f.name)
-            images.append({
-                'name': name,
-                'file': f.stem.lstrip('$'),  # 去掉 $ 前缀作为资源名
-                'isPremium': is_premium
-            })
+    with stage('scan_images'):
+        for f in sorted(theme_dir.iterdir()):
+            if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS:
+                name, is_premium = parse_wallpaper_file_name(f.name)
+                images.append({
+                    'name': name,
+                    'file': f.stem.lstrip('$'),  # 去掉 $ 前缀作为资源名
+                    'isPremium': is_premium
+                })
+    count('images', len(images))
     return images
 
 def scan_wallpapers():
@@ -107,8 +111,7 @@ def scan_wallpapers():
         
         # 读取或生成主题配置
         if theme_json_path.exists():
-            with open(theme_json_path, 'r', encoding='utf-8') as f:
-                theme_config = json.load(f)
+            theme_config = read_json(theme_json_path)
         else:
             # 自动生成 theme.json
             default = DEFAULT_THEME_CONFIG.get(theme_name, DEFAULT_CONFIG)
@@ -121,8 +124,7 @@ def scan_wallpapers():
                 'wallpapers': scanned_images
             }
             # 保存生成的 theme.json
-            with open(theme_json_path, 'w', encoding='utf-8') as f:
-                json.dump(theme_config, f, ensure_ascii=False, indent=2)
+            write_json(theme_json_path, theme_config)
             print(f'📝 已生成: {theme_json_path}')
         
         # 如果 theme.json 中没有 wallpapers 或为空，使用扫描到的图片
@@ -131,48 +133,40 @@ def scan_wallpapers():
             wallpaper_configs = scanned_images
             # 更新 theme.json
             theme_config['wallpapers'] = wallpaper_configs
-            with open(theme_json_path, 'w', encoding='utf-8') as f:
-                json.dump(theme_config, f, ensure_ascii=False, indent=2)
+            write_json(theme_json_path, theme_config)
             print(f'📝 已更新壁纸列表: {theme_json_path}')
         
         # 生成主题 ID
         theme_id = generate_uuid(theme_index, 1)
         
         # 构建主题数据
-        theme = {
-            'id': theme_id,
-            'name': theme_config.get('name', theme_name),
-            'icon': theme_config.get('icon', 'photo'),
-            'colorHex': theme_config.get('colorHex', '#007AFF'),
-            'description': theme_config.get('description', ''),
-            'isPremium': theme_config.get('isPremium', theme_is_premium)
-        }
+        theme = Theme(
+            id=theme_id,
+            name=theme_config.get('name', theme_name),
+            icon=theme_config.get('icon', 'photo'),
+            colorHex=theme_config.get('colorHex', '#007AFF'),
+            description=theme_config.get('description', ''),
+            isPremium=theme_config.get('isPremium', theme_is_premium)
+        )
         themes.append(theme)
         
         # 处理壁纸
         for wp_index, wp_config in enumerate(wallpaper_configs, start=1):
             wallpaper_id = generate_uuid(theme_index * 10, wp_index)
             
-            wallpaper = {
-                'id': wallpaper_id,
-                'themeId': theme_id,
-                'name': wp_config.get('name', f'壁纸{wp_index}'),
-                'imageName': wp_config.get('file', ''),
-                'isPremium': wp_config.get('isPremium', False)
-            }
+            wallpaper = Wallpaper(
+                id=wallpaper_id,
+                themeId=theme_id,
+                name=wp_config.get('name', f'壁纸{wp_index}'),
+                imageName=wp_config.get('file', ''),
+                isPremium=wp_config.get('isPremium', False)
+            )
             wallpapers.append(wallpaper)
         
         print(f'✅ {theme_dir.name}: {len(wallpaper_configs)} 张壁纸')
     
-    # 生成输出
-    output_data = {
-        'themes': themes,
-        'wallpapers': wallpapers
-    }
-    
     # 写入文件
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    write_json(output_path, Catalog(themes, wallpapers).to_wallpaper_themes())
     
     print(f'\n📦 已生成: {output_path}')
     print(f'   - 主题: {len(themes)} 个')
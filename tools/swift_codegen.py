@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主题/壁纸数据的 Swift 代码生成（适合大量数据）
+
+把所有数据写进一个数组字面量时，Swift 类型检查的耗时会随元素数量急剧增加。
+这里提供两种不影响编译速度的生成方式，生成的 API 相同：
+Category.generatedCategories 和 ThemeWallpaper.generatedWallpapers。
+
+- chunks（默认）：每 CHUNK_SIZE 条记录一个文件，每个数组都带显式类型标注，
+  由 GeneratedThemeData.swift 把各分块拼接起来
+- resource：数据写成 Resources/generated_theme_data.json，
+  GeneratedThemeData.swift 只包含一个很小的加载器，数据变化时不需要重新编译
+
+生成的文件内容只取决于数据本身（不含生成时间），内容没有变化的文件不会被重写，
+Xcode 增量编译只会重新编译真正变化的分块。切换生成方式或分块变少时会删除多余的旧文件。
+
+记录 id 由名称生成固定的 UUID，壁纸的 themeId 指向同名主题的 id。
+数据通过 ThemeModel 读取：快照之外还会重放 theme_data.journal，包含管理工具中尚未保存成快照的编辑。
+
+使用方法：
+python3 swift_codegen.py                       # 从 theme_data.json（及编辑日志）生成分块 Swift 文件
+python3 swift_codegen.py --mode resource       # 生成 JSON 资源 + 加载器
+python3 swift_codegen.py --chunk-size 100      # 指定每个分块的记录数
+"""
+
+import argparse
+import os
+import sys
+import uuid
+
+import catalog
+from instrument import stage
+from theme_model import ThemeModel
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+# 生成文件的位置（相对项目根目录）。Xcode 工程使用文件夹同步，新文件会自动加入编译
+GENERATED_DIR = os.path.join('MotivationApp', 'Generated')
+RESOURCE_PATH = os.path.join('MotivationApp', 'Resources', 'generated_theme_data.json')
+INDEX_FILE = 'GeneratedThemeData.swift'
+
+# 每个分块文件的记录数：足够小让单个数组的类型检查保持很快
+CHUNK_SIZE = 200
+
+MODES = ('chunks', 'resource')
+
+# Category.swift 中 enum CategoryType 的取值
+CATEGORY_TYPES = ('normal', 'combined', 'seasonal')
+
+# 生成固定 UUID 的命名空间
+ID_NAMESPACE = uuid.UUID('6f1c2a4e-3b7d-5e8f-9a0b-1c2d3e4f5a6b')
+
+HEADER = '''//
+//  {file_name}
+//  MotivationApp
+//
+//  由 tools/swift_codegen.py 生成，请勿手动修改
+//
+
+import Foundation
+'''
+
+
+def swift_string(value):
+    """转为 Swift 字符串字面量（转义引号、反斜杠和控制字符）"""
+    parts = []
+    for char in str(value):
+        if char == '\\':
+            parts.append('\\\\')
+        elif char == '"':
+            parts.append('\\"')
+        elif char == '\n':
+            parts.append('\\n')
+        elif char == '\r':
+            parts.append('\\r')
+        elif char == '\t':
+            parts.append('\\t')
+        elif ord(char) < 0x20:
+            parts.append(f'\\u{{{ord(char):X}}}')
+        else:
+            parts.append(char)
+    return '"' + ''.join(parts) + '"'
+
+
+def swift_bool(value):
+    return 'true' if value else 'false'
+
+
+def category_id(name):
+    return str(uuid.uuid5(ID_NAMESPACE, f'category:{name}')).upper()
+
+
+def wallpaper_id(wallpaper):
+    key = f'wallpaper:{wallpaper.get("themeId", "")}/{wallpaper.get("name", "")}/{wallpaper.get("imageName", "")}'
+    return str(uuid.uuid5(ID_NAMESPACE, key)).upper()
+
+
+def category_model(category):
+    """主题记录 -> Category 的 Codable 字段；type 不是 CategoryType 的取值时抛出 ValueError"""
+    category_type = category.get('type') or 'normal'
+    if category_type not in CATEGORY_TYPES:
+        raise ValueError(f'主题「{category.get("name", "")}」的类型 {category_type!r} 不是 CategoryType 的取值'
+                         f'（{"、".join(CATEGORY_TYPES)}）')
+    return {
+        'id': category_id(category.get('name', '')),
+        'name': category.get('name', ''),
+        'icon': category.get('icon', ''),
+        'colorHex': category.get('colorHex', ''),
+        'description': category.get('description', ''),
+        'imageName': category.get('imageName') or None,
+        'type': category_type,
+        'isNew': bool(category.get('isNew', False)),
+        'isFeatured': bool(category.get('isFeatured', False)),
+        'tags': list(category.get('tags', [])),
+    }
+
+
+def wallpaper_model(wallpaper):
+    """壁纸记录 -> ThemeWallpaper 的 Codable 字段（themeId 是主题名称）"""
+    return {
+        'id': wallpaper_id(wallpaper),
+        'themeId': category_id(wallpaper.get('themeId', '')),
+        'name': wallpaper.get('name', ''),
+        'imageName': wallpaper.get('imageName', ''),
+        'isPremium': bool(wallpaper.get('isLocked', False)),
+    }
+
+
+def category_literal(model):
+    image_name = swift_string(model['imageName']) if model['imageName'] else 'nil'
+    tags = ', '.join(swift_string(tag) for tag in model['tags'])
+    return (
+        f'        Category(\n'
+        f'            id: UUID(uuidString: "{model["id"]}")!,\n'
+        f'            name: {swift_string(model["name"])},\n'
+        f'            icon: {swift_string(model["icon"])},\n'
+        f'            colorHex: {swift_string(model["colorHex"])},\n'
+        f'            description: {swift_string(model["description"])},\n'
+        f'            imageName: {image_name},\n'
+        f'            type: CategoryType.{model["type"]},\n'
+        f'            isNew: {swift_bool(model["isNew"])},\n'
+        f'            isFeatured: {swift_bool(model["isFeatured"])},\n'
+        f'            tags: [{tags}] as [String]\n'
+        f'        )'
+    )
+
+
+def wallpaper_literal(model):
+    return (
+        f'        ThemeWallpaper(\n'
+        f'            id: UUID(uuidString: "{model["id"]}")!,\n'
+        f'            themeId: UUID(uuidString: "{model["themeId"]}")!,\n'
+        f'            name: {swift_string(model["name"])},\n'
+        f'            imageName: {swift_string(model["imageName"])},\n'
+        f'            isPremium: {swift_bool(model["isPremium"])}\n'
+        f'        )'
+    )
+
+
+# 每类数据：(Swift 类型, 属性名, 分块文件名前缀, 记录 -> 字面量)
+KINDS = (
+    ('Category', 'generatedCategories', 'GeneratedCategories', category_literal),
+    ('ThemeWallpaper', 'generatedWallpapers', 'GeneratedWallpapers', wallpaper_literal),
+)
+
+
+def generate_chunks(models, chunk_size=CHUNK_SIZE):
+    """分块 Swift 文件：返回 {相对路径: 内容}"""
+    files = {}
+    index_parts = [HEADER.format(file_name=INDEX_FILE)]
+    for (type_name, property_name, prefix, literal), records in zip(KINDS, models):
+        chunk_names = []
+        for number, start in enumerate(range(0, len(records), chunk_size), start=1):
+            chunk_property = f'{property_name}{number:03d}'
+            file_name = f'{prefix}_{number:03d}.swift'
+            body = ',\n'.join(literal(model) for model in records[start:start + chunk_size])
+            files[os.path.join(GENERATED_DIR, file_name)] = (
+                HEADER.format(file_name=file_name)
+                + f'\nextension {type_name} {{\n'
+                + f'    static let {chunk_property}: [{type_name}] = [\n{body}\n    ]\n}}\n'
+            )
+            chunk_names.append(chunk_property)
+        chunks = ', '.join(chunk_names)
+        index_parts.append(
+            f'\nextension {type_name} {{\n'
+            f'    static let {property_name}: [{type_name}] = {{\n'
+            f'        let chunks: [[{type_name}]] = [{chunks}]\n'
+            f'        return chunks.flatMap {{ $0 }}\n'
+            f'    }}()\n'
+            f'}}\n'
+        )
+    files[os.path.join(GENERATED_DIR, INDEX_FILE)] = ''.join(index_parts)
+    return files
+
+
+def generate_resource(models):
+    """JSON 资源 + 加载器：返回 {相对路径: 内容}"""
+    categories, wallpapers = models
+    data = {'categories': categories, 'wallpapers': wallpapers}
+    loader = HEADER.format(file_name=INDEX_FILE) + '''
+struct GeneratedThemeData: Decodable {
+    let categories: [Category]
+    let wallpapers: [ThemeWallpaper]
+
+    static let shared: GeneratedThemeData = {
+        guard let url = Bundle.main.url(forResource: "generated_theme_data", withExtension: "json"),
+              let data = try? Data(contentsOf: url),
+              let decoded = try? JSONDecoder().decode(GeneratedThemeData.self, from: data) else {
+            print("⚠️ 无法加载 generated_theme_data.json，使用空数据")
+            return GeneratedThemeData(categories: [], wallpapers: [])
+        }
+        return decoded
+    }()
+}
+
+extension Category {
+    static var generatedCategories: [Category] {
+        GeneratedThemeData.shared.categories
+    }
+}
+
+extension ThemeWallpaper {
+    static var generatedWallpapers: [ThemeWallpaper] {
+        GeneratedThemeData.shared.wallpapers
+    }
+}
+'''
+    return {
+        RESOURCE_PATH: catalog.dumps(data, indent=False) + '\n',
+        os.path.join(GENERATED_DIR, INDEX_FILE): loader,
+    }
+
+
+def generate(categories, wallpapers, mode='chunks', chunk_size=CHUNK_SIZE):
+    """根据主题和壁纸记录生成文件内容 {相对路径: 内容}"""
+    if mode not in MODES:
+        raise ValueError(f'未知的生成方式: {mode}')
+    with stage('codegen_models'):
+        models = ([category_model(c) for c in categories], [wallpaper_model(w) for w in wallpapers])
+    with stage(f'codegen_{mode}'):
+        if mode == 'resource':
+            return generate_resource(models)
+        return generate_chunks(models, chunk_size)
+
+
+def owned_files(project_path):
+    """之前生成过、由本脚本管理的文件（相对路径）"""
+    owned = set()
+    generated_dir = os.path.join(project_path, GENERATED_DIR)
+    if os.path.isdir(generated_dir):
+        for file_name in os.listdir(generated_dir):
+            if file_name.startswith('Generated') and file_name.endswith('.swift'):
+                owned.add(os.path.join(GENERATED_DIR, file_name))
+    if os.path.exists(os.path.join(project_path, RESOURCE_PATH)):
+        owned.add(RESOURCE_PATH)
+    return owned
+
+
+def write_if_changed(path, content):
+    """内容不同才写入（先写临时文件再替换），返回是否写入"""
+    data = content.encode('utf-8')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_files(project_path, files):
+    """写入生成的文件并删除不再生成的旧文件，返回 (写入, 未变化, 删除) 的相对路径列表"""
+    with stage('write_generated_files'):
+        return write_changed_files(project_path, files)
+
+
+def write_changed_files(project_path, files):
+    written, unchanged = [], []
+    for relative_path in sorted(files):
+        if write_if_changed(os.path.join(project_path, relative_path), files[relative_path]):
+            written.append(relative_path)
+        else:
+            unchanged.append(relative_path)
+    removed = sorted(owned_files(project_path) - set(files))
+    for relative_path in removed:
+        os.remove(os.path.join(project_path, relative_path))
+    return written, unchanged, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从 theme_data.json 生成 Swift 数据文件')
+    parser.add_argument('--mode', choices=MODES, default='chunks')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--data', default=os.path.join(SCRIPT_DIR, 'theme_data.json'))
+    args = parser.parse_args()
+
+    try:
+        stores = ThemeModel(PROJECT_DIR, args.data).read_saved()
+    except (OSError, ValueError) as e:
+        print(f'❌ {e}')
+        return 1
+    categories = stores['categories'].records()
+    wallpapers = stores['wallpapers'].records()
+    try:
+        files = generate(categories, wallpapers, args.mode, args.chunk_size)
+    except ValueError as e:
+        print(f'❌ {e}')
+        return 1
+    written, unchanged, removed = write_files(PROJECT_DIR, files)
+
+    print(f'✅ {len(categories)} 个主题、{len(wallpapers)} 个壁纸（{args.mode}）')
+    for relative_path in written:
+        print(f'   ✏️ 已更新: {relative_path}')
+    for relative_path in removed:
+        print(f'   🗑️ 已删除: {relative_path}')
+    print(f'   {len(unchanged)} 个文件没有变化')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
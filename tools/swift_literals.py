@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Swift 字面量解析
+一次线性扫描把 Swift 源码切分为记号，再用递归下降解析初始化器字面量，
+用于从 MotivationApp/Models 中读取 sampleCategories、sampleQuotes、sampleTopics 等示例数组。
+
+- 字符串：支持转义（\\n、\\"、\\u{...} 等）、多行字符串 \"\"\"...\"\"\"、插值 \\(...)
+- 注释：// 行注释和可嵌套的 /* */ 块注释
+- 括号：()、[]、{} 任意嵌套，不依赖缩进和换行格式
+- 值：字符串、数字、true/false/nil、.枚举值、数组、字典、Type(label: 值, ...) 初始化器；
+  其他表达式（如 Category.sampleCategories[0].id）保留为源码文本 Expression
+
+使用方法：
+python3 swift_literals.py                    # 列出 MotivationApp/Models 中的示例数组
+python3 swift_literals.py --benchmark        # 在生成的数 MB Swift 文件上测试解析耗时
+"""
+
+import os
+import re
+import sys
+import time
+
+from instrument import stage
+
+# 记号类型
+STRING = 'string'
+NUMBER = 'number'
+IDENT = 'ident'
+PUNCT = 'punct'
+
+# 一个正则覆盖所有记号，按位置逐个匹配，整个文件只扫描一遍。
+# 分组顺序决定 lastindex：空白、行注释、块注释开始、多行字符串开始、普通字符串、数字、标识符、其他符号
+TOKEN_PATTERN = re.compile(r'''
+    (\s+)
+  | (//[^\n]*)
+  | (/\*)
+  | (""")
+  | ("(?:[^"\\\n]|\\[^(])*")
+  | (0x[0-9A-Fa-f_]+|\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?)
+  | ([^\W\d]\w*|`[^`]+`)
+  | (.)
+''', re.VERBOSE | re.DOTALL)
+
+BLOCK_COMMENT_PATTERN = re.compile(r'/\*|\*/')
+ESCAPE_PATTERN = re.compile(r'\\(u\{[0-9A-Fa-f]+\}|.)', re.DOTALL)
+ESCAPES = {'0': '\0', '\\': '\\', 't': '\t', 'n': '\n', 'r': '\r', '"': '"', "'": "'"}
+
+# 右括号 -> 左括号
+CLOSING = {')': '(', ']': '[', '}': '{'}
+
+# 值之后可以出现的符号
+TERMINATORS = {',', ')', ']', '}', ':'}
+
+
+class SwiftParseError(ValueError):
+    """源码不符合预期的字面量语法"""
+
+    def __init__(self, message, source=None, pos=None):
+        if source is not None and pos is not None:
+            line = source.count('\n', 0, pos) + 1
+            column = pos - (source.rfind('\n', 0, pos) + 1) + 1
+            message = f'{message}（第 {line} 行第 {column} 列）'
+        super().__init__(message)
+
+
+class EnumCase(str):
+    """隐式成员表达式 .name，值为成员名"""
+
+
+class Expression(str):
+    """无法求值的表达式，值为其源码文本"""
+
+
+class SwiftCall:
+    """初始化器或函数调用 Type(label: value, ...)"""
+
+    __slots__ = ('type', 'args')
+
+    def __init__(self, type_name, args):
+        self.type = type_name
+        self.args = args  # [(标签或 None, 值)]
+
+    def fields(self):
+        """带标签的参数 -> {标签: 值}"""
+        return {label: value for label, value in self.args if label is not None}
+
+    def __repr__(self):
+        args = ', '.join(f'{label}: {value!r}' if label else repr(value) for label, value in self.args)
+        return f'{self.type}({args})'
+
+
+def unescape(text):
+    """处理字符串字面量中的转义序列"""
+    if '\\' not in text:
+        return text
+
+    def replace(match):
+        escape = match.group(1)
+        if escape.startswith('u{'):
+            return chr(int(escape[2:-1], 16))
+        return ESCAPES.get(escape, escape)
+
+    return ESCAPE_PATTERN.sub(replace, text)
+
+
+def tokenize(source):
+    """把源码切分为 (类型, 值, 起始位置, 结束位置) 列表，跳过空白和注释
+
+    字符串记号的值是解码后的文本；含插值的字符串值为 Expression（保留源码）。
+    """
+    tokens = []
+    append = tokens.append
+    match = TOKEN_PATTERN.match
+    pos = 0
+    end = len(source)
+    while pos < end:
+        m = match(source, pos)
+        kind = m.lastindex
+        next_pos = m.end()
+        if kind == 1 or kind == 2:
+            pass
+        elif kind == 7:
+            append((IDENT, m.group(7).strip('`'), pos, next_pos))
+        elif kind == 8:
+            char = m.group(8)
+            if char == '"':
+                # 快速匹配失败：含插值 \( 的字符串或未闭合的字符串
+                next_pos = scan_string(source, pos + 1)
+                append((STRING, Expression(source[pos:next_pos]), pos, next_pos))
+            else:
+                append((PUNCT, char, pos, next_pos))
+        elif kind == 5:
+            append((STRING, unescape(m.group(5)[1:-1]), pos, next_pos))
+        elif kind == 6:
+            text = m.group(6).replace('_', '')
+            if text.startswith('0x'):
+                value = int(text, 16)
+            elif '.' in text or 'e' in text or 'E' in text:
+                value = float(text)
+            else:
+                value = int(text)
+            append((NUMBER, value, pos, next_pos))
+        elif kind == 3:
+            next_pos = skip_block_comment(source, pos)
+        else:
+            next_pos = source.find('"""', pos + 3)
+            if next_pos < 0:
+                raise SwiftParseError('多行字符串没有结束', source, pos)
+            next_pos += 3
+            append((STRING, multiline_string(source[pos + 3:next_pos - 3]), pos, next_pos))
+        pos = next_pos
+    return tokens
+
+
+def skip_block_comment(source, pos):
+    """跳过可嵌套的 /* */ 注释，返回注释之后的位置"""
+    depth = 0
+    for m in BLOCK_COMMENT_PATTERN.finditer(source, pos):
+        depth += 1 if m.group() == '/*' else -1
+        if depth == 0:
+            return m.end()
+    raise SwiftParseError('块注释没有结束', source, pos)
+
+
+def scan_string(source, pos):
+    """从开引号之后扫描到字符串结束，插值 \\(...) 中可以再嵌套字符串和括号"""
+    end = len(source)
+    while pos < end:
+        char = source[pos]
+        if char == '"':
+            return pos + 1
+        if char == '\n':
+            break
+        if char == '\\':
+            if source.startswith('\\(', pos):
+                pos = scan_interpolation(source, pos + 2)
+                continue
+            pos += 2
+            continue
+        pos += 1
+    raise SwiftParseError('字符串没有结束', source, pos)
+
+
+def scan_interpolation(source, pos):
+    depth = 1
+    end = len(source)
+    while pos < end:
+        char = source[pos]
+        if char == '"':
+            pos = scan_string(source, pos + 1)
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    raise SwiftParseError('字符串插值没有结束', source, pos)
+
+
+def multiline_string(body):
+    """多行字符串：去掉首尾换行和结束引号所在行的缩进"""
+    lines = body.split('\n')
+    if lines and not lines[0].strip():
+        lines = lines[1:]
+    indent = ''
+    if lines and not lines[-1].strip():
+        indent = lines.pop()
+    text = '\n'.join(line[len(indent):] if line.startswith(indent) else line for line in lines)
+    return unescape(text.replace('\\\n', ''))
+
+
+class LiteralParser:
+    """在记号列表上解析字面量表达式"""
+
+    def __init__(self, source, tokens):
+        self.source = source
+        self.tokens = tokens
+
+    def error(self, message, index):
+        pos = self.tokens[index][2] if index < len(self.tokens) else len(self.source)
+        return SwiftParseError(message, self.source, pos)
+
+    def punct(self, index):
+        if index < len(self.tokens):
+            token = self.tokens[index]
+            if token[0] is PUNCT:
+                return token[1]
+        return None
+
+    def parse_value(self, index):
+        """解析一个值，返回 (值, 下一个记号位置)"""
+        start = index
+        value, index = self.parse_postfix(index)
+        if index < len(self.tokens):
+            kind, token = self.tokens[index][0], self.tokens[index][1]
+            if kind is PUNCT and token not in TERMINATORS or kind is IDENT and token in ('as', 'is'):
+                # 后面还有运算符（如 a + b、x ?? y）：整个表达式按源码保留
+                index = self.skip_expression(index)
+                value = self.expression(start, index)
+            elif kind is not PUNCT:
+                raise self.error('缺少逗号或右括号', index)
+        return value, index
+
+    def parse_postfix(self, index):
+        """解析值及其后缀（.member、(参数)、[下标]）
+
+        Type(label: 值, ...) 得到 SwiftCall；带其他后缀的表达式保留为源码文本。
+        """
+        start = index
+        value, index = self.parse_primary(index)
+        if self.tokens[start][0] is IDENT and isinstance(value, Expression) and self.punct(index) == '(':
+            args, index = self.parse_arguments(index + 1)
+            value = SwiftCall(value, args)
+        has_suffix = False
+        while True:
+            char = self.punct(index)
+            if char == '.' and index + 1 < len(self.tokens) and self.tokens[index + 1][0] in (IDENT, NUMBER):
+                index += 2
+            elif char == '(':
+                _, index = self.parse_arguments(index + 1)
+            elif char == '[' and not self.newline_before(index):
+                index = self.skip_balanced(index)
+            else:
+                break
+            has_suffix = True
+        if has_suffix:
+            value = self.expression(start, index)
+        return value, index
+
+    def newline_before(self, index):
+        # 换行之后的 [ 是下一条语句的数组，不是下标
+        return '\n' in self.source[self.tokens[index - 1][3]:self.tokens[index][2]]
+
+    def parse_primary(self, index):
+        if index >= len(self.tokens):
+            raise self.error('缺少值', index)
+        kind, value, _, _ = self.tokens[index]
+        if kind is STRING or kind is NUMBER:
+            return value, index + 1
+        if kind is IDENT:
+            if value == 'true':
+                return True, index + 1
+            if value == 'false':
+                return False, index + 1
+            if value == 'nil':
+                return None, index + 1
+            return self.expression(index, index + 1), index + 1
+        if value == '-' and index + 1 < len(self.tokens) and self.tokens[index + 1][0] is NUMBER:
+            return -self.tokens[index + 1][1], index + 2
+        if value == '.' and index + 1 < len(self.tokens) and self.tokens[index + 1][0] is IDENT:
+            return EnumCase(self.tokens[index + 1][1]), index + 2
+        if value == '[':
+            return self.parse_collection(index + 1)
+        if value in ('(', '{'):
+            # 元组或闭包
+            end = self.skip_balanced(index)
+            return self.expression(index, end), end
+        raise self.error(f'无法解析的值: {value}', index)
+
+    def parse_collection(self, index):
+        """解析 [ 之后的数组或字典，返回 (list 或 dict, 下一个位置)"""
+        if self.punct(index) == ']':
+            return [], index + 1
+        if self.punct(index) == ':' and self.punct(index + 1) == ']':
+            return {}, index + 2
+        items = []
+        pairs = None
+        while True:
+            item, index = self.parse_value(index)
+            if self.punct(index) == ':':
+                value, index = self.parse_value(index + 1)
+                pairs = pairs if pairs is not None else {}
+                pairs[item] = value
+            else:
+                items.append(item)
+            char = self.punct(index)
+            if char == ',':
+                index += 1
+                if self.punct(index) == ']':
+                    char = ']'
+            if char == ']':
+                if pairs is not None and items:
+                    raise self.error('数组和字典元素混用', index)
+                return (pairs if pairs is not None else items), index + 1
+            if char != ',':
+                raise self.error('数组缺少逗号或 ]', index)
+
+    def parse_arguments(self, index):
+        """解析 ( 之后的参数列表，返回 ([(标签, 值)], 下一个位置)"""
+        args = []
+        if self.punct(index) == ')':
+            return args, index + 1
+        while True:
+            label = None
+            if (index + 1 < len(self.tokens) and self.tokens[index][0] is IDENT
+                    and self.punct(index + 1) == ':'):
+                label = self.tokens[index][1]
+                index += 2
+            value, index = self.parse_value(index)
+            args.append((label, value))
+            char = self.punct(index)
+            if char == ')':
+                return args, index + 1
+            if char != ',':
+                raise self.error('参数缺少逗号或 )', index)
+            index += 1
+
+    def skip_balanced(self, index):
+        """跳过从 index 处左括号开始的整段括号，返回右括号之后的位置"""
+        stack = []
+        tokens = self.tokens
+        while index < len(tokens):
+            kind, value = tokens[index][0], tokens[index][1]
+            if kind is PUNCT:
+                if value in '([{':
+                    stack.append(value)
+                elif value in CLOSING:
+                    if not stack or stack.pop() != CLOSING[value]:
+                        raise self.error(f'括号不匹配: {value}', index)
+                    if not stack:
+                        return index + 1
+            index += 1
+        raise self.error('括号没有闭合', index)
+
+    def skip_expression(self, index):
+        """跳到当前层级的下一个 , 或右括号"""
+        while index < len(self.tokens):
+            char = self.punct(index)
+            if char in ('(', '[', '{'):
+                index = self.skip_balanced(index)
+                continue
+            if char in (',', ')', ']', '}'):
+                return index
+            index += 1
+        return index
+
+    def expression(self, start, end):
+        return Expression(self.source[self.tokens[start][2]:self.tokens[end - 1][3]])
+
+
+def find_array_declarations(tokens):
+    """查找 static let/var 名称: [类型] = [ ... ] 声明
+
+    逐个生成 (名称, 元素类型或 None, 数组 [ 的位置)。
+    """
+    count = len(tokens)
+    for index in range(1, count - 3):
+        kind, value = tokens[index][0], tokens[index][1]
+        if kind is not IDENT or value not in ('let', 'var'):
+            continue
+        # static 和 let/var 之间可能有 private 等修饰符
+        before = index - 1
+        while before >= 0 and tokens[before][0] is IDENT and tokens[before][1] in (
+                'private', 'fileprivate', 'internal', 'public', 'nonisolated'):
+            before -= 1
+        if before < 0 or tokens[before][1] != 'static':
+            continue
+        name_token = tokens[index + 1]
+        if name_token[0] is not IDENT:
+            continue
+        pos = index + 2
+        element_type = None
+        if tokens[pos][0] is PUNCT and tokens[pos][1] == ':':
+            # 类型标注 [Category]
+            if (pos + 3 < count and tokens[pos + 1][1] == '[' and tokens[pos + 2][0] is IDENT
+                    and tokens[pos + 3][1] == ']'):
+                element_type = tokens[pos + 2][1]
+                pos += 4
+            else:
+                continue
+        if (pos + 1 < count and tokens[pos][0] is PUNCT and tokens[pos][1] == '='
+                and tokens[pos + 1][0] is PUNCT and tokens[pos + 1][1] == '['):
+            yield name_token[1], element_type, pos + 1
+
+
+def extract_arrays(source, names=None):
+    """解析源码中的静态数组字面量
+
+    返回 {名称: (元素类型, [值])}；names 不为空时只解析其中列出的数组。
+    元素类型没有标注时取第一个元素的初始化器类型。
+    """
+    with stage('tokenize_swift'):
+        tokens = tokenize(source)
+    parser = LiteralParser(source, tokens)
+    arrays = {}
+    with stage('parse_swift_literals'):
+        for name, element_type, index in find_array_declarations(tokens):
+            if names and name not in names:
+                continue
+            values, _ = parser.parse_collection(index + 1)
+            if not isinstance(values, list):
+                continue
+            if element_type is None and values and isinstance(values[0], SwiftCall):
+                element_type = values[0].type
+            arrays[name] = (element_type, values)
+    return arrays
+
+
+def extract_records(source, name):
+    """取出某个数组中各初始化器的带标签参数 [{标签: 值}]，数组不存在时返回 None"""
+    arrays = extract_arrays(source, {name})
+    if name not in arrays:
+        return None
+    _, values = arrays[name]
+    return [value.fields() for value in values if isinstance(value, SwiftCall)]
+
+
+def load_model_arrays(models_dir):
+    """解析目录下所有 .swift 文件中的静态数组，返回 {文件名: {数组名: (元素类型, [值])}}"""
+    result = {}
+    for file_name in sorted(os.listdir(models_dir)):
+        if not file_name.endswith('.swift'):
+            continue
+        with open(os.path.join(models_dir, file_name), 'r', encoding='utf-8') as f:
+            arrays = extract_arrays(f.read())
+        if arrays:
+            result[file_name] = arrays
+    return result
+
+
+def generate_benchmark_source(count):
+    """生成含 count 个 Category 初始化器的 Swift 源码（带注释、转义和嵌套数组）"""
+    parts = [
+        '// 生成的基准测试数据\n',
+        'extension Category {\n',
+        '    /* 块注释 /* 嵌套 */ 结束 */\n',
+        '    static let sampleCategories: [Category] = [\n',
+    ]
+    for i in range(count):
+        parts.append(
+            f'        Category(  // 第 {i} 个\n'
+            f'            name: "主题 {i} \\"引号\\" \\u{{1F31F}}",\n'
+            f'            icon: "star.fill", colorHex: "#{i % 0xFFFFFF:06X}",\n'
+            f'            description: "描述：包含 ) ] }} 和 // 等字符 {i}",\n'
+            f'            imageName: {"nil" if i % 7 == 0 else f"{chr(34)}theme_{i}{chr(34)}"},\n'
+            f'            type: .{("normal", "combined", "seasonal")[i % 3]},\n'
+            f'            isNew: {"true" if i % 5 == 0 else "false"},\n'
+            f'            isFeatured: {"true" if i % 11 == 0 else "false"},\n'
+            f'            tags: ["标签{i % 13}", "组合", /* 内联注释 */ "[{i}]"]\n'
+            f'        ),\n'
+        )
+    parts.append('    ]\n}\n')
+    return ''.join(parts)
+
+
+def benchmark(count=12000):
+    source = generate_benchmark_source(count)
+    size_mb = len(source.encode('utf-8')) / 1024 / 1024
+    print(f'生成 {count} 个 Category，{size_mb:.1f} MB')
+
+    start = time.perf_counter()
+    tokens = tokenize(source)
+    tokenize_ms = (time.perf_counter() - start) * 1000
+    print(f'切分记号: {len(tokens)} 个, {tokenize_ms:.0f} ms')
+
+    start = time.perf_counter()
+    records = extract_records(source, 'sampleCategories')
+    total_ms = (time.perf_counter() - start) * 1000
+    print(f'切分 + 解析: {len(records)} 条, {total_ms:.0f} ms（{size_mb / total_ms * 1000:.1f} MB/s）')
+
+    sample = records[-1]
+    assert len(records) == count
+    assert sample['name'] == f'主题 {count - 1} "引号" 🌟'
+    assert sample['tags'][-1] == f'[{count - 1}]'
+    print(f'最后一条: {sample}')
+
+
+def main():
+    if '--benchmark' in sys.argv:
+        benchmark()
+        return
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    models_dir = os.path.join(script_dir, '..', 'MotivationApp', 'Models')
+    for file_name, arrays in load_model_arrays(models_dir).items():
+        for name, (element_type, values) in arrays.items():
+            print(f'📄 {file_name}: {name} [{element_type}] × {len(values)}')
+
+
+if __name__ == '__main__':
+    main()
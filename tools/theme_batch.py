@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主题和壁纸批量编辑
+从文件读取编辑命令，一次性应用到 theme_data.json（与 theme_manager.py 使用同一个数据模型）
+
+命令文件为 JSON 数组或每行一个 JSON 对象（JSON Lines），支持的命令：
+{"action": "update", "kind": "wallpapers", "where": {"themeId": "季节"}, "set": {"isLocked": true}}
+{"action": "delete", "kind": "wallpapers", "where": {"name": "旧壁纸"}}
+{"action": "add", "kind": "categories", "record": {"name": "新主题", "icon": "star.fill", ...}}
+{"action": "add", "kind": "wallpapers", "records": [{...}, {...}]}
+{"action": "rename_theme", "from": "季节", "to": "四季"}
+
+- kind 为 categories 或 wallpapers
+- where 按字段值精确匹配，"text" 表示名称包含该文本；{} 表示全部记录（必须显式写出）
+- 所有命令的编辑只写一次编辑日志，完成后保存快照；任何一条命令出错时整批都不生效
+
+运行前请先关闭主题管理工具，避免两边同时写入编辑日志。
+
+使用方法：
+python3 theme_batch.py edits.jsonl              # 应用命令并保存
+python3 theme_batch.py edits.jsonl --dry-run    # 只显示每条命令影响的记录数，不保存
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from instrument import stage
+from theme_model import FACET_FIELDS, ThemeModel
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+KINDS = ("categories", "wallpapers")
+
+
+def read_commands(path):
+    """读取命令文件：JSON 数组或 JSON Lines；path 为 - 时从标准输入读取"""
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        commands = json.loads(stripped)
+    else:
+        commands = []
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if line.strip() and not line.lstrip().startswith("//"):
+                try:
+                    commands.append(json.loads(line))
+                except ValueError as e:
+                    raise ValueError(f"第 {line_no} 行不是有效的 JSON: {e}")
+    for number, command in enumerate(commands, start=1):
+        if not isinstance(command, dict):
+            raise ValueError(f"第 {number} 条命令必须是 JSON 对象: {command}")
+    return commands
+
+
+def check_kind(command):
+    kind = command.get("kind")
+    if kind not in KINDS:
+        raise ValueError(f"kind 必须是 {' 或 '.join(KINDS)}: {command}")
+    return kind
+
+
+def check_where(command, kind):
+    where = command.get("where")
+    if not isinstance(where, dict):
+        raise ValueError(f"缺少 where 条件（全部记录请写 {{}}）: {command}")
+    if not isinstance(where.get("text", ""), str):
+        raise ValueError(f"where 的 text 必须是字符串: {command}")
+    # 这些字段直接查搜索索引，值必须是单个字符串、数字或布尔值
+    for field in FACET_FIELDS[kind]:
+        if isinstance(where.get(field), (list, dict)):
+            raise ValueError(f"where 的 {field} 必须是单个值: {command}")
+    return where
+
+
+def run_command(model, command):
+    """执行一条命令，返回影响的记录数"""
+    action = command.get("action")
+    if action == "update":
+        kind = check_kind(command)
+        changes = command.get("set")
+        if not isinstance(changes, dict) or not changes:
+            raise ValueError(f"update 缺少 set: {command}")
+        return len(model.update_where(kind, check_where(command, kind), changes))
+    if action == "delete":
+        kind = check_kind(command)
+        return len(model.remove_where(kind, check_where(command, kind)))
+    if action == "add":
+        kind = check_kind(command)
+        records = command.get("records") or [command.get("record")]
+        if not all(isinstance(record, dict) and record.get("name") for record in records):
+            raise ValueError(f"add 的记录必须包含 name: {command}")
+        return len(model.add_records(kind, records))
+    if action == "rename_theme":
+        if not command.get("from") or not command.get("to"):
+            raise ValueError(f"rename_theme 需要 from 和 to: {command}")
+        return len(model.rename_theme(command["from"], command["to"]))
+    raise ValueError(f"未知的命令: {action}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量编辑主题和壁纸数据")
+    parser.add_argument("commands", help="命令文件（JSON 数组或 JSON Lines），- 表示标准输入")
+    parser.add_argument("--dry-run", action="store_true", help="只显示影响的记录数，不保存")
+    args = parser.parse_args()
+
+    try:
+        commands = read_commands(args.commands)
+    except (OSError, ValueError) as e:
+        print(f"❌ 无法读取命令文件: {e}")
+        sys.exit(1)
+    model = ThemeModel(PROJECT_DIR)
+    start = time.perf_counter()
+    try:
+        model.load(open_journal=not args.dry_run)
+    except ValueError as e:
+        # 快照已另存为 .bak，日志保持不动，可在 theme_manager.py 中打开以恢复
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"📂 已加载 {len(model.categories)} 个主题和 {len(model.wallpapers)} 个壁纸"
+          f"（{(time.perf_counter() - start) * 1000:.0f} ms）")
+
+    start = time.perf_counter()
+    total = 0
+    number = 0
+    try:
+        # 所有命令合并为一批：只写一次编辑日志
+        with stage('run_commands'), model.batch(f"批量编辑（{len(commands)} 条命令）"):
+            for number, command in enumerate(commands, start=1):
+                count = run_command(model, command)
+                total += count
+                print(f"   {number}. {command.get('action')} {command.get('kind', '')}: {count} 条记录")
+    except (TypeError, ValueError) as e:
+        # 整批命令都已撤回，没有写入日志，修正命令文件后可以重新运行
+        # （TypeError：set 中的值类型不对等没有在检查中发现的错误）
+        print(f"❌ 第 {number} 条命令: {e}")
+        model.close()
+        sys.exit(1)
+    print(f"✏️ 共修改 {total} 条记录（{(time.perf_counter() - start) * 1000:.0f} ms）")
+
+    if args.dry_run:
+        print("🔍 演练模式，未保存")
+        return
+    start = time.perf_counter()
+    model.save()
+    model.close()
+    print(f"💾 已保存到 {model.data_file}（{(time.perf_counter() - start) * 1000:.0f} ms）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+theme_data.json 的编辑日志和原子快照
+
+- 每次编辑只往 theme_data.journal 追加一行 JSON（新增/修改/删除/整体替换），开销与编辑大小相当
+- 定期把全部数据写成快照：先写临时文件再原子替换 theme_data.json，写入中途崩溃不会损坏原文件
+- 快照记录已包含的日志序号 journalSeq；启动时读取快照并重放之后的日志
+
+快照格式在原有字段之外增加：
+{
+  "categories": [...],
+  "wallpapers": [...],
+  "updated_at": "...",
+  "recordIds": {"categories": ["c1", ...], "wallpapers": ["w1", ...]},
+  "journalSeq": 42
+}
+
+日志格式（每行一条）：
+{"seq": 43, "op": "add", "kind": "wallpapers", "id": "w57", "record": {...}}
+{"seq": 44, "op": "update", "kind": "wallpapers", "id": "w57", "record": {...}}
+{"seq": 45, "op": "remove", "kind": "wallpapers", "id": "w57"}
+{"seq": 46, "op": "add", "kind": "wallpapers", "id": "w57", "record": {...}, "position": 3}  # 撤销删除：插回原位置
+{"seq": 47, "op": "replace", "kind": "categories", "ids": [...], "records": [...]}
+"""
+
+import os
+from datetime import datetime
+
+import catalog
+from instrument import stage
+
+RECORD_KINDS = ("categories", "wallpapers")
+
+
+class EditJournal:
+    """追加写入的编辑日志（只在 Tk 主线程中使用）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.seq = 0
+        self.file = None
+
+    def open(self, seq):
+        """从序号 seq 之后继续追加"""
+        self.close()
+        self.seq = seq
+        self.repair_tail()
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def repair_tail(self):
+        """去掉上次崩溃时写了一半的最后一行，避免新日志接在它后面"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            content = f.read()
+            if content and not content.endswith(b"\n"):
+                f.truncate(content.rfind(b"\n") + 1)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def append(self, op, kind, **fields):
+        """追加一条编辑并刷到磁盘，返回它的序号"""
+        return self.append_many([dict(op=op, kind=kind, **fields)])
+
+    def append_many(self, entries):
+        """一次追加多条编辑，只同步一次磁盘（批量操作使用）"""
+        with stage('journal_append'):
+            lines = []
+            for entry in entries:
+                self.seq += 1
+                lines.append(catalog.dumps(dict(seq=self.seq, **entry), indent=False))
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        return self.seq
+
+    def reset(self):
+        """清空日志（数据整体来自新的来源时）"""
+        self.close()
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        self.open(self.seq)
+
+    def compact(self, upto_seq):
+        """快照已包含 upto_seq 及之前的编辑：只保留之后的日志"""
+        self.close()
+        with stage('compact_journal'):
+            self.write_remaining(upto_seq)
+        self.open(self.seq)
+
+    def write_remaining(self, upto_seq):
+        remaining = read_journal(self.path, upto_seq)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in remaining:
+                f.write(catalog.dumps(entry, indent=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+def read_journal(path, after_seq=0):
+    """读取序号大于 after_seq 的日志；最后一行不完整（写入时崩溃）时忽略该行"""
+    if not os.path.exists(path):
+        return []
+    with stage('read_journal'):
+        return parse_journal(path, after_seq)
+
+
+def parse_journal(path, after_seq):
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            entry = catalog.loads(line)
+        except ValueError:
+            if line_no >= len(lines) - 1:
+                print(f"⚠️ 忽略不完整的日志行: {path}:{line_no}")
+                break
+            raise
+        if entry["seq"] > after_seq:
+            entries.append(entry)
+    return entries
+
+
+def apply_entry(stores, entry):
+    """把一条日志应用到 {kind: RecordStore}"""
+    store = stores[entry["kind"]]
+    op = entry["op"]
+    if op in ("update", "remove") and entry["id"] not in store:
+        # 快照与日志不匹配（如快照丢失），继续重放会留下不在 order 中的记录
+        raise ValueError(f"日志第 {entry.get('seq')} 条引用了不存在的记录: {entry['id']}")
+    if op == "add":
+        store.add(entry["record"], entry["id"], entry.get("position"))
+    elif op == "update":
+        store.update(entry["id"], entry["record"])
+    elif op == "remove":
+        store.remove(entry["id"])
+    elif op == "replace":
+        store.load(entry["records"], entry["ids"])
+    else:
+        raise ValueError(f"未知的日志操作: {op}")
+
+
+def replay(stores, entries):
+    """重放日志，返回最后一条的序号（没有日志时返回 None）"""
+    for entry in entries:
+        apply_entry(stores, entry)
+    return entries[-1]["seq"] if entries else None
+
+
+def load_snapshot(data, stores):
+    """把快照数据载入 {kind: RecordStore}，返回快照包含的日志序号"""
+    ids = data.get("recordIds", {})
+    for kind in RECORD_KINDS:
+        records = data.get(kind, [])
+        kind_ids = ids.get(kind)
+        # 旧版本保存的文件没有 id，按顺序重新分配
+        stores[kind].load(records, kind_ids if kind_ids and len(kind_ids) == len(records) else None)
+    return data.get("journalSeq", 0)
+
+
+def snapshot_data(stores, seq):
+    """在主线程中取数据快照（只复制列表，记录本身不会被原地修改）"""
+    data = {kind: stores[kind].records() for kind in RECORD_KINDS}
+    data["updated_at"] = datetime.now().isoformat()
+    data["recordIds"] = {kind: list(stores[kind].order) for kind in RECORD_KINDS}
+    data["journalSeq"] = seq
+    return data
+
+
+def write_snapshot(path, data):
+    """原子写入快照：写临时文件并同步到磁盘后替换原文件"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with stage('write_snapshot'), open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(catalog.dumps(data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -3,14 +3,34 @@
 """
 主题和壁纸管理工具
 用于可视化管理 Motivation App 的主题分类和壁纸数据
+数据的加载、编辑、撤销和保存由 theme_model.ThemeModel 负责，这里只是界面
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox, colorchooser, filedialog
-import json
 import os
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-import re
+
+import instrument
+import swift_codegen
+import wallpaper_import
+from theme_model import ThemeModel, Task, OperationCancelled, new_collection
+from thumbnails import ThumbnailLoader, ImageTk
+
+# 搜索框输入停止多久后才执行筛选（毫秒）
+FILTER_DEBOUNCE_MS = 150
+
+# 筛选下拉框中表示"不筛选"的选项
+FILTER_ALL = "全部"
+
+# 预览时预取选中行上下各多少行的缩略图
+PREFETCH_RADIUS = 4
+
+# 第一次未保存的编辑之后多久自动写快照（期间的编辑合并为一次写入）
+AUTOSAVE_DELAY_MS = 30 * 1000
 
 class ThemeManagerApp:
     def __init__(self, root):
@@ -18,18 +38,69 @@ class ThemeManagerApp:
         self.root.title("Motivation 主题和壁纸管理工具")
         self.root.geometry("1200x800")
         
-        # 数据存储
-        self.categories = []
-        self.wallpapers = []
+        # 数据模型：记录集合、搜索索引、编辑日志和撤销历史。
+        # 每条记录有稳定 id，同时作为 Treeview 行的 iid；编辑生效后通过观察者接口局部刷新列表
         self.project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.model = ThemeModel(self.project_path)
+        self.model.add_observer(self)
+        self.category_query = ("", {})
+        self.wallpaper_query = ("", {})
+        self.filter_job = None
+        # 多条编辑执行期间暂停逐行刷新：{kind: 最后新增的记录 id 或 None}，结束后每个列表只刷新一次
+        self.deferred_refresh = None
+        
+        # 每次编辑追加到日志，定期合并写成快照（数据加载完成后才打开日志）
+        self.snapshot_worker = BackgroundWorker(root)
+        self.snapshot_waiters = []    # 等待下一次快照写完的 (on_saved, on_failed)
+        self.snapshot_pending = False
+        self.unsaved_edits = False
+        self.autosave_job = None
+        
+        # 文件读写放在后台线程，避免大文件卡住界面
+        self.worker = BackgroundWorker(root)
+        self.io_buttons = []    # 读写期间禁用的按钮
+        self.edit_buttons = []  # 加载期间禁用的编辑按钮
+        self.edits_locked = False
+        
+        # 壁纸预览：线程池解码缩略图，LRU 缓存解码结果
+        self.thumbnails = ThumbnailLoader(root, self.project_path)
+        self.preview_image_name = None
+        self.preview_photo = None
+        
+        # 创建界面
+        self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<Control-z>", self.undo)
+        self.root.bind("<Control-y>", self.redo)
+        self.root.bind("<Control-Z>", self.redo)
         
         # 加载现有数据
         self.load_data()
         
-        # 创建界面
-        self.create_widgets()
+    @property
+    def categories(self):
+        return self.model.categories
+        
+    @property
+    def wallpapers(self):
+        return self.model.wallpapers
+        
+    @property
+    def category_index(self):
+        return self.model.collections["categories"].index
+        
+    @property
+    def wallpaper_index(self):
+        return self.model.collections["wallpapers"].index
+        
+    @property
+    def journal(self):
+        return self.model.journal
         
     def create_widgets(self):
+        # 搜索和筛选
+        self.create_filter_bar()
+        
         # 创建主容器
         main_container = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
         main_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -51,326 +122,606 @@ class ThemeManagerApp:
         # 底部按钮
         self.create_bottom_buttons()
         
+    def create_filter_bar(self):
+        bar = ttk.Frame(self.root)
+        bar.pack(fill=tk.X, padx=10, pady=(10, 0))
+        
+        ttk.Label(bar, text="🔍 搜索:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar(value="")
+        ttk.Entry(bar, textvariable=self.search_var, width=24).pack(side=tk.LEFT, padx=5)
+        
+        # 下拉框的可选值在展开时从索引中读取，始终与当前数据一致
+        self.theme_filter_var = tk.StringVar(value=FILTER_ALL)
+        self.locked_filter_var = tk.StringVar(value=FILTER_ALL)
+        self.tag_filter_var = tk.StringVar(value=FILTER_ALL)
+        self.type_filter_var = tk.StringVar(value=FILTER_ALL)
+        filters = (
+            ("主题:", self.theme_filter_var, lambda: self.wallpaper_index.facet_values("themeId")),
+            ("锁定:", self.locked_filter_var, lambda: ["锁定", "未锁定"]),
+            ("标签:", self.tag_filter_var, lambda: self.category_index.facet_values("tag")),
+            ("类型:", self.type_filter_var, lambda: ["normal", "combined", "seasonal"]),
+        )
+        for label, var, values in filters:
+            ttk.Label(bar, text=label).pack(side=tk.LEFT, padx=(10, 0))
+            combo = ttk.Combobox(bar, textvariable=var, width=12, state="readonly")
+            combo.configure(postcommand=lambda c=combo, v=values: c.configure(values=[FILTER_ALL] + v()))
+            combo.pack(side=tk.LEFT, padx=5)
+            
+        ttk.Button(bar, text="清除筛选", command=self.clear_filters).pack(side=tk.LEFT, padx=10)
+        
+        for var in (self.search_var, self.theme_filter_var, self.locked_filter_var,
+                    self.tag_filter_var, self.type_filter_var):
+            var.trace_add("write", lambda *args: self.schedule_filter())
+            
+    def schedule_filter(self):
+        """输入变化后延迟执行筛选，连续输入只筛选一次"""
+        if self.filter_job is not None:
+            self.root.after_cancel(self.filter_job)
+        self.filter_job = self.root.after(FILTER_DEBOUNCE_MS, self.apply_filters)
+        
+    def clear_filters(self):
+        self.search_var.set("")
+        for var in (self.theme_filter_var, self.locked_filter_var, self.tag_filter_var, self.type_filter_var):
+            var.set(FILTER_ALL)
+            
+    def apply_filters(self):
+        self.filter_job = None
+        text = self.search_var.get().strip()
+        
+        def selected(var):
+            value = var.get()
+            return None if value == FILTER_ALL else value
+            
+        locked = selected(self.locked_filter_var)
+        self.category_query = (text, {
+            "tag": selected(self.tag_filter_var),
+            "type": selected(self.type_filter_var),
+        })
+        self.wallpaper_query = (text, {
+            "themeId": selected(self.theme_filter_var),
+            "locked": None if locked is None else locked == "锁定",
+        })
+        with instrument.stage('apply_filters'):
+            self.refresh_category_list()
+            self.refresh_wallpaper_list()
+        
     def create_category_section(self, parent):
         # 标题
         title = ttk.Label(parent, text="主题分类管理", font=("Arial", 16, "bold"))
         title.pack(pady=10)
+        self.category_count_var = tk.StringVar(value="")
+        ttk.Label(parent, textvariable=self.category_count_var).pack()
         
         # 按钮区域
         btn_frame = ttk.Frame(parent)
         btn_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        ttk.Button(btn_frame, text="➕ 新增主题", command=self.add_category).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="✏️ 编辑主题", command=self.edit_category).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="🗑️ 删除主题", command=self.delete_category).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="🔄 重新加载", command=self.reload_from_swift).pack(side=tk.LEFT, padx=5)
+        for text, command in (("➕ 新增主题", self.add_category),
+                              ("✏️ 编辑主题", self.edit_category),
+                              ("🗑️ 删除主题", self.delete_category)):
+            btn = ttk.Button(btn_frame, text=text, command=command)
+            btn.pack(side=tk.LEFT, padx=5)
+            self.edit_buttons.append(btn)
+        btn = ttk.Button(btn_frame, text="🔄 重新加载", command=self.reload_from_swift)
+        btn.pack(side=tk.LEFT, padx=5)
+        self.io_buttons.append(btn)
         
         # 列表区域
         list_frame = ttk.Frame(parent)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # 创建 Treeview
+        # 创建虚拟列表（只为可见区域创建行）
         columns = ("名称", "类型", "图标", "颜色", "标签")
-        self.category_tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=15)
-        
-        for col in columns:
-            self.category_tree.heading(col, text=col)
-            self.category_tree.column(col, width=100)
-        
-        # 滚动条
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.category_tree.yview)
-        self.category_tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.category_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # 加载数据到列表
-        self.refresh_category_list()
+        self.category_list = VirtualTreeview(list_frame, columns, self.category_row_values)
+        self.category_list.frame.pack(fill=tk.BOTH, expand=True)
         
     def create_wallpaper_section(self, parent):
         # 标题
         title = ttk.Label(parent, text="壁纸管理", font=("Arial", 16, "bold"))
         title.pack(pady=10)
+        self.wallpaper_count_var = tk.StringVar(value="")
+        ttk.Label(parent, textvariable=self.wallpaper_count_var).pack()
         
         # 按钮区域
         btn_frame = ttk.Frame(parent)
         btn_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        ttk.Button(btn_frame, text="➕ 新增壁纸", command=self.add_wallpaper).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="✏️ 编辑壁纸", command=self.edit_wallpaper).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="🗑️ 删除壁纸", command=self.delete_wallpaper).pack(side=tk.LEFT, padx=5)
+        for text, command in (("➕ 新增壁纸", self.add_wallpaper),
+                              ("✏️ 编辑壁纸", self.edit_wallpaper),
+                              ("🗑️ 删除壁纸", self.delete_wallpaper),
+                              ("📥 批量导入", self.import_wallpapers)):
+            btn = ttk.Button(btn_frame, text=text, command=command)
+            btn.pack(side=tk.LEFT, padx=5)
+            self.edit_buttons.append(btn)
         
         # 列表区域
         list_frame = ttk.Frame(parent)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # 创建 Treeview
-        columns = ("名称", "主题ID", "图片文件", "是否锁定")
-        self.wallpaper_tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=15)
-        
-        for col in columns:
-            self.wallpaper_tree.heading(col, text=col)
-            self.wallpaper_tree.column(col, width=100)
+        # 预览区域（在列表右侧）
+        self.create_preview_pane(list_frame)
         
-        # 滚动条
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.wallpaper_tree.yview)
-        self.wallpaper_tree.configure(yscrollcommand=scrollbar.set)
+        # 创建虚拟列表（只为可见区域创建行）
+        columns = ("名称", "主题ID", "图片文件", "是否锁定")
+        self.wallpaper_list = VirtualTreeview(list_frame, columns, self.wallpaper_row_values,
+                                              command=self.on_wallpaper_selected)
+        self.wallpaper_list.frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+    def create_preview_pane(self, parent):
+        frame = ttk.LabelFrame(parent, text="预览", padding=5)
+        frame.pack(side=tk.RIGHT, fill=tk.Y, padx=(5, 0))
+        self.preview_label = ttk.Label(frame, text="选择壁纸以预览", anchor=tk.CENTER, width=34)
+        self.preview_label.pack(fill=tk.BOTH, expand=True)
+        self.preview_info_var = tk.StringVar(value="")
+        ttk.Label(frame, textvariable=self.preview_info_var, wraplength=240, justify=tk.CENTER).pack(pady=5)
+        
+    def on_wallpaper_selected(self, iid):
+        """选中壁纸时请求缩略图，并预取附近几行"""
+        image_name = self.wallpapers.get(iid).get("imageName", "")
+        self.preview_image_name = image_name
+        if not image_name:
+            self.show_preview(image_name, None, "未设置图片文件")
+            return
+        self.preview_info_var.set(f"{image_name}\n加载中...")
+        self.thumbnails.request(image_name, self.show_preview)
         
-        self.wallpaper_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        rows = self.wallpaper_list.rows
+        position = self.wallpaper_list.selected_position()
+        nearby = range(max(0, position - PREFETCH_RADIUS), min(len(rows), position + PREFETCH_RADIUS + 1))
+        names = [self.wallpapers.get(rows[p]).get("imageName", "") for p in nearby if p != position]
+        self.thumbnails.prefetch([name for name in names if name])
         
-        # 加载数据到列表
-        self.refresh_wallpaper_list()
+    def show_preview(self, image_name, image, info):
+        if image_name != self.preview_image_name:
+            return
+        if image is None:
+            self.preview_photo = None
+            self.preview_label.configure(image="", text=info)
+            self.preview_info_var.set(image_name)
+        else:
+            # PhotoImage 只能在主线程创建，缩略图已缩小，创建开销很小
+            self.preview_photo = ImageTk.PhotoImage(image)
+            self.preview_label.configure(image=self.preview_photo, text="")
+            self.preview_info_var.set(f"{image_name}\n{info[0]} × {info[1]}")
         
     def create_bottom_buttons(self):
         bottom_frame = ttk.Frame(self.root)
         bottom_frame.pack(fill=tk.X, padx=10, pady=10)
         
-        ttk.Button(bottom_frame, text="💾 保存数据", command=self.save_data).pack(side=tk.LEFT, padx=5)
-        ttk.Button(bottom_frame, text="📤 导出 Swift 代码", command=self.export_swift_code).pack(side=tk.LEFT, padx=5)
+        for text, command in (("💾 保存数据", self.save_data),
+                              ("📤 导出 Swift 代码", self.export_swift_code),
+                              ("🧩 生成 Swift 数据文件", self.generate_swift_files)):
+            btn = ttk.Button(bottom_frame, text=text, command=command)
+            btn.pack(side=tk.LEFT, padx=5)
+            self.io_buttons.append(btn)
         ttk.Button(bottom_frame, text="📁 打开项目目录", command=self.open_project_folder).pack(side=tk.LEFT, padx=5)
+        for text, command in (("↩️ 撤销", self.undo), ("↪️ 重做", self.redo)):
+            btn = ttk.Button(bottom_frame, text=text, command=command)
+            btn.pack(side=tk.LEFT, padx=5)
+            self.edit_buttons.append(btn)
+        
+        # 后台任务状态：进度条、状态文字和取消按钮
+        self.cancel_button = ttk.Button(bottom_frame, text="取消", command=self.worker.cancel)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.cancel_button.state(["disabled"])
+        self.progress_bar = ttk.Progressbar(bottom_frame, length=200, maximum=1.0)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(bottom_frame, textvariable=self.status_var).pack(side=tk.RIGHT, padx=5)
+        
+    def run_in_background(self, title, work, on_done, on_error=None, cancellable=False, lock_edits=False):
+        """在后台线程执行 work(task)，完成后在 Tk 主线程调用 on_done(result)
+        
+        执行期间禁用冲突的按钮；lock_edits 为 True 时（加载数据）同时禁用编辑按钮。
+        数据没有加载成功（日志未打开）时，结束后编辑按钮仍保持禁用，见 unlock_edits。
+        """
+        if self.worker.busy():
+            messagebox.showwarning("警告", "有操作正在进行，请稍候")
+            return
+            
+        buttons = self.io_buttons + (self.edit_buttons if lock_edits else [])
+        for btn in buttons:
+            btn.state(["disabled"])
+        self.edits_locked = lock_edits or self.journal.file is None
+        if cancellable:
+            self.cancel_button.state(["!disabled"])
+        self.status_var.set(title)
+        self.progress_bar.configure(mode="indeterminate")
+        self.progress_bar.start(15)
+        
+        def on_progress(text, fraction):
+            if text:
+                self.status_var.set(text)
+            if fraction is not None:
+                if str(self.progress_bar["mode"]) != "determinate":
+                    self.progress_bar.stop()
+                    self.progress_bar.configure(mode="determinate")
+                self.progress_bar["value"] = fraction
+                
+        def on_finish():
+            # 加载被取消时数据不完整、日志未打开，编辑不会被记录：保持禁用，直到加载成功
+            loaded = self.journal.file is not None
+            for btn in buttons:
+                if loaded or btn not in self.edit_buttons:
+                    btn.state(["!disabled"])
+            self.edits_locked = not loaded
+            self.cancel_button.state(["disabled"])
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+            self.progress_bar["value"] = 0
+            
+        def on_cancelled():
+            if self.journal.file is None:
+                self.status_var.set(f'{title}已取消，数据未加载，编辑已禁用（点击"保存数据"可重新加载）')
+            else:
+                self.status_var.set(f"{title}已取消")
+            
+        def handle_error(error):
+            self.status_var.set(f"{title}失败")
+            if on_error:
+                on_error(error)
+            else:
+                messagebox.showerror("错误", f"{title}失败: {str(error)}")
+                
+        self.worker.start(work, on_done, handle_error, on_progress, on_cancelled, on_finish, cancellable)
+        
+    def unlock_edits(self):
+        """数据加载成功（或从空数据恢复）、日志已打开后启用编辑"""
+        for btn in self.edit_buttons:
+            btn.state(["!disabled"])
+        self.edits_locked = False
+        
+    def on_close(self):
+        # 编辑都已写入日志，快照写入是原子的，随时关闭都不会丢数据
+        self.worker.cancel()
+        self.model.close()
+        self.thumbnails.shutdown()
+        self.root.destroy()
         
     def add_category(self):
         dialog = CategoryDialog(self.root, "新增主题分类")
         if dialog.result:
-            self.categories.append(dialog.result)
-            self.refresh_category_list()
+            self.perform("新增主题", [{"op": "add", "kind": "categories", "record": dialog.result}])
             messagebox.showinfo("成功", "主题分类已添加")
             
     def edit_category(self):
-        selection = self.category_tree.selection()
-        if not selection:
+        iid = self.category_list.selected_key()
+        if iid is None:
             messagebox.showwarning("警告", "请先选择一个主题分类")
             return
             
-        index = self.category_tree.index(selection[0])
-        category = self.categories[index]
+        category = self.categories.get(iid)
         
         dialog = CategoryDialog(self.root, "编辑主题分类", category)
         if dialog.result:
-            self.categories[index] = dialog.result
-            self.refresh_category_list()
+            self.perform("编辑主题", [{"op": "update", "kind": "categories", "id": iid, "record": dialog.result}])
             messagebox.showinfo("成功", "主题分类已更新")
             
     def delete_category(self):
-        selection = self.category_tree.selection()
-        if not selection:
+        iid = self.category_list.selected_key()
+        if iid is None:
             messagebox.showwarning("警告", "请先选择一个主题分类")
             return
             
         if messagebox.askyesno("确认", "确定要删除这个主题分类吗？"):
-            index = self.category_tree.index(selection[0])
-            del self.categories[index]
-            self.refresh_category_list()
+            self.perform("删除主题", [{"op": "remove", "kind": "categories", "id": iid}])
             messagebox.showinfo("成功", "主题分类已删除")
             
     def add_wallpaper(self):
         dialog = WallpaperDialog(self.root, "新增壁纸", self.categories)
         if dialog.result:
-            self.wallpapers.append(dialog.result)
-            self.refresh_wallpaper_list()
+            self.remember_image_path(dialog)
+            self.perform("新增壁纸", [{"op": "add", "kind": "wallpapers", "record": dialog.result}])
             messagebox.showinfo("成功", "壁纸已添加")
             
     def edit_wallpaper(self):
-        selection = self.wallpaper_tree.selection()
-        if not selection:
+        iid = self.wallpaper_list.selected_key()
+        if iid is None:
             messagebox.showwarning("警告", "请先选择一个壁纸")
             return
             
-        index = self.wallpaper_tree.index(selection[0])
-        wallpaper = self.wallpapers[index]
+        wallpaper = self.wallpapers.get(iid)
         
         dialog = WallpaperDialog(self.root, "编辑壁纸", self.categories, wallpaper)
         if dialog.result:
-            self.wallpapers[index] = dialog.result
-            self.refresh_wallpaper_list()
+            self.remember_image_path(dialog)
+            # 保留批量导入时记录的哈希和尺寸；换了图片则去掉
+            record = dict(wallpaper, **dialog.result)
+            if record["imageName"] != wallpaper.get("imageName"):
+                for field in wallpaper_import.IMPORT_FIELDS:
+                    record.pop(field, None)
+            self.perform("编辑壁纸", [{"op": "update", "kind": "wallpapers", "id": iid, "record": record}])
             messagebox.showinfo("成功", "壁纸已更新")
             
     def delete_wallpaper(self):
-        selection = self.wallpaper_tree.selection()
-        if not selection:
+        iid = self.wallpaper_list.selected_key()
+        if iid is None:
             messagebox.showwarning("警告", "请先选择一个壁纸")
             return
             
         if messagebox.askyesno("确认", "确定要删除这个壁纸吗？"):
-            index = self.wallpaper_tree.index(selection[0])
-            del self.wallpapers[index]
-            self.refresh_wallpaper_list()
+            self.perform("删除壁纸", [{"op": "remove", "kind": "wallpapers", "id": iid}])
             messagebox.showinfo("成功", "壁纸已删除")
             
-    def refresh_category_list(self):
-        # 清空列表
-        for item in self.category_tree.get_children():
-            self.category_tree.delete(item)
+    def import_wallpapers(self):
+        """从文件夹批量导入壁纸：在后台计算哈希、读取尺寸并检查重复，新记录作为一步编辑加入"""
+        folder = filedialog.askdirectory(title="选择壁纸文件夹")
+        if not folder:
+            return
+        # 在主线程中取已有记录的快照（只复制列表），后台线程只读它
+        categories = self.categories.records()
+        wallpapers = self.wallpapers.records()
+        
+        def work(task):
+            return wallpaper_import.import_folder(folder, categories, wallpapers, task)
             
-        # 添加数据
-        for cat in self.categories:
-            self.category_tree.insert("", tk.END, values=(
-                cat.get("name", ""),
-                cat.get("type", ""),
-                cat.get("icon", ""),
-                cat.get("colorHex", ""),
-                ", ".join(cat.get("tags", []))
-            ))
+        def on_done(result):
+            self.status_var.set("")
+            for image_name, path in result.image_paths.items():
+                self.thumbnails.locator.remember(image_name, path)
+            if result.wallpapers:
+                self.perform(f"批量导入壁纸（{len(result.wallpapers)} 张）", result.entries())
+            messagebox.showinfo("导入完成", result.summary())
             
-    def refresh_wallpaper_list(self):
-        # 清空列表
-        for item in self.wallpaper_tree.get_children():
-            self.wallpaper_tree.delete(item)
-            
-        # 添加数据
-        for wp in self.wallpapers:
-            self.wallpaper_tree.insert("", tk.END, values=(
-                wp.get("name", ""),
-                wp.get("themeId", ""),
-                wp.get("imageName", ""),
-                "是" if wp.get("isLocked", False) else "否"
-            ))
+        self.run_in_background("批量导入壁纸", work, on_done, cancellable=True, lock_edits=True)
+        
+    def remember_image_path(self, dialog):
+        """通过"浏览"选择的图片可能不在资源目录中，记下完整路径供预览使用"""
+        if dialog.image_path and dialog.result["imageName"] == dialog.image_path[0]:
+            self.thumbnails.locator.remember(*dialog.image_path)
             
-    def load_data(self):
-        """加载数据：优先从 JSON，否则从 Swift 文件解析"""
-        data_file = os.path.join(self.project_path, "tools", "theme_data.json")
-        if os.path.exists(data_file):
-            try:
-                with open(data_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.categories = data.get("categories", [])
-                    self.wallpapers = data.get("wallpapers", [])
-                print(f"从 JSON 加载了 {len(self.categories)} 个主题和 {len(self.wallpapers)} 个壁纸")
-                return
-            except Exception as e:
-                print(f"加载 JSON 数据失败: {str(e)}")
+    def collection(self, kind):
+        """kind 对应的 (RecordStore, SearchIndex, VirtualTreeview, 查询条件)"""
+        collection = self.model.collections[kind]
+        if kind == "categories":
+            return collection.store, collection.index, self.category_list, self.category_query
+        return collection.store, collection.index, self.wallpaper_list, self.wallpaper_query
+        
+    def perform(self, label, entries):
+        """执行一组编辑，并作为一步加入撤销历史（批量操作整体撤销）"""
+        with self.refresh_once(len(entries) > 1):
+            applied = self.model.perform(label, entries)
+        self.after_edit()
+        return applied
+        
+    @contextmanager
+    def refresh_once(self, enabled=True):
+        """其中的编辑不逐行刷新列表，结束后每个受影响的列表刷新一次，并选中最后新增的行"""
+        if not enabled or self.deferred_refresh is not None:
+            yield
+            return
+        self.deferred_refresh = {}
+        try:
+            yield
+        finally:
+            touched, self.deferred_refresh = self.deferred_refresh, None
+            for kind, added in touched.items():
+                self.collection_replaced(kind)
+                _, _, vlist, _ = self.collection(kind)
+                try:
+                    vlist.select(vlist.rows.index(added))
+                except ValueError:
+                    # 没有新增的行，或新增的行不满足筛选条件：选中行的内容可能已变化
+                    vlist.notify_selection()
+        
+    def after_edit(self):
+        self.update_counts()
+        if self.journal.file is not None:
+            self.schedule_autosave()
+        
+    def undo(self, event=None):
+        self.step_history(self.model.undo, "撤销", self.model.history.undo_stack)
+        return "break"
+        
+    def redo(self, event=None):
+        self.step_history(self.model.redo, "重做", self.model.history.redo_stack)
+        return "break"
+        
+    def step_history(self, take_step, action, stack):
+        if self.edits_locked or isinstance(self.root.focus_get(), (tk.Entry, ttk.Entry)):
+            return
+        # stack 顶部是将要执行的一步 (说明, 编辑, 反向编辑)，多条编辑时只在最后刷新一次列表
+        with self.refresh_once(bool(stack) and len(stack[-1][1]) > 1):
+            label = take_step()
+        if label is None:
+            self.status_var.set(f"没有可{action}的操作")
+            return
+        self.after_edit()
+        self.status_var.set(f"已{action}：{label}")
         
-        # 如果 JSON 不存在，尝试从 Swift 文件解析
-        print("JSON 文件不存在，尝试从 Swift 文件加载数据...")
-        self.load_from_swift_files()
+    # MARK: - 模型观察者：每条编辑生效后局部刷新列表
     
-    def reload_from_swift(self):
-        """重新从 Swift 文件加载数据"""
-        if messagebox.askyesno("确认", "这将从 Swift 文件重新加载数据，当前未保存的更改将丢失。确定继续吗？"):
-            self.load_from_swift_files()
+    def record_added(self, kind, iid, position):
+        """新增的记录显示到列表中并选中；有筛选条件时只有满足条件才加入当前列表"""
+        if self.deferred_refresh is not None:
+            self.deferred_refresh[kind] = iid
+            return
+        store, index, vlist, query = self.collection(kind)
+        if vlist.rows is store.order:
+            if position is None or position >= len(store.order) - 1:
+                vlist.row_appended()
+                position = len(vlist.rows) - 1
+            else:
+                vlist.row_inserted(position)
+        else:
+            text, filters = query
+            if not index.matches(iid, text, **filters):
+                return
+            position = seq_position(vlist.rows, index.seq, iid)
+            vlist.rows.insert(position, iid)
+            vlist.row_inserted(position)
+        vlist.select(position)
+        
+    def record_updated(self, kind, iid):
+        """原地刷新一行（不因筛选条件变化而移出列表）"""
+        if self.deferred_refresh is not None:
+            self.deferred_refresh.setdefault(kind, None)
+            return
+        _, _, vlist, _ = self.collection(kind)
+        vlist.update_row(iid)
+        if kind == "wallpapers" and vlist.selected_key() == iid:
+            self.on_wallpaper_selected(iid)
+            
+    def record_removed(self, kind, iid, position):
+        """position 是记录在全部数据中的位置；有筛选条件时在筛选结果中二分查找"""
+        if self.deferred_refresh is not None:
+            self.deferred_refresh.setdefault(kind, None)
+            return
+        store, index, vlist, _ = self.collection(kind)
+        if vlist.rows is not store.order:
+            position = seq_position(vlist.rows, index.seq, iid)
+            if position >= len(vlist.rows) or vlist.rows[position] != iid:
+                return
+            del vlist.rows[position]
+        vlist.row_removed(position, iid)
+        
+    def collection_replaced(self, kind):
+        if self.deferred_refresh is not None:
+            self.deferred_refresh.setdefault(kind, None)
+            return
+        if kind == "categories":
             self.refresh_category_list()
+        else:
             self.refresh_wallpaper_list()
-            messagebox.showinfo("成功", f"已从 Swift 文件加载 {len(self.categories)} 个主题")
-                
-    def save_data(self):
-        """保存到 JSON 文件"""
-        data_file = os.path.join(self.project_path, "tools", "theme_data.json")
-        os.makedirs(os.path.dirname(data_file), exist_ok=True)
         
-        try:
-            data = {
-                "categories": self.categories,
-                "wallpapers": self.wallpapers,
-                "updated_at": datetime.now().isoformat()
-            }
-            with open(data_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            messagebox.showinfo("成功", "数据已保存")
-        except Exception as e:
-            messagebox.showerror("错误", f"保存数据失败: {str(e)}")
-    
-    def load_from_swift_files(self):
-        """从 Swift 源文件中解析主题和壁纸数据"""
-        try:
-            # 加载主题分类
-            category_file = os.path.join(self.project_path, "MotivationApp", "Models", "Category.swift")
-            if os.path.exists(category_file):
-                self.categories = self.parse_categories_from_swift(category_file)
-                print(f"从 Category.swift 加载了 {len(self.categories)} 个主题")
-            else:
-                print(f"未找到文件: {category_file}")
-                    
-        except Exception as e:
-            print(f"从 Swift 文件加载数据时出错: {str(e)}")
-            messagebox.showwarning("警告", f"无法从 Swift 文件加载数据: {str(e)}\n\n将从空数据开始")
-    
-    def parse_categories_from_swift(self, file_path):
-        """解析 Category.swift 文件中的主题数据"""
-        categories = []
+    def update_counts(self):
+        self.category_count_var.set(f"显示 {len(self.category_list.rows)} / {len(self.categories)}")
+        self.wallpaper_count_var.set(f"显示 {len(self.wallpaper_list.rows)} / {len(self.wallpapers)}")
         
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+    def refresh_category_list(self):
+        text, filters = self.category_query
+        result = self.category_index.search(text, **filters)
+        self.category_list.set_rows(self.categories.order if result is None else result)
+        self.update_counts()
+        
+    def category_row_values(self, iid):
+        cat = self.categories.get(iid)
+        return (
+            cat.get("name", ""),
+            cat.get("type", ""),
+            cat.get("icon", ""),
+            cat.get("colorHex", ""),
+            ", ".join(cat.get("tags", []))
+        )
             
-            # 查找 sampleCategories 数组
-            pattern = r'static let sampleCategories.*?=\s*\[(.*?)\n    \]'
-            match = re.search(pattern, content, re.DOTALL)
+    def refresh_wallpaper_list(self):
+        text, filters = self.wallpaper_query
+        result = self.wallpaper_index.search(text, **filters)
+        self.wallpaper_list.set_rows(self.wallpapers.order if result is None else result)
+        self.update_counts()
+        
+    def wallpaper_row_values(self, iid):
+        wp = self.wallpapers.get(iid)
+        return (
+            wp.get("name", ""),
+            wp.get("themeId", ""),
+            wp.get("imageName", ""),
+            "是" if wp.get("isLocked", False) else "否"
+        )
             
-            if not match:
-                print("未找到 sampleCategories 数组")
-                return categories
+    def load_data(self):
+        """加载数据：优先从快照 + 编辑日志，否则从 Swift 文件解析（在后台线程执行）"""
+        def on_done(loaded):
+            self.model.install(loaded)
+            self.unlock_edits()
+            self.status_var.set(f"已加载 {len(self.categories)} 个主题和 {len(self.wallpapers)} 个壁纸")
             
-            array_content = match.group(1)
+        def on_error(e):
+            self.model.recover_journal()
+            self.unlock_edits()
+            self.on_swift_load_error(e)
+            
+        self.run_in_background("加载数据", self.model.read, on_done, on_error=on_error,
+                               cancellable=True, lock_edits=True)
+    
+    def reload_from_swift(self):
+        """重新从 Swift 文件加载数据"""
+        if messagebox.askyesno("确认", "这将从 Swift 文件重新加载数据，当前未保存的更改将丢失。确定继续吗？"):
+            def work(task):
+                return new_collection("categories", self.model.read_swift_categories(task))
+                
+            def on_done(collection):
+                self.model.replace_collection("categories", collection, "从 Swift 文件重新加载")
+                self.after_edit()
+                self.status_var.set("")
+                messagebox.showinfo("成功", f"已从 Swift 文件加载 {len(self.categories)} 个主题")
+                
+            self.run_in_background("从 Swift 文件加载", work, on_done,
+                                   on_error=self.on_swift_load_error, cancellable=True, lock_edits=True)
             
-            # 解析每个 Category 对象
-            category_pattern = r'Category\((.*?)\n        \)(?=,|\s*$)'
-            category_matches = re.finditer(category_pattern, array_content, re.DOTALL)
+    def schedule_autosave(self):
+        self.unsaved_edits = True
+        if self.autosave_job is None:
+            self.autosave_job = self.root.after(AUTOSAVE_DELAY_MS, self.autosave)
             
-            for cat_match in category_matches:
-                cat_content = cat_match.group(1)
-                category = self.parse_category_object(cat_content)
-                if category:
-                    categories.append(category)
+    def autosave(self):
+        self.autosave_job = None
+        if self.unsaved_edits:
+            self.write_snapshot()
+                
+    def save_data(self):
+        """立即把当前数据写成快照（编辑本身已实时写入日志）"""
+        if self.journal.file is None:
+            # 数据没有加载成功：保存会用不完整的数据覆盖快照，日志中尚未保存的编辑也会丢失
+            if messagebox.askyesno("数据未加载", "数据尚未加载成功，不能保存。是否重新加载？"):
+                self.load_data()
+            return
             
-            print(f"成功解析 {len(categories)} 个主题分类")
+        def on_saved():
+            messagebox.showinfo("成功", "数据已保存")
             
-        except Exception as e:
-            print(f"解析 Category.swift 失败: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        def on_failed(e):
+            messagebox.showerror("错误", f"保存数据失败: {str(e)}")
+            
+        self.write_snapshot(on_saved, on_failed)
         
-        return categories
-    
-    def parse_category_object(self, content):
-        """解析单个 Category 对象"""
-        category = {}
+    def write_snapshot(self, on_saved=None, on_failed=None):
+        """在后台线程原子写入快照，写完后压缩日志
         
-        try:
-            # 解析各个字段
-            patterns = {
-                'name': r'name:\s*"([^"]+)"',
-                'icon': r'icon:\s*"([^"]+)"',
-                'colorHex': r'colorHex:\s*"([^"]+)"',
-                'description': r'description:\s*"([^"]+)"',
-                'imageName': r'imageName:\s*"([^"]+)"',
-                'type': r'type:\s*\.(\w+)',
-                'isNew': r'isNew:\s*(true|false)',
-                'isFeatured': r'isFeatured:\s*(true|false)',
-            }
-            
-            for key, pattern in patterns.items():
-                match = re.search(pattern, content)
-                if match:
-                    value = match.group(1)
-                    if key in ['isNew', 'isFeatured']:
-                        category[key] = (value == 'true')
-                    else:
-                        category[key] = value
-                else:
-                    # 设置默认值
-                    if key == 'imageName':
-                        category[key] = ""
-                    elif key == 'type':
-                        category[key] = 'normal'
-                    elif key in ['isNew', 'isFeatured']:
-                        category[key] = False
-            
-            # 解析 tags 数组
-            tags_match = re.search(r'tags:\s*\[([^\]]+)\]', content)
-            if tags_match:
-                tags_str = tags_match.group(1)
-                tags = re.findall(r'"([^"]+)"', tags_str)
-                category['tags'] = tags
-            else:
-                category['tags'] = []
-            
-            return category if category.get('name') else None
+        写入过程中又有保存请求时，等当前写入完成后再写一次。
+        """
+        self.snapshot_waiters.append((on_saved, on_failed))
+        if self.snapshot_worker.busy():
+            self.snapshot_pending = True
+            return
+        if self.autosave_job is not None:
+            self.root.after_cancel(self.autosave_job)
+            self.autosave_job = None
             
-        except Exception as e:
-            print(f"解析 Category 对象失败: {str(e)}")
-            return None
+        seq, data = self.model.snapshot()
+        waiters, self.snapshot_waiters = self.snapshot_waiters, []
+        self.unsaved_edits = False
+        
+        def work(task):
+            self.model.write_snapshot(data)
             
+        def on_done(result):
+            self.model.snapshot_written(seq)
+            self.status_var.set(f"已保存 {datetime.now().strftime('%H:%M:%S')}")
+            for on_saved, _ in waiters:
+                if on_saved:
+                    on_saved()
+                    
+        def on_error(e):
+            print(f"写入快照失败: {str(e)}")
+            self.unsaved_edits = True
+            self.status_var.set("保存失败，编辑已记录在日志中")
+            for _, on_failed in waiters:
+                if on_failed:
+                    on_failed(e)
+                    
+        def on_finish():
+            if self.snapshot_pending:
+                self.snapshot_pending = False
+                self.root.after_idle(self.write_snapshot)
+                
+        self.snapshot_worker.start(work, on_done, on_error, lambda text, fraction: None,
+                                   lambda: None, on_finish)
+    
+    def on_swift_load_error(self, e):
+        print(f"从 Swift 文件加载数据时出错: {str(e)}")
+        messagebox.showwarning("警告", f"无法从 Swift 文件加载数据: {str(e)}\n\n将从空数据开始")
+    
     def export_swift_code(self):
         """生成并导出 Swift 代码"""
         swift_code = self.generate_swift_code()
@@ -389,6 +740,36 @@ class ThemeManagerApp:
             except Exception as e:
                 messagebox.showerror("错误", f"导出失败: {str(e)}")
                 
+    def generate_swift_files(self):
+        """生成分块的 Swift 数据文件（或 JSON 资源 + 加载器），只重写内容变化的文件"""
+        choice = messagebox.askyesnocancel(
+            "生成 Swift 数据文件",
+            "选择生成方式：\n\n"
+            "是：分块 Swift 文件（MotivationApp/Generated）\n"
+            "否：JSON 资源 + 加载代码（数据变化时无需重新编译）")
+        if choice is None:
+            return
+        mode = "chunks" if choice else "resource"
+        categories = self.categories.records()
+        wallpapers = self.wallpapers.records()
+        
+        def work(task):
+            task.progress("生成代码...")
+            files = swift_codegen.generate(categories, wallpapers, mode)
+            task.progress("写入文件...")
+            return swift_codegen.write_files(self.project_path, files)
+            
+        def on_done(result):
+            written, unchanged, removed = result
+            self.status_var.set("")
+            messagebox.showinfo("成功", f"已更新 {len(written)} 个文件，{len(unchanged)} 个文件没有变化，"
+                                      f"删除 {len(removed)} 个旧文件")
+            
+        def on_error(e):
+            messagebox.showerror("错误", f"生成失败: {str(e)}")
+            
+        self.run_in_background("生成 Swift 数据文件", work, on_done, on_error=on_error)
+        
     def generate_swift_code(self):
         """生成 Swift 代码"""
         # 生成主题分类的 Swift 代码
@@ -442,6 +823,339 @@ extension Category {{
             messagebox.showerror("错误", f"无法打开文件夹: {str(e)}")
 
 
+class BackgroundTask(Task):
+    """传给后台任务函数的上下文：汇报进度、检查是否被取消"""
+    
+    def __init__(self, messages, cancel_event):
+        self.messages = messages
+        self.cancel_event = cancel_event
+        
+    def progress(self, text=None, fraction=None):
+        self.messages.put(("progress", (text, fraction)))
+        
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise OperationCancelled()
+
+
+class BackgroundWorker:
+    """在后台线程执行一个任务，结果通过线程安全的队列交回 Tk 主线程
+    
+    后台线程只往队列里放消息，不直接操作任何 Tk 对象；
+    主线程通过 root.after 定时取出消息并调用对应的回调。
+    """
+    
+    POLL_INTERVAL = 50  # 毫秒
+    
+    def __init__(self, root):
+        self.root = root
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.cancellable = False
+        self.callbacks = {}
+        
+    def busy(self):
+        return self.thread is not None
+        
+    def start(self, work, on_done, on_error, on_progress, on_cancelled, on_finish, cancellable=False):
+        self.cancel_event.clear()
+        self.cancellable = cancellable
+        self.callbacks = {
+            "done": on_done,
+            "error": on_error,
+            "progress": lambda args: on_progress(*args),
+            "cancelled": lambda _: on_cancelled(),
+        }
+        self.on_finish = on_finish
+        task = BackgroundTask(self.messages, self.cancel_event)
+        
+        def run():
+            try:
+                self.messages.put(("done", work(task)))
+            except OperationCancelled:
+                self.messages.put(("cancelled", None))
+            except Exception as e:
+                self.messages.put(("error", e))
+                
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        self.root.after(self.POLL_INTERVAL, self.poll)
+        
+    def cancel(self):
+        """请求取消：任务在下一个检查点抛出 OperationCancelled"""
+        if self.busy() and self.cancellable:
+            self.cancel_event.set()
+            
+    def poll(self):
+        while True:
+            try:
+                kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.callbacks["progress"](payload)
+                continue
+            # 任务结束：先恢复界面状态，再调用结果回调（回调中可能弹出对话框）
+            self.thread = None
+            self.on_finish()
+            self.callbacks[kind](payload)
+            return
+        self.root.after(self.POLL_INTERVAL, self.poll)
+
+
+def seq_position(rows, seq, iid):
+    """筛选结果按加入索引的顺序（seq）排列：二分查找 iid 应在的位置"""
+    target = seq[iid]
+    low, high = 0, len(rows)
+    while low < high:
+        middle = (low + high) // 2
+        if seq[rows[middle]] < target:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class VirtualTreeview:
+    """只为可见区域创建行的 Treeview
+    
+    rows 是任意支持 len() 和下标访问的序列（如 range、list），每个元素是数据的 key，
+    同时用作 Treeview 行的 iid；row_values(key) 返回该行要显示的列值。
+    Treeview 中始终只有一屏的行，滚动时按偏移量重新填充，所以数据量再大也不会卡住界面。
+    单条数据的新增、修改、删除通过 row_appended / row_inserted / update_row / row_removed 局部更新。
+    """
+    
+    DEFAULT_ROW_HEIGHT = 20
+    DEFAULT_HEADING_HEIGHT = 25
+    
+    def __init__(self, parent, columns, row_values, column_width=100, command=None):
+        self.row_values = row_values
+        self.command = command   # 选中行变化时调用 command(key)
+        self.rows = range(0)
+        self.offset = 0          # 第一行可见数据在 rows 中的位置
+        self.visible_count = 15  # 一屏能显示的行数
+        self.selected = None     # 选中行在 rows 中的位置（滚出可见区域后仍保留）
+        self.positions = {}      # 当前 Treeview 行 iid -> rows 中的位置（只含可见行）
+        self.notify_pending = False  # 已安排在空闲时通知选中行变化
+        
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings",
+                                 height=self.visible_count, selectmode="browse")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_width)
+        
+        # 滚动条直接驱动偏移量，而不是 Treeview 自身的 yview
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self.move_selection(-self.visible_count))
+        self.tree.bind("<Next>", lambda e: self.move_selection(self.visible_count))
+        self.tree.bind("<Home>", lambda e: self.move_selection(-len(self.rows)))
+        self.tree.bind("<End>", lambda e: self.move_selection(len(self.rows)))
+        
+    def set_rows(self, rows):
+        """替换数据序列并重绘可见区域"""
+        self.rows = rows
+        if self.selected is not None and self.selected >= len(rows):
+            self.selected = len(rows) - 1 if len(rows) else None
+        self.scroll_to(self.offset)
+        
+    def refresh(self):
+        """数据内容变化（行数不变）时重绘可见区域"""
+        self.render()
+        
+    def update_row(self, key):
+        """某条数据被修改后，原地更新对应的一行（不在可见区域时无需处理）"""
+        iid = str(key)
+        if iid in self.positions:
+            self.tree.item(iid, values=self.row_values(key))
+            
+    def row_appended(self):
+        """rows 末尾追加了一条数据"""
+        position = len(self.rows) - 1
+        if position < self.offset + self.visible_count:
+            self.insert_row(position, tk.END)
+        self.update_scrollbar()
+        
+    def row_inserted(self, position):
+        """rows 中 position 处插入了一条数据"""
+        if self.selected is not None and self.selected >= position:
+            self.selected += 1
+        if position < self.offset:
+            # 插入的行在可见区域之上：可见内容不变，只是位置整体后移
+            self.offset += 1
+            self.positions = {iid: pos + 1 for iid, pos in self.positions.items()}
+            self.update_scrollbar()
+        elif position < self.offset + self.visible_count:
+            self.render()
+        else:
+            self.update_scrollbar()
+            
+    def row_removed(self, position, key):
+        """rows 中 position 处的数据（key）已被删除"""
+        if self.selected is not None:
+            if self.selected > position:
+                self.selected -= 1
+            elif self.selected >= len(self.rows):
+                self.selected = len(self.rows) - 1 if len(self.rows) else None
+                
+        if position < self.offset:
+            # 删除的行在可见区域之上：可见内容不变，只是位置整体前移
+            self.offset -= 1
+            self.positions = {iid: pos - 1 for iid, pos in self.positions.items()}
+        elif str(key) in self.positions:
+            iid = str(key)
+            self.tree.delete(iid)
+            del self.positions[iid]
+            self.positions = {i: (pos - 1 if pos > position else pos) for i, pos in self.positions.items()}
+            # 补上空出来的一行：优先补在底部，已到数据末尾时在顶部补
+            next_position = self.offset + len(self.positions)
+            if next_position < len(self.rows):
+                self.insert_row(next_position, tk.END)
+            elif self.offset > 0:
+                self.offset -= 1
+                self.insert_row(self.offset, 0)
+                
+        self.sync_selection()
+        self.update_scrollbar()
+        self.notify_selection()
+        
+    def selected_position(self):
+        return self.selected
+        
+    def selected_key(self):
+        """返回选中行对应的数据 key，未选中时返回 None"""
+        if self.selected is None:
+            return None
+        return self.rows[self.selected]
+        
+    def select(self, position):
+        """选中 rows 中指定位置的行，并滚动使其可见"""
+        if not len(self.rows):
+            return
+        self.selected = max(0, min(position, len(self.rows) - 1))
+        self.see(self.selected)
+        self.notify_selection()
+        
+    def see(self, position):
+        if position < self.offset:
+            self.scroll_to(position)
+        elif position >= self.offset + self.visible_count:
+            self.scroll_to(position - self.visible_count + 1)
+        else:
+            self.render()
+            
+    def scroll_to(self, offset):
+        max_offset = max(0, len(self.rows) - self.visible_count)
+        self.offset = max(0, min(offset, max_offset))
+        self.render()
+        
+    def scroll_by(self, delta):
+        self.scroll_to(self.offset + delta)
+        return "break"
+        
+    def render(self):
+        """只为 [offset, offset + visible_count) 范围内的数据创建行"""
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.positions = {}
+        
+        end = min(self.offset + self.visible_count, len(self.rows))
+        for position in range(self.offset, end):
+            self.insert_row(position, tk.END)
+            
+        self.sync_selection()
+        self.update_scrollbar()
+        
+    def insert_row(self, position, index):
+        key = self.rows[position]
+        iid = str(key)
+        self.tree.insert("", index, iid=iid, values=self.row_values(key))
+        self.positions[iid] = position
+        
+    def sync_selection(self):
+        """让 Treeview 的选中状态与 selected 一致"""
+        if self.selected is not None:
+            iid = str(self.rows[self.selected])
+            if iid in self.positions:
+                self.tree.selection_set(iid)
+                
+    def update_scrollbar(self):
+        total = len(self.rows)
+        if total:
+            end = min(self.offset + len(self.positions), total)
+            self.scrollbar.set(self.offset / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+            
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.rows)))
+        elif unit == "pages":
+            self.scroll_by(int(amount) * self.visible_count)
+        else:
+            self.scroll_by(int(amount))
+            
+    def on_mousewheel(self, event):
+        # Windows 每格 delta 为 120，macOS 为较小的整数
+        if abs(event.delta) >= 120:
+            steps = -event.delta // 120 * 3
+        else:
+            steps = -event.delta
+        return self.scroll_by(steps)
+        
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.positions:
+            position = self.positions[selection[0]]
+            if position != self.selected:
+                self.selected = position
+                self.notify_selection()
+                
+    def notify_selection(self):
+        """选中行变化后通知 command；同一轮事件中的多次变化（批量编辑、撤销）只通知一次"""
+        if self.command and not self.notify_pending:
+            self.notify_pending = True
+            self.tree.after_idle(self.deliver_selection)
+            
+    def deliver_selection(self):
+        self.notify_pending = False
+        if self.selected is not None:
+            self.command(self.rows[self.selected])
+            
+    def move_selection(self, delta):
+        if self.selected is None:
+            self.select(self.offset)
+        else:
+            self.select(self.selected + delta)
+        return "break"
+        
+    def on_resize(self, event):
+        """根据控件高度计算一屏能完整显示的行数"""
+        row_height = self.DEFAULT_ROW_HEIGHT
+        heading_height = self.DEFAULT_HEADING_HEIGHT
+        children = self.tree.get_children()
+        if children:
+            bbox = self.tree.bbox(children[0])
+            if bbox:
+                heading_height, row_height = bbox[1], bbox[3]
+        count = max(1, (event.height - heading_height) // row_height)
+        if count != self.visible_count:
+            self.visible_count = count
+            self.scroll_to(self.offset)
+
+
 class CategoryDialog:
     def __init__(self, parent, title, data=None):
         self.result = None
@@ -490,8 +1204,8 @@ class CategoryDialog:
         # 类型
         ttk.Label(frame, text="类型:").grid(row=5, column=0, sticky=tk.W, pady=5)
         self.type_var = tk.StringVar(value=self.data.get("type", "normal"))
-        type_combo = ttk.Combobox(frame, textvariable=self.type_var, 
-                                  values=["normal", "combined", "seasonal"], width=37)
+        type_combo = ttk.Combobox(frame, textvariable=self.type_var, state="readonly",
+                                  values=swift_codegen.CATEGORY_TYPES, width=37)
         type_combo.grid(row=5, column=1, pady=5)
         
         # 是否新主题
@@ -551,6 +1265,7 @@ class WallpaperDialog:
         
         self.data = data or {}
         self.categories = categories
+        self.image_path = None  # 通过"浏览"选择的 (imageName, 完整路径)
         self.create_form()
         self.dialog.wait_window()
         
@@ -596,6 +1311,7 @@ class WallpaperDialog:
         if filename:
             basename = os.path.splitext(os.path.basename(filename))[0]
             self.image_var.set(basename)
+            self.image_path = (basename, filename)
             
     def on_ok(self):
         if not self.name_var.get():
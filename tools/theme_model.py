@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主题和壁纸数据模型（不依赖 Tk）
+theme_manager.py 的界面和 theme_batch.py 的批量编辑命令行共用这一层
+
+- RecordStore：带稳定 id 的有序记录集合
+- ThemeModel：主题和壁纸两个集合及其搜索索引，负责加载（快照 + 编辑日志）、
+  执行编辑（写日志、记录撤销历史）、按条件批量选择和修改、保存快照
+- 编辑统一使用与日志条目相同的格式：
+  {"op": "add" | "update" | "remove" | "replace", "kind": "categories" | "wallpapers", ...}
+
+界面通过 add_observer 注册观察者，在每条编辑生效后局部刷新列表。
+"""
+
+import os
+from collections import deque
+from contextlib import contextmanager
+
+import catalog
+import swift_literals
+import theme_journal
+from instrument import stage
+from search_index import SearchIndex
+
+# 读取文件时每次读取的块大小（用于显示进度和响应取消）
+READ_CHUNK_SIZE = 1024 * 1024
+
+# 最多可撤销的步数
+HISTORY_LIMIT = 200
+
+# 记录 id 的前缀
+RECORD_PREFIXES = {"categories": "c", "wallpapers": "w"}
+
+# 可以直接用搜索索引筛选的字段：记录字段 -> 索引字段
+FACET_FIELDS = {
+    "categories": {"type": "type", "tags": "tag"},
+    "wallpapers": {"themeId": "themeId", "isLocked": "locked"},
+}
+
+
+class OperationCancelled(Exception):
+    """长时间操作被用户取消"""
+
+
+class Task:
+    """长时间操作的上下文：汇报进度、检查是否被取消（默认什么都不做，命令行使用）"""
+
+    def progress(self, text=None, fraction=None):
+        pass
+
+    def check_cancelled(self):
+        pass
+
+
+def read_text_file(path, task, label):
+    """分块读取文本文件，每块之后汇报进度并检查是否被取消"""
+    size = os.path.getsize(path) or 1
+    chunks = []
+    read = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            read += len(chunk)
+            task.check_cancelled()
+            task.progress(f"{label} {read * 100 // size}%", read / size)
+    return b"".join(chunks).decode("utf-8")
+
+
+def new_category_index():
+    return SearchIndex(lambda r: r.get("name", ""), {
+        "tag": lambda r: r.get("tags", []),
+        "type": lambda r: [r.get("type", "normal")],
+    })
+
+
+def new_wallpaper_index():
+    return SearchIndex(lambda r: r.get("name", ""), {
+        "themeId": lambda r: [r.get("themeId", "")],
+        "locked": lambda r: [bool(r.get("isLocked", False))],
+    })
+
+
+INDEX_FACTORIES = {"categories": new_category_index, "wallpapers": new_wallpaper_index}
+
+
+def build_index(store, index):
+    """为记录集合建立搜索索引（可在后台线程执行）"""
+    index.build((iid, store.get(iid)) for iid in store.order)
+    return index
+
+
+class RecordStore:
+    """带稳定 id 的有序记录集合
+
+    每条记录分配一个不变的 id（如 "c12"），同时用作 Treeview 行的 iid，
+    按 id 查找、修改都是字典操作。order 保存显示顺序，可直接交给 VirtualTreeview。
+    id 随快照保存，编辑日志通过 id 定位记录。kind 是数据文件中对应的字段名。
+    """
+
+    def __init__(self, prefix, kind):
+        self.prefix = prefix
+        self.kind = kind
+        self.next_id = 1
+        self.by_id = {}
+        self.order = []
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        return (self.by_id[iid] for iid in self.order)
+
+    def __contains__(self, iid):
+        return iid in self.by_id
+
+    def load(self, records, ids=None):
+        """用新的记录列表替换全部数据（order 保持同一个列表对象）；ids 为 None 时重新分配 id"""
+        self.by_id.clear()
+        self.order.clear()
+        if ids is None:
+            for record in records:
+                self.add(record)
+        else:
+            for iid, record in zip(ids, records):
+                self.add(record, iid)
+
+    def records(self):
+        return list(self)
+
+    def get(self, iid):
+        return self.by_id[iid]
+
+    def add(self, record, iid=None, position=None):
+        """追加记录（或插入到 position 处）并返回 id；重放日志、撤销删除时传入原来的 id"""
+        if iid is None:
+            iid = f"{self.prefix}{self.next_id}"
+            self.next_id += 1
+        else:
+            self.next_id = max(self.next_id, int(iid[len(self.prefix):]) + 1)
+        self.by_id[iid] = record
+        if position is None:
+            self.order.append(iid)
+        else:
+            self.order.insert(position, iid)
+        return iid
+
+    def update(self, iid, record):
+        self.by_id[iid] = record
+
+    def remove(self, iid, position=None):
+        """删除记录并返回它在 order 中的位置；调用方已知位置时传入以免查找"""
+        if position is None or position >= len(self.order) or self.order[position] != iid:
+            position = self.order.index(iid)
+        del self.order[position]
+        del self.by_id[iid]
+        return position
+
+
+class Collection:
+    """一类记录及其搜索索引"""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+
+def new_collection(kind, records=(), ids=None):
+    """新建集合并建立索引（可在后台线程执行）"""
+    store = RecordStore(RECORD_PREFIXES[kind], kind)
+    store.load(records, ids)
+    return Collection(store, build_index(store, INDEX_FACTORIES[kind]()))
+
+
+class EditHistory:
+    """撤销/重做历史
+
+    每一步保存执行过的编辑和对应的反向编辑（格式与编辑日志条目相同）。
+    编辑只引用被替换的记录对象，不复制整个数据集，撤销和重做的开销与数据量无关。
+    """
+
+    def __init__(self, limit):
+        self.undo_stack = deque(maxlen=limit)  # (说明, 正向编辑列表, 反向编辑列表)
+        self.redo_stack = []
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def push(self, label, forward, inverse):
+        self.undo_stack.append((label, forward, inverse))
+        self.redo_stack.clear()
+
+    def undo(self):
+        """返回 (说明, 要执行的反向编辑)，没有可撤销的操作时返回 None"""
+        if not self.undo_stack:
+            return None
+        step = self.undo_stack.pop()
+        self.redo_stack.append(step)
+        label, _, inverse = step
+        return label, list(reversed(inverse))
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        step = self.redo_stack.pop()
+        self.undo_stack.append(step)
+        label, forward, _ = step
+        return label, forward
+
+
+class ThemeModel:
+    """主题和壁纸数据
+
+    编辑通过 perform 执行：每条编辑生效后通知观察者，整组编辑一次写入日志，
+    并作为一步加入撤销历史。在 batch() 中执行的多组编辑合并为一步。
+    """
+
+    def __init__(self, project_path, data_file=None):
+        """data_file 默认为 tools/theme_data.json，编辑日志与它同名、扩展名为 .journal"""
+        self.project_path = project_path
+        self.data_file = data_file or os.path.join(project_path, "tools", "theme_data.json")
+        self.journal = theme_journal.EditJournal(os.path.splitext(self.data_file)[0] + ".journal")
+        self.history = EditHistory(HISTORY_LIMIT)
+        self.collections = {kind: new_collection(kind) for kind in theme_journal.RECORD_KINDS}
+        self.observers = []
+        self.pending = None  # batch() 中累积的 (说明, 编辑, 反向编辑)
+
+    @property
+    def categories(self):
+        return self.collections["categories"].store
+
+    @property
+    def wallpapers(self):
+        return self.collections["wallpapers"].store
+
+    def stores(self):
+        return {kind: collection.store for kind, collection in self.collections.items()}
+
+    def add_observer(self, observer):
+        """observer 需要实现 record_added / record_updated / record_removed / collection_replaced"""
+        self.observers.append(observer)
+
+    # MARK: - 加载和保存
+
+    def read(self, task=None, backup=True):
+        """读取快照并重放之后的编辑日志；都不存在时从 Swift 文件解析（可在后台线程执行）
+
+        不修改当前数据，返回 (集合字典, 日志序号, 是否来自 Swift 文件)，交给 install 使用。
+        快照无法解析时抛出 ValueError，日志保持不动，由调用方决定如何恢复（见 recover_journal）；
+        backup 为 True 时先把快照改名为 theme_data.json.bak（只读的工具传 False，不改动文件）。
+        """
+        task = task or Task()
+        stores, seq, from_swift = self.read_stores(task, backup)
+        task.check_cancelled()
+        task.progress("建立索引...")
+        with stage('build_index'):
+            collections = {
+                kind: Collection(store, build_index(store, INDEX_FACTORIES[kind]()))
+                for kind, store in stores.items()
+            }
+        return collections, seq, from_swift
+
+    def read_stores(self, task, backup):
+        """read 的前半部分：返回 ({kind: RecordStore}, 日志序号, 是否来自 Swift 文件)，不建立索引"""
+        stores = {kind: RecordStore(RECORD_PREFIXES[kind], kind) for kind in theme_journal.RECORD_KINDS}
+        seq = 0
+        from_swift = not os.path.exists(self.data_file) and not os.path.exists(self.journal.path)
+        if os.path.exists(self.data_file):
+            try:
+                with stage('read_snapshot'):
+                    text = read_text_file(self.data_file, task, "读取 theme_data.json")
+                task.progress("解析 JSON...")
+                with stage('parse_json'):
+                    data = catalog.loads(text)
+                task.check_cancelled()
+                with stage('load_snapshot'):
+                    seq = theme_journal.load_snapshot(data, stores)
+                print(f"从 JSON 加载了 {len(stores['categories'])} 个主题和 {len(stores['wallpapers'])} 个壁纸")
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                # 不能退回 Swift 数据：日志中可能还有未保存的编辑，保留快照以便手动恢复
+                if not backup:
+                    raise ValueError(f"加载 JSON 数据失败: {e}") from e
+                backup_path = self.data_file + ".bak"
+                os.replace(self.data_file, backup_path)
+                raise ValueError(f"加载 JSON 数据失败，已另存为 {backup_path}: {e}") from e
+
+        if from_swift:
+            # 首次运行（快照和日志都不存在），从 Swift 文件解析
+            print("JSON 文件不存在，尝试从 Swift 文件加载数据...")
+            stores["categories"].load(self.read_swift_categories(task))
+        else:
+            entries = theme_journal.read_journal(self.journal.path, seq)
+            if entries:
+                task.progress(f"重放 {len(entries)} 条编辑日志...")
+                with stage('replay_journal'):
+                    seq = theme_journal.replay(stores, entries)
+                print(f"重放了 {len(entries)} 条编辑日志")
+        return stores, seq, from_swift
+
+    def install(self, loaded, open_journal=True):
+        """在主线程中换上 read 读到的数据，并从对应的序号继续写日志"""
+        collections, seq, from_swift = loaded
+        self.collections = collections
+        self.history.clear()
+        for observer in self.observers:
+            for kind in collections:
+                observer.collection_replaced(kind)
+        if not open_journal:
+            return
+        self.journal.open(seq)
+        if from_swift:
+            # 首次运行，日志从 Swift 数据的整体替换开始
+            self.journal.reset()
+            self.journal.append_many([self.replace_entry("categories")])
+
+    def load(self, open_journal=True):
+        """同步加载数据（命令行使用）；不打开日志时只读，不改动任何文件"""
+        self.install(self.read(backup=open_journal), open_journal)
+
+    def read_saved(self):
+        """只读读取快照并重放编辑日志，返回管理工具中的最新数据 {kind: RecordStore}（生成代码、检查数据使用）
+
+        不建立索引、不改变当前数据、不改动任何文件；快照和日志都不存在时抛出 FileNotFoundError，不退回 Swift 文件。
+        """
+        if not os.path.exists(self.data_file) and not os.path.exists(self.journal.path):
+            raise FileNotFoundError(f"未找到数据文件: {self.data_file}")
+        return self.read_stores(Task(), backup=False)[0]
+
+    def recover_journal(self):
+        """加载失败时保留日志（theme_data.journal.bak）以便手动恢复，从空日志开始"""
+        if os.path.exists(self.journal.path):
+            os.replace(self.journal.path, self.journal.path + ".bak")
+        self.journal.open(0)
+
+    def read_swift_categories(self, task=None):
+        """从 Category.swift 中解析主题数据，返回主题列表"""
+        task = task or Task()
+        category_file = os.path.join(self.project_path, "MotivationApp", "Models", "Category.swift")
+        if not os.path.exists(category_file):
+            print(f"未找到文件: {category_file}")
+            return []
+        task.progress("解析 Category.swift...")
+        with stage('parse_category_swift'):
+            categories = parse_categories_from_swift(category_file)
+        task.check_cancelled()
+        print(f"从 Category.swift 加载了 {len(categories)} 个主题")
+        return categories
+
+    def replace_collection(self, kind, collection, label):
+        """用新建好的集合整体替换（如从 Swift 文件重新加载），可以撤销"""
+        previous = self.replace_entry(kind)
+        self.collections[kind] = collection
+        for observer in self.observers:
+            observer.collection_replaced(kind)
+        self.commit(label, [self.replace_entry(kind)], [previous])
+
+    def replace_entry(self, kind):
+        store = self.collections[kind].store
+        return {"op": "replace", "kind": kind, "ids": list(store.order), "records": store.records()}
+
+    def snapshot(self):
+        """在主线程中取当前数据，返回 (日志序号, 快照数据)"""
+        seq = self.journal.seq
+        with stage('take_snapshot'):
+            return seq, theme_journal.snapshot_data(self.stores(), seq)
+
+    def write_snapshot(self, data):
+        """原子写入快照（可在后台线程执行）"""
+        theme_journal.write_snapshot(self.data_file, data)
+
+    def snapshot_written(self, seq):
+        """快照已包含 seq 及之前的编辑，压缩日志"""
+        if self.journal.file is not None:
+            self.journal.compact(seq)
+
+    def save(self):
+        """同步保存快照并压缩日志（命令行使用）"""
+        seq, data = self.snapshot()
+        self.write_snapshot(data)
+        self.snapshot_written(seq)
+
+    def close(self):
+        self.journal.close()
+
+    # MARK: - 编辑
+
+    def perform(self, label, entries):
+        """执行一组编辑，写入日志并作为一步加入撤销历史，返回实际执行的编辑"""
+        applied = []
+        inverses = []
+        with stage('apply_edits'):
+            try:
+                for entry in entries:
+                    forward, inverse = self.apply(entry)
+                    applied.append(forward)
+                    inverses.append(inverse)
+            except Exception:
+                self.rollback(inverses)
+                raise
+        if self.pending is not None:
+            self.pending[1].extend(applied)
+            self.pending[2].extend(inverses)
+        else:
+            self.commit(label, applied, inverses)
+        return applied
+
+    @contextmanager
+    def batch(self, label):
+        """其中执行的所有编辑只写一次日志，并作为一步撤销
+
+        出现异常时撤回其中已执行的编辑，不写日志也不加入撤销历史，然后重新抛出。
+        """
+        if self.pending is not None:
+            yield
+            return
+        self.pending = (label, [], [])
+        try:
+            yield
+        except BaseException:
+            _, _, inverses = self.pending
+            self.pending = None
+            self.rollback(inverses)
+            raise
+        label, applied, inverses = self.pending
+        self.pending = None
+        self.commit(label, applied, inverses)
+
+    def rollback(self, inverses):
+        """按相反顺序执行反向编辑，撤回尚未提交的编辑"""
+        for inverse in reversed(inverses):
+            self.apply(inverse)
+
+    def commit(self, label, applied, inverses):
+        if not applied:
+            return
+        self.journal_entries(applied)
+        self.history.push(label, applied, inverses)
+
+    def journal_entries(self, entries):
+        """写入日志（只同步一次磁盘）；日志未打开时（数据未加载完成、演练模式）不记录"""
+        if self.journal.file is not None and entries:
+            # order 是本次会话索引中的序号，重新加载后没有意义，不写入日志
+            self.journal.append_many([
+                {key: value for key, value in entry.items() if key != "order"} for entry in entries
+            ])
+
+    def undo(self):
+        """撤销一步，返回其说明；没有可撤销的操作时返回 None"""
+        return self.step_history(self.history.undo())
+
+    def redo(self):
+        return self.step_history(self.history.redo())
+
+    def step_history(self, step):
+        if step is None:
+            return None
+        label, entries = step
+        for entry in entries:
+            self.apply(entry)
+        self.journal_entries(entries)
+        return label
+
+    def apply(self, entry):
+        """应用一条编辑并通知观察者，返回 (实际执行的编辑, 撤销它的反向编辑)
+
+        反向编辑只引用被修改的记录，记录本身不会被原地修改，所以历史占用的内存只与编辑次数有关。
+        """
+        kind = entry["kind"]
+        collection = self.collections[kind]
+        store, index = collection.store, collection.index
+        op = entry["op"]
+        if op == "add":
+            record = entry["record"]
+            iid = store.add(record, entry.get("id"), entry.get("position"))
+            index.add(iid, record, entry.get("order"))
+            entry = dict(entry, id=iid)
+            inverse = {"op": "remove", "kind": kind, "id": iid}
+            for observer in self.observers:
+                observer.record_added(kind, iid, entry.get("position"))
+        elif op == "update":
+            iid = entry["id"]
+            inverse = {"op": "update", "kind": kind, "id": iid, "record": store.get(iid)}
+            store.update(iid, entry["record"])
+            index.update(iid, entry["record"])
+            for observer in self.observers:
+                observer.record_updated(kind, iid)
+        elif op == "remove":
+            iid = entry["id"]
+            record = store.get(iid)
+            position = store.remove(iid, entry.get("position"))
+            # 加入顺序随反向编辑保存在撤销历史中，撤销删除时记录回到筛选结果中原来的位置；
+            # 索引本身不保留已删除记录的序号
+            order = index.remove(iid)
+            inverse = {"op": "add", "kind": kind, "id": iid, "record": record, "position": position,
+                       "order": order}
+            for observer in self.observers:
+                observer.record_removed(kind, iid, position)
+        elif op == "replace":
+            inverse = self.replace_entry(kind)
+            store.load(entry["records"], entry["ids"])
+            build_index(store, index)
+            for observer in self.observers:
+                observer.collection_replaced(kind)
+        else:
+            raise ValueError(f"未知的编辑操作: {op}")
+        return entry, inverse
+
+    # MARK: - 查询和批量编辑
+
+    def select(self, kind, where=None):
+        """返回满足条件的记录 id 列表（按显示顺序）
+
+        where 为 {字段: 值}；"text" 表示名称包含该文本。索引中有的字段（themeId、isLocked、
+        type、tags）直接查索引，其余字段逐条比较。
+        """
+        collection = self.collections[kind]
+        where = dict(where or {})
+        text = where.pop("text", "")
+        filters = {}
+        for field, facet in FACET_FIELDS[kind].items():
+            if field in where:
+                filters[facet] = where.pop(field)
+        ids = collection.index.search(text, **filters)
+        if ids is None:
+            ids = list(collection.store.order)
+        if where:
+            get = collection.store.get
+            ids = [iid for iid in ids if all(get(iid).get(field) == value for field, value in where.items())]
+        return ids
+
+    def update_entries(self, kind, ids, changes):
+        """把 changes 合并到各条记录的编辑（内容没有变化的记录跳过）"""
+        store = self.collections[kind].store
+        entries = []
+        for iid in ids:
+            record = store.get(iid)
+            if any(record.get(field) != value for field, value in changes.items()):
+                entries.append({"op": "update", "kind": kind, "id": iid, "record": dict(record, **changes)})
+        return entries
+
+    def update_where(self, kind, where, changes, label="批量修改"):
+        return self.perform(label, self.update_entries(kind, self.select(kind, where), changes))
+
+    def remove_where(self, kind, where, label="批量删除"):
+        ids = self.select(kind, where)
+        return self.perform(label, [{"op": "remove", "kind": kind, "id": iid} for iid in ids])
+
+    def add_records(self, kind, records, label="批量新增"):
+        return self.perform(label, [{"op": "add", "kind": kind, "record": record} for record in records])
+
+    def rename_theme(self, old_name, new_name, label="重命名主题"):
+        """重命名主题，并把指向它的壁纸的 themeId 一起改过去"""
+        with self.batch(label):
+            return (self.update_where("categories", {"name": old_name}, {"name": new_name})
+                    + self.update_where("wallpapers", {"themeId": old_name}, {"themeId": new_name}))
+
+
+def parse_categories_from_swift(file_path):
+    """解析 Category.swift 文件中的主题数据"""
+    categories = []
+
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        # 查找 sampleCategories 数组并解析每个 Category 初始化器
+        records = swift_literals.extract_records(content, "sampleCategories")
+        if records is None:
+            print("未找到 sampleCategories 数组")
+            return categories
+
+        for fields in records:
+            category = parse_category_object(fields)
+            if category:
+                categories.append(category)
+
+        print(f"成功解析 {len(categories)} 个主题分类")
+
+    except Exception as e:
+        print(f"解析 Category.swift 失败: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+    return categories
+
+
+def parse_category_object(fields):
+    """把 Category(...) 的参数转换为主题记录，缺少的字段使用 Category.init 的默认值"""
+    if not isinstance(fields.get('name'), str):
+        return None
+    category = {}
+    for key in ['name', 'icon', 'colorHex', 'description']:
+        if isinstance(fields.get(key), str):
+            category[key] = fields[key]
+    category['imageName'] = fields.get('imageName') or ""
+    category['type'] = str(fields.get('type') or 'normal')
+    category['isNew'] = fields.get('isNew') is True
+    category['isFeatured'] = fields.get('isFeatured') is True
+    tags = fields.get('tags')
+    category['tags'] = [tag for tag in tags if isinstance(tag, str)] if isinstance(tags, list) else []
+    return category
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+壁纸缩略图加载
+在后台线程池中解码并缩小图片，解码结果放入按字节数限制大小的 LRU 缓存
+
+- ImageLocator：根据壁纸的 imageName 找到图片文件（Assets.xcassets 和 tools/Wallpapers）
+- ThumbnailCache：按缩略图占用字节数淘汰最久未使用的项
+- ThumbnailLoader：线程池解码，结果经队列交回 Tk 主线程；支持预取和取消过期请求
+
+解码依赖 Pillow（pip install pillow），未安装时 ThumbnailLoader.available 为 False。
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from instrument import stage
+
+try:
+    from PIL import Image, ImageTk
+except ImportError:
+    Image = None
+    ImageTk = None
+
+# 支持的图片格式（与 scan_wallpapers.py 一致）
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+# 预览缩略图的最大尺寸（宽, 高），接近手机壁纸比例
+THUMBNAIL_SIZE = (240, 420)
+
+# 缓存上限：约 64MB 的解码后像素数据
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class ImageLocator:
+    """imageName -> 图片文件路径
+
+    首次查找时扫描一次资源目录，之后都是字典查找。扫描可能较慢，
+    find 只在线程池中调用（ThumbnailLoader 启动时就在线程池中预先扫描）。
+    """
+
+    def __init__(self, project_path):
+        self.roots = [
+            os.path.join(project_path, 'MotivationApp', 'Assets.xcassets'),
+            os.path.join(project_path, 'tools', 'Wallpapers'),
+        ]
+        self.paths = None
+        self.remembered = {}  # 主线程记下的路径，优先于扫描结果
+        self.lock = threading.Lock()
+
+    def scan(self):
+        paths = {}
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            for dir_path, _, file_names in os.walk(root):
+                for file_name in file_names:
+                    stem, ext = os.path.splitext(file_name)
+                    if ext.lower() in IMAGE_EXTENSIONS:
+                        # 付费壁纸文件名以 $ 开头，imageName 中不带 $
+                        paths.setdefault(stem.lstrip('$'), os.path.join(dir_path, file_name))
+        self.paths = paths
+
+    def find(self, image_name):
+        path = self.remembered.get(image_name)
+        if path is not None:
+            return path
+        # 多个工作线程同时首次查找时只扫描一次
+        with self.lock:
+            if self.paths is None:
+                self.scan()
+        return self.paths.get(image_name)
+
+    def remember(self, image_name, path):
+        """记录通过文件对话框选择的图片位置（在主线程中调用，不触发扫描）"""
+        self.remembered[image_name] = path
+
+
+class ThumbnailCache:
+    """按字节数限制大小的 LRU 缓存（只在 Tk 主线程中使用）"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.items = OrderedDict()
+        self.total_bytes = 0
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key):
+        entry = self.items.get(key)
+        if entry is None:
+            return None
+        self.items.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size):
+        if key in self.items:
+            self.total_bytes -= self.items.pop(key)[1]
+        self.items[key] = (value, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.items) > 1:
+            _, (_, evicted_size) = self.items.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+
+class ImageNotFound(Exception):
+    """imageName 在资源目录中找不到对应的图片文件"""
+
+
+def load_thumbnail(locator, image_name):
+    """查找图片文件并解码（在工作线程中执行）"""
+    path = locator.find(image_name)
+    if path is None:
+        raise ImageNotFound(image_name)
+    return decode_thumbnail(path)
+
+
+def decode_thumbnail(path, size=THUMBNAIL_SIZE):
+    """解码并缩小图片（在工作线程中执行），返回 (缩略图, 原图尺寸)"""
+    with stage('decode_thumbnail'), Image.open(path) as image:
+        original_size = image.size
+        # JPEG 可以在解码时直接按比例缩小，省去大部分解码开销
+        image.draft('RGB', size)
+        image = image.convert('RGB')
+        image.thumbnail(size)
+        image.load()
+    return image, original_size
+
+
+class ThumbnailLoader:
+    """后台解码缩略图
+
+    request(image_name, callback) 命中缓存时立即回调，否则提交到线程池；
+    解码完成后由 Tk 主线程轮询队列并调用回调。prefetch 只把结果放进缓存。
+    """
+
+    POLL_INTERVAL = 30  # 毫秒
+
+    def __init__(self, root, project_path, max_workers=4, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.root = root
+        self.locator = ImageLocator(project_path)
+        self.cache = ThumbnailCache(cache_bytes)
+        self.available = Image is not None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers) if self.available else None
+        if self.executor:
+            # 提前扫描资源目录，第一次选中壁纸时不用等待扫描
+            self.executor.submit(self.locator.find, '')
+        self.results = queue.Queue()
+        self.pending = {}    # image_name -> Future
+        self.callbacks = {}  # image_name -> 等待结果的回调
+        self.polling = False
+
+    def request(self, image_name, callback):
+        """callback(image_name, 缩略图或 None, 原图尺寸或错误信息)"""
+        cached = self.cache.get(image_name)
+        if cached is not None:
+            callback(image_name, *cached)
+            return
+        # 预览只显示最近一次选中的图片，之前未完成请求的回调不再需要
+        self.callbacks = {image_name: callback}
+        self.submit(image_name)
+
+    def prefetch(self, image_names):
+        """预取附近行的缩略图；取消已不在附近、尚未开始的预取"""
+        wanted = set(image_names) | set(self.callbacks)
+        for name, future in list(self.pending.items()):
+            if name not in wanted and future.cancel():
+                del self.pending[name]
+        for name in image_names:
+            if name not in self.cache:
+                self.submit(name)
+
+    def submit(self, image_name):
+        if image_name in self.pending or not self.available:
+            if not self.available:
+                self.deliver(image_name, None, '未安装 Pillow，无法预览（pip install pillow）')
+            return
+        future = self.executor.submit(load_thumbnail, self.locator, image_name)
+        future.add_done_callback(lambda f, name=image_name: self.results.put((name, f)))
+        self.pending[image_name] = future
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.POLL_INTERVAL, self.poll)
+
+    def poll(self):
+        while True:
+            try:
+                name, future = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if self.pending.get(name) is future:
+                del self.pending[name]
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if isinstance(error, ImageNotFound):
+                self.deliver(name, None, '未找到图片文件')
+                continue
+            if error is not None:
+                self.deliver(name, None, f'无法解码图片: {error}')
+                continue
+            image, original_size = future.result()
+            self.cache.put(name, (image, original_size), image.width * image.height * 3)
+            self.deliver(name, image, original_size)
+        if self.pending:
+            self.root.after(self.POLL_INTERVAL, self.poll)
+        else:
+            self.polling = False
+
+    def deliver(self, image_name, image, info):
+        callback = self.callbacks.pop(image_name, None)
+        if callback:
+            callback(image_name, image, info)
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重度用户数据生成与存储格式对比
+
+DataManager 把 quotes、categories、checkInRecords 各自整体编码为一个 JSON 放在 UserDefaults 中，
+每次收藏/取消收藏、每次打卡都会重新编码整个数组。本脚本生成长期使用的用户数据
+（多年的打卡记录、数万条自定义语录和收藏），比较几种可选存储格式的数据大小和编解码耗时：
+
+  json_pretty   JSONEncoder 加 .prettyPrinted（缩进 2 格，"key" : value）
+  json_compact  JSONEncoder 默认输出（DataManager 当前的格式）
+  plist_binary  PropertyListEncoder 的二进制 plist（Date 为 plist 日期）
+  json_chunked  分块存储：语录每 --chunk-size 条一块，打卡记录每月一块；修改时只重新编码所在的块
+  jsonl_append  追加日志：每条记录一行，修改时只追加一行（收藏只写 id 和 isFavorite），
+                加载时按 id 合并；解码耗时包含 --log-changes 条待合并的修改
+
+生成的数据与 Swift Codable 模型的编码结果一致：UUID 为大写字符串，
+Date 按 JSONEncoder 默认的 .deferredToDate 编码为距 2001-01-01 的秒数（整秒不带小数），
+为 nil 的可选字段不输出；打卡日期是东八区的当天零点（Date().startOfDay()）。
+注意 Resources/quotes.json 的 categoryId 是分类名称、createdDate 是 ISO 字符串，
+默认的 JSONDecoder 无法解码，App 首次启动时会退回 Quote.sampleQuotes；这里只取它的语录文本。
+
+耗时是 Python（标准库 json、plistlib）上的结果，只适合比较各格式之间的相对差异，不代表设备上的绝对耗时。
+"单次修改"是收藏一条语录 / 新增一条打卡后保存所需的编码耗时和写入字节数。
+
+使用方法：
+python3 user_data_fixtures.py                          # 重度用户（5 年打卡、2 万条自定义语录）的对比
+python3 user_data_fixtures.py --user all               # 普通、重度、极端三种用户依次对比
+python3 user_data_fixtures.py --years 10 --custom-quotes 100000 --favorites 80000
+python3 user_data_fixtures.py --output user_data_fixtures   # 同时写出数据文件和 UserDefaults plist
+python3 user_data_fixtures.py --report fixtures_report.json # 结果另存为 JSON
+"""
+
+import argparse
+import json
+import os
+import plistlib
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import swift_literals
+from catalog import QUOTES_PATH, read_json, write_json
+from content_packs import format_bytes
+from instrument import stage
+from theme_model import parse_category_object
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+CATEGORY_SWIFT = os.path.join(PROJECT_DIR, 'MotivationApp', 'Models', 'Category.swift')
+BUNDLE_ID = 'com.fcheuk.MotivationApp.MotivationApp'
+
+# Constants.UserDefaultsKeys
+KEY_ONBOARDING = 'hasCompletedOnboarding'
+KEY_SETTINGS = 'appSettings'
+KEY_QUOTES = 'quotes'
+KEY_CATEGORIES = 'categories'
+KEY_CHECK_INS = 'checkInRecords'
+
+# Foundation 的参考时间（Date 的 timeIntervalSinceReferenceDate 从这里算起）
+REFERENCE_DATE = datetime(2001, 1, 1, tzinfo=timezone.utc)
+LOCAL_TZ = timezone(timedelta(hours=8))
+# 数据截止日期（最后一天打卡的日期）
+END_DATE = datetime(2026, 10, 19, tzinfo=LOCAL_TZ)
+# Resources/quotes.json 中语录的创建时间
+BUNDLED_CREATED = datetime(2025, 12, 9, tzinfo=timezone.utc)
+
+# 用户类型：打卡年数、自定义语录数、收藏数、打卡概率（前一天打过卡 / 前一天没打卡）
+PROFILES = {
+    'typical': {'years': 1, 'custom_quotes': 50, 'favorites': 120, 'streak': 0.75, 'restart': 0.35},
+    'heavy': {'years': 5, 'custom_quotes': 20000, 'favorites': 15000, 'streak': 0.92, 'restart': 0.5},
+    'extreme': {'years': 10, 'custom_quotes': 60000, 'favorites': 50000, 'streak': 0.97, 'restart': 0.7},
+}
+PROFILE_NAMES = {'typical': '普通用户', 'heavy': '重度用户', 'extreme': '极端用户'}
+
+FORMATS = ('json_pretty', 'json_compact', 'plist_binary', 'json_chunked', 'jsonl_append')
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_LOG_CHANGES = 1000
+DEFAULT_REPEAT = 3
+
+NOTES = (
+    '今天状态不错', '早起读了三条', '坚持就是胜利', '有点累，但还是打卡了', '和朋友分享了一句',
+    '这句话说到心里了', '明天继续', '通勤路上看的', '睡前打卡', '周末也不能停',
+    '最近工作压力大，这些话给了我很多力量，记下来提醒自己慢慢来',
+)
+CUSTOM_AUTHORS = ('我', '自己', '佚名', '妈妈', '老师', '朋友')
+
+
+# MARK: - 生成数据
+
+def swift_date(moment):
+    """Date 的 JSONEncoder 默认编码：距 2001-01-01 的秒数，整秒输出为整数（与 Foundation 输出的字节一致）"""
+    seconds = round((moment - REFERENCE_DATE).total_seconds(), 6)
+    return int(seconds) if seconds == int(seconds) else seconds
+
+
+def swift_uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4)).upper()
+
+
+def load_categories(rng):
+    """Category.sampleCategories（id 是 UUID()，每次启动都不同，这里随机生成）"""
+    with open(CATEGORY_SWIFT, 'r', encoding='utf-8') as f:
+        records = swift_literals.extract_records(f.read(), 'sampleCategories')
+    if records is None:
+        raise ValueError(f'{CATEGORY_SWIFT} 中未找到 sampleCategories 数组')
+    categories = []
+    for fields in filter(None, map(parse_category_object, records)):
+        category = {'id': swift_uuid(rng), 'name': fields['name'], 'icon': fields['icon'],
+                    'colorHex': fields['colorHex'], 'description': fields['description']}
+        if fields.get('imageName'):
+            category['imageName'] = fields['imageName']
+        category.update(type=fields.get('type') or 'normal', isNew=bool(fields.get('isNew')),
+                        isFeatured=bool(fields.get('isFeatured')), tags=list(fields.get('tags') or []))
+        categories.append(category)
+    return categories
+
+
+def generate_check_ins(rng, years, streak, restart):
+    """按连续打卡的概率生成每天的打卡记录：前一天打过卡时继续的概率为 streak，否则为 restart"""
+    records = []
+    day = END_DATE - timedelta(days=round(years * 365.25) - 1)
+    checked = False
+    while day <= END_DATE:
+        checked = rng.random() < (streak if checked else restart)
+        if checked:
+            record = {'id': swift_uuid(rng), 'date': swift_date(day),
+                      'quotesRead': min(1 + int(rng.expovariate(0.4)), 50)}
+            if rng.random() < 0.15:
+                record['notes'] = rng.choice(NOTES)
+            records.append(record)
+        day += timedelta(days=1)
+    return records
+
+
+def generate_quotes(rng, categories, custom_count, favorites, years):
+    """Resources/quotes.json 的语录加上自定义语录，随机收藏 favorites 条"""
+    category_ids = [category['id'] for category in categories]
+    bundled = read_json(QUOTES_PATH)
+    names = sorted({quote['categoryId'] for quote in bundled})
+    category_of = {name: category_ids[i % len(category_ids)] for i, name in enumerate(names)}
+
+    created = swift_date(BUNDLED_CREATED)
+    quotes = [{'id': quote['id'].upper(), 'content': quote['content'], 'author': quote['author'],
+               'categoryId': category_of[quote['categoryId']], 'isFavorite': False, 'createdDate': created}
+              for quote in bundled]
+
+    # 自定义语录由两条已有语录拼接而成，长度分布与真实语录接近
+    texts = [quote['content'] for quote in bundled] or ['坚持下去。']
+    start = END_DATE - timedelta(days=round(years * 365.25))
+    span = (END_DATE - start).total_seconds()
+    moments = sorted(start + timedelta(seconds=rng.random() * span) for _ in range(custom_count))
+    for moment in moments:
+        content = rng.choice(texts)
+        if rng.random() < 0.3:
+            content += rng.choice(texts)
+        quotes.append({'id': swift_uuid(rng), 'content': content, 'author': rng.choice(CUSTOM_AUTHORS),
+                       'categoryId': rng.choice(category_ids), 'isFavorite': False,
+                       'createdDate': swift_date(moment)})
+
+    for quote in rng.sample(quotes, min(favorites, len(quotes))):
+        quote['isFavorite'] = True
+    return quotes
+
+
+def generate_settings():
+    return {'notificationsEnabled': True, 'notificationTime': swift_date(END_DATE.replace(hour=9)),
+            'selectedTheme': '跟随系统', 'fontSize': '中', 'isSubscribed': True,
+            'subscriptionExpiryDate': swift_date(END_DATE + timedelta(days=365))}
+
+
+def generate_user_data(profile, seed):
+    """生成一个用户的全部数据：{UserDefaults 键: 解码后的值}"""
+    rng = random.Random(seed)
+    with stage('generate'):
+        categories = load_categories(rng)
+        check_ins = generate_check_ins(rng, profile['years'], profile['streak'], profile['restart'])
+        quotes = generate_quotes(rng, categories, profile['custom_quotes'], profile['favorites'],
+                                 profile['years'])
+    return {KEY_CATEGORIES: categories, KEY_QUOTES: quotes, KEY_CHECK_INS: check_ins,
+            KEY_SETTINGS: generate_settings()}
+
+
+# MARK: - 编码格式
+
+def encode_compact(records):
+    return json.dumps(records, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_pretty(records):
+    return json.dumps(records, ensure_ascii=False, indent=2, separators=(',', ' : ')).encode('utf-8')
+
+
+def decode_json(data):
+    return json.loads(data)
+
+
+def to_plist_value(record, date_fields):
+    """PropertyListEncoder 把 Date 编码为 plist 日期（plistlib 需要不带时区的 UTC datetime）"""
+    value = dict(record)
+    for field in date_fields:
+        if field in value:
+            value[field] = (REFERENCE_DATE + timedelta(seconds=value[field])).replace(tzinfo=None)
+    return value
+
+
+def encode_plist(values):
+    return plistlib.dumps(values, fmt=plistlib.FMT_BINARY, sort_keys=False)
+
+
+def decode_plist(data):
+    return plistlib.loads(data)
+
+
+class Collection:
+    """一个 UserDefaults 键对应的记录数组，以及一次典型修改（收藏一条语录 / 新增一条打卡）"""
+
+    def __init__(self, key, records, date_fields, chunk_key, change):
+        self.key = key
+        self.records = records
+        self.date_fields = date_fields
+        self.chunk_key = chunk_key      # 记录 → 分块编号
+        self.change = change            # 返回 (修改后的记录, 是否是新记录, 追加日志中的一行)
+
+
+def chunk_by_position(chunk_size):
+    positions = {}
+
+    def chunk_key(record, index):
+        return positions.setdefault(record['id'], index // chunk_size)
+    return chunk_key
+
+
+def chunk_by_month(record, index):
+    moment = REFERENCE_DATE + timedelta(seconds=record['date'])
+    return moment.astimezone(LOCAL_TZ).strftime('%Y-%m')
+
+
+def quote_collection(quotes, rng, chunk_size):
+    def change():
+        quote = dict(rng.choice(quotes))
+        quote['isFavorite'] = not quote['isFavorite']
+        return quote, False, {'id': quote['id'], 'isFavorite': quote['isFavorite']}
+    return Collection(KEY_QUOTES, quotes, ('createdDate',), chunk_by_position(chunk_size), change)
+
+
+def check_in_collection(check_ins, rng):
+    def change():
+        last = check_ins[-1]['date'] if check_ins else swift_date(END_DATE)
+        record = {'id': swift_uuid(rng), 'date': last + 86400, 'quotesRead': 1}
+        return record, True, record
+    return Collection(KEY_CHECK_INS, check_ins, ('date',), chunk_by_month, change)
+
+
+def best_time(function, repeat):
+    """多次运行取最短耗时（秒）和最后一次的返回值"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def whole_encoder(fmt, date_fields):
+    """整体存储时把记录数组编码为一个 blob 的函数"""
+    if fmt == 'plist_binary':
+        return lambda records: encode_plist([to_plist_value(record, date_fields) for record in records])
+    return encode_pretty if fmt == 'json_pretty' else encode_compact
+
+
+def measure_whole(collection, fmt, repeat):
+    """整体存储：单次修改后需要重新编码整个数组（与 DataManager 每次 save 的做法相同）"""
+    encode = whole_encoder(fmt, collection.date_fields)
+    decode = decode_plist if fmt == 'plist_binary' else decode_json
+    records = collection.records
+
+    encode_seconds, data = best_time(lambda: encode(records), repeat)
+    decode_seconds, _ = best_time(lambda: decode(data), repeat)
+    record, is_new, _ = collection.change()
+    changed = records + [record] if is_new else records
+    save_seconds, saved = best_time(lambda: encode(changed), repeat)
+    return {'bytes': len(data), 'blobs': 1, 'encodeSeconds': encode_seconds, 'decodeSeconds': decode_seconds,
+            'saveSeconds': save_seconds, 'saveBytes': len(saved)}
+
+
+def measure_chunked(collection, repeat):
+    """分块存储：每块一个紧凑 JSON，修改时只重新编码所在的块"""
+    chunks = {}
+    for index, record in enumerate(collection.records):
+        chunks.setdefault(collection.chunk_key(record, index), []).append(record)
+
+    encode_seconds, blobs = best_time(lambda: {key: encode_compact(chunk) for key, chunk in chunks.items()},
+                                      repeat)
+
+    def decode():
+        records = []
+        for key in sorted(blobs):
+            records.extend(decode_json(blobs[key]))
+        return records
+    decode_seconds, _ = best_time(decode, repeat)
+
+    record, is_new, _ = collection.change()
+    key = collection.chunk_key(record, len(collection.records))
+    chunk = chunks.get(key, [])
+    if is_new:
+        changed = chunk + [record]
+    else:
+        changed = [record if r['id'] == record['id'] else r for r in chunk]
+    save_seconds, saved = best_time(lambda: encode_compact(changed), repeat)
+    return {'bytes': sum(map(len, blobs.values())), 'blobs': len(blobs), 'encodeSeconds': encode_seconds,
+            'decodeSeconds': decode_seconds, 'saveSeconds': save_seconds, 'saveBytes': len(saved)}
+
+
+def measure_append(collection, repeat, log_changes):
+    """追加日志：快照每条记录一行，后面追加 log_changes 条修改；加载时按 id 合并"""
+    def encode():
+        return b'\n'.join(encode_compact(record) for record in collection.records) + b'\n'
+    encode_seconds, snapshot = best_time(encode, repeat)
+
+    changes = [collection.change()[2] for _ in range(log_changes)]
+    log = snapshot + b''.join(encode_compact(change) + b'\n' for change in changes)
+
+    def decode():
+        records = {}
+        for line in log.splitlines():
+            if line:
+                record = decode_json(line)
+                previous = records.get(record['id'])
+                if previous is None:
+                    records[record['id']] = record
+                else:
+                    previous.update(record)
+        return list(records.values())
+    decode_seconds, _ = best_time(decode, repeat)
+
+    line = collection.change()[2]
+    save_seconds, saved = best_time(lambda: encode_compact(line) + b'\n', repeat)
+    return {'bytes': len(snapshot), 'blobs': 1, 'encodeSeconds': encode_seconds, 'decodeSeconds': decode_seconds,
+            'saveSeconds': save_seconds, 'saveBytes': len(saved), 'logBytes': len(log) - len(snapshot)}
+
+
+def measure_collection(collection, repeat, log_changes):
+    results = {}
+    for fmt in FORMATS:
+        with stage(f'measure/{fmt}'):
+            if fmt == 'json_chunked':
+                results[fmt] = measure_chunked(collection, repeat)
+            elif fmt == 'jsonl_append':
+                results[fmt] = measure_append(collection, repeat, log_changes)
+            else:
+                results[fmt] = measure_whole(collection, fmt, repeat)
+    return results
+
+
+# MARK: - 输出
+
+def print_results(key, count, results):
+    print(f'\n   {key}（{count} 条）')
+    # 中文表头每个字占两列，宽度按显示宽度减去字数
+    print(f'   {"格式":<12}{"大小":>10}{"块数":>5}{"编码":>10}{"解码":>10}{"单次修改":>8}{"写入":>10}')
+    baseline = results['json_compact']
+    for fmt, result in results.items():
+        marker = ' ←当前' if fmt == 'json_compact' else ''
+        ratio = result['saveSeconds'] / baseline['saveSeconds'] if baseline['saveSeconds'] else 0
+        print(f'   {fmt:<14}{format_bytes(result["bytes"]):>12}{result["blobs"]:>7}'
+              f'{result["encodeSeconds"] * 1000:>9.1f} ms{result["decodeSeconds"] * 1000:>9.1f} ms'
+              f'{result["saveSeconds"] * 1000:>9.2f} ms{format_bytes(result["saveBytes"]):>12}'
+              f'  ×{ratio:.3f}{marker}')
+    if 'logBytes' in results.get('jsonl_append', {}):
+        print(f'   （jsonl_append 的解码包含 {format_bytes(results["jsonl_append"]["logBytes"])} 待合并的修改日志）')
+
+
+def write_fixtures(output_dir, user_data):
+    """写出 DataManager 格式的各键数据，以及可以放进模拟器 Library/Preferences 的 UserDefaults plist"""
+    os.makedirs(output_dir, exist_ok=True)
+    defaults = {KEY_ONBOARDING: True}
+    for key, value in user_data.items():
+        blob = encode_compact(value)
+        with open(os.path.join(output_dir, f'{key}.json'), 'wb') as f:
+            f.write(blob)
+        defaults[key] = blob
+    plist_path = os.path.join(output_dir, f'{BUNDLE_ID}.plist')
+    with open(plist_path, 'wb') as f:
+        plistlib.dump(defaults, f, fmt=plistlib.FMT_BINARY)
+    return plist_path
+
+
+def run_profile(name, profile, args):
+    label = PROFILE_NAMES.get(name, name)
+    start = time.perf_counter()
+    user_data = generate_user_data(profile, args.seed)
+    quotes, check_ins = user_data[KEY_QUOTES], user_data[KEY_CHECK_INS]
+    favorites = sum(quote['isFavorite'] for quote in quotes)
+    print(f'\n👤 {label}：{profile["years"]} 年 {len(check_ins)} 次打卡，'
+          f'{len(quotes)} 条语录（自定义 {profile["custom_quotes"]}，收藏 {favorites}）'
+          f'（生成 {time.perf_counter() - start:.1f} s）')
+
+    if args.output:
+        output_dir = os.path.join(args.output, name)
+        with stage('write_fixtures'):
+            plist_path = write_fixtures(output_dir, user_data)
+        print(f'   💾 已写入 {output_dir}（UserDefaults: {os.path.basename(plist_path)}）')
+
+    rng = random.Random(args.seed + 1)
+    results = {}
+    for collection in (quote_collection(quotes, rng, args.chunk_size), check_in_collection(check_ins, rng)):
+        results[collection.key] = measure_collection(collection, args.repeat, args.log_changes)
+        print_results(collection.key, len(collection.records), results[collection.key])
+    return {'profile': name, 'years': profile['years'], 'checkIns': len(check_ins), 'quotes': len(quotes),
+            'favorites': favorites, 'formats': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成重度用户数据，比较 DataManager 可选存储格式的大小和编解码耗时')
+    parser.add_argument('--user', choices=list(PROFILES) + ['all'], default='heavy', help='用户类型（all 为全部）')
+    parser.add_argument('--years', type=float, help='打卡年数（覆盖用户类型的设置）')
+    parser.add_argument('--custom-quotes', type=int, help='自定义语录数（覆盖用户类型的设置）')
+    parser.add_argument('--favorites', type=int, help='收藏数（覆盖用户类型的设置）')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='json_chunked 中语录每块的条数')
+    parser.add_argument('--log-changes', type=int, default=DEFAULT_LOG_CHANGES,
+                        help='jsonl_append 解码时待合并的修改条数')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='每项计时重复次数（取最短）')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--output', help='把生成的数据写到该目录（每种用户一个子目录）')
+    parser.add_argument('--report', help='把结果保存为 JSON 文件')
+    args = parser.parse_args()
+    if args.chunk_size <= 0 or args.repeat <= 0 or args.log_changes < 0:
+        parser.error('--chunk-size、--repeat 必须大于 0，--log-changes 不能为负数')
+
+    names = list(PROFILES) if args.user == 'all' else [args.user]
+    print(f'📊 存储格式对比（Python {sys.version.split()[0]}，每项取 {args.repeat} 次中最短的耗时）')
+    reports = []
+    for name in names:
+        profile = dict(PROFILES[name])
+        for field in ('years', 'custom_quotes', 'favorites'):
+            if getattr(args, field) is not None:
+                profile[field] = getattr(args, field)
+        reports.append(run_profile(name, profile, args))
+
+    if args.report:
+        write_json(args.report, {'python': sys.version.split()[0], 'seed': args.seed,
+                                 'chunkSize': args.chunk_size, 'logChanges': args.log_changes,
+                                 'profiles': reports})
+        print(f'\n📝 结果已保存到 {args.report}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
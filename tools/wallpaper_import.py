@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+从文件夹批量导入壁纸（不依赖 Tk，theme_manager.py 的"批量导入"按钮和命令行共用）
+
+- 递归查找文件夹中的图片；所在目录（或最近的上级目录，包括所选文件夹本身）名为 序号_主题名 时
+  按 scan_wallpapers.py 的规则解析主题，否则使用第一层子目录名，直接放在所选文件夹中的图片归入默认主题
+- 文件名规则与 scan_wallpapers.py 相同：$ 开头表示付费壁纸，imageName 为去掉 $ 的文件名
+- 在线程池中计算内容哈希（SHA-256）并读取图片尺寸（只读文件头，需要 Pillow，未安装时不记录尺寸）
+- 重复检测：内容相同的图片只导入一次；与已有壁纸内容相同或同名（已有记录没有哈希）时跳过；
+  同名但内容不同时自动改名（加 _2、_3 等后缀）
+- 新记录额外保存 contentHash、width、height，下次导入时用于识别重复
+- 数据中还没有的主题会一起新增（图标和颜色取 scan_wallpapers.py 的默认配置）
+
+使用方法：
+python3 wallpaper_import.py ~/Pictures/新壁纸                 # 导入并保存
+python3 wallpaper_import.py ~/Pictures/新壁纸 --theme 风景    # 指定未分目录图片的主题
+python3 wallpaper_import.py ~/Pictures/新壁纸 --dry-run       # 只统计，不修改数据
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from scan_wallpapers import (DEFAULT_CONFIG, DEFAULT_THEME_CONFIG, IMAGE_EXTENSIONS,
+                             parse_theme_dir_name, parse_wallpaper_file_name)
+from instrument import count, stage
+from theme_model import OperationCancelled, Task, ThemeModel
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+# 计算哈希时每次读取的块大小；hashlib 处理大块数据时会释放 GIL，多个线程可以同时计算
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 线程数：主要耗时在读文件和哈希计算
+DEFAULT_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+
+# 没有放在主题目录中的图片归入的主题
+DEFAULT_THEME = "未分类"
+
+# 导入时额外记录的字段（修改图片后不再有效）
+IMPORT_FIELDS = ("contentHash", "width", "height")
+
+
+class ImportResult:
+    """一次导入的结果：要新增的主题和壁纸记录，以及跳过的文件"""
+
+    def __init__(self):
+        self.categories = []     # 新增的主题记录
+        self.wallpapers = []     # 新增的壁纸记录
+        self.image_paths = {}    # imageName -> 图片完整路径（供预览使用）
+        self.duplicates = []     # (路径, 原因)
+        self.renamed = []        # (路径, 新的 imageName)
+        self.failed = []         # (路径, 错误信息)
+        self.scanned = 0
+
+    def entries(self):
+        """新增记录对应的编辑（主题在前，一次 perform 即可作为一步撤销）"""
+        return ([{"op": "add", "kind": "categories", "record": record} for record in self.categories]
+                + [{"op": "add", "kind": "wallpapers", "record": record} for record in self.wallpapers])
+
+    def summary(self):
+        lines = [f"扫描 {self.scanned} 张图片，新增 {len(self.wallpapers)} 张壁纸"]
+        if self.categories:
+            lines.append(f"新增主题: {'、'.join(record['name'] for record in self.categories)}")
+        if self.renamed:
+            lines.append(f"{len(self.renamed)} 张同名图片已改名")
+        if self.duplicates:
+            lines.append(f"跳过 {len(self.duplicates)} 张重复图片")
+        if self.failed:
+            lines.append(f"{len(self.failed)} 张图片无法读取")
+        return "\n".join(lines)
+
+
+def theme_for_dir(parts, default_theme, folder_name=""):
+    """目录（相对所选文件夹的各级名称）-> (主题名, 主题是否付费)
+
+    folder_name 是所选文件夹本身的名称（如 03_风景），也按 序号_主题名 解析。
+    """
+    for part in reversed([folder_name, *parts]):
+        index, name, is_premium = parse_theme_dir_name(part)
+        if index:
+            return name, is_premium
+    if parts:
+        return parts[0], False
+    return default_theme, False
+
+
+def find_images(folder, default_theme=DEFAULT_THEME):
+    """递归查找图片，返回 [(路径, 主题名, 主题是否付费)]（按路径排序）"""
+    images = []
+    folder_name = os.path.basename(os.path.normpath(folder))
+    for dir_path, dir_names, file_names in os.walk(folder):
+        dir_names.sort()
+        relative = os.path.relpath(dir_path, folder)
+        parts = [] if relative == os.curdir else relative.split(os.sep)
+        theme, theme_is_premium = theme_for_dir(parts, default_theme, folder_name)
+        for file_name in sorted(file_names):
+            if os.path.splitext(file_name)[1].lower() in IMAGE_EXTENSIONS:
+                images.append((os.path.join(dir_path, file_name), theme, theme_is_premium))
+    return images
+
+
+def probe_image(path):
+    """计算图片内容的 SHA-256，并读取尺寸，返回 (哈希, (宽, 高) 或 None)
+
+    文件无法读取，或安装了 Pillow 但无法识别图片格式时抛出异常。
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    size = None
+    if Image is not None:
+        # Image.open 只解析文件头，不解码像素；无法识别的文件在这里报错
+        with Image.open(path) as image:
+            size = image.size
+    return digest.hexdigest(), size
+
+
+def probe_images(paths, task, workers=DEFAULT_WORKERS):
+    """在线程池中处理所有图片，返回与 paths 对应的 (哈希, 尺寸) 或异常"""
+    results = [None] * len(paths)
+    total = len(paths)
+    step = max(1, total // 100)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(probe_image, path): number for number, path in enumerate(paths)}
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = e
+                if done % step == 0 or done == total:
+                    task.progress(f"正在处理图片 {done}/{total}...", done / total)
+                    task.check_cancelled()
+        except OperationCancelled:
+            for future in futures:
+                future.cancel()
+            raise
+    return results
+
+
+def new_category(name, is_premium):
+    default = DEFAULT_THEME_CONFIG.get(name, DEFAULT_CONFIG)
+    return {
+        "name": name,
+        "icon": default["icon"],
+        "colorHex": default["colorHex"],
+        "description": default["description"],
+        "imageName": "",
+        "type": "normal",
+        "isNew": True,
+        "isFeatured": False,
+        "tags": ["付费"] if is_premium else [],
+    }
+
+
+def unique_image_name(image_name, taken):
+    number = 2
+    while f"{image_name}_{number}" in taken:
+        number += 1
+    return f"{image_name}_{number}"
+
+
+def import_folder(folder, categories, wallpapers, task=None, default_theme=DEFAULT_THEME,
+                  workers=DEFAULT_WORKERS):
+    """扫描文件夹，返回 ImportResult（不修改数据）
+
+    categories、wallpapers 为已有记录的列表（在调用线程之外不会被修改的快照）。
+    """
+    task = task or Task()
+    result = ImportResult()
+    task.progress("正在查找图片...")
+    with stage('find_images'):
+        images = find_images(folder, default_theme)
+    result.scanned = len(images)
+    count('images', len(images))
+    task.check_cancelled()
+    with stage('probe_images'):
+        probes = probe_images([path for path, _, _ in images], task, workers)
+
+    task.progress("正在检查重复图片...")
+    with stage('check_duplicates'):
+        plan_records(result, images, probes, categories, wallpapers)
+    return result
+
+
+def plan_records(result, images, probes, categories, wallpapers):
+    """检查重复并生成新记录，写入 result"""
+    hashes = {}     # contentHash -> imageName（已有记录和本次导入的）
+    names = {}      # imageName -> contentHash（没有记录哈希时为 None）
+    for wallpaper in wallpapers:
+        image_name = wallpaper.get("imageName", "")
+        content_hash = wallpaper.get("contentHash")
+        names.setdefault(image_name, content_hash)
+        if content_hash:
+            hashes.setdefault(content_hash, image_name)
+    category_names = {category.get("name", "") for category in categories}
+
+    for (path, theme, theme_is_premium), probe in zip(images, probes):
+        if isinstance(probe, Exception):
+            result.failed.append((path, str(probe)))
+            continue
+        content_hash, size = probe
+        if content_hash in hashes:
+            result.duplicates.append((path, f"与 {hashes[content_hash]} 内容相同"))
+            continue
+        name, is_premium = parse_wallpaper_file_name(os.path.basename(path))
+        image_name = os.path.splitext(os.path.basename(path))[0].lstrip("$")
+        if image_name in names:
+            if names[image_name] is None:
+                # 已有同名壁纸但不知道它的内容：视为同一张图片
+                result.duplicates.append((path, f"已有同名壁纸 {image_name}"))
+                continue
+            image_name = unique_image_name(image_name, names)
+            result.renamed.append((path, image_name))
+        if theme not in category_names:
+            category_names.add(theme)
+            result.categories.append(new_category(theme, theme_is_premium))
+        record = {
+            "name": name,
+            "themeId": theme,
+            "imageName": image_name,
+            "isLocked": is_premium or theme_is_premium,
+            "contentHash": content_hash,
+        }
+        if size:
+            record["width"], record["height"] = size
+        result.wallpapers.append(record)
+        result.image_paths[image_name] = path
+        hashes[content_hash] = image_name
+        names[image_name] = content_hash
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从文件夹批量导入壁纸")
+    parser.add_argument("folder", help="图片文件夹（可包含 序号_主题名 子目录）")
+    parser.add_argument("--theme", default=DEFAULT_THEME, help="不在主题目录中的图片归入的主题")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="处理图片的线程数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不修改数据")
+    args = parser.parse_args()
+
+    model = ThemeModel(PROJECT_DIR)
+    try:
+        model.load(open_journal=not args.dry_run)
+    except ValueError as e:
+        # 快照已另存为 .bak，日志保持不动，可在 theme_manager.py 中打开以恢复
+        print(f"❌ {e}")
+        return 1
+    print(f"📂 已加载 {len(model.categories)} 个主题和 {len(model.wallpapers)} 个壁纸")
+
+    start = time.perf_counter()
+    result = import_folder(args.folder, model.categories.records(), model.wallpapers.records(),
+                           default_theme=args.theme, workers=args.workers)
+    print(f"🔍 {result.summary()}".replace("\n", "\n   "))
+    print(f"   用时 {time.perf_counter() - start:.2f} s（{args.workers} 个线程）")
+    for path, error in result.failed:
+        print(f"   ⚠️ {path}: {error}")
+
+    if args.dry_run:
+        print("🔍 演练模式，未保存")
+        return 0
+    if not result.wallpapers:
+        model.close()
+        return 0
+    model.perform(f"批量导入壁纸（{len(result.wallpapers)} 张）", result.entries())
+    model.save()
+    model.close()
+    print(f"💾 已保存到 {model.data_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())